@@ -1,43 +1,68 @@
 import streamlit as st
-import pandas as pd
 import requests
-import time
-from script.langchain import analyze_summary
+import uuid
+import pandas as pd
+from script.langchain import analyze_summary, warm_up, warm_up_error
+from script.data_hub import get_data_hub
+from script.metrics import track_session
+from script.rollup import VIEW_RANGES, get_rollup_engine, resolution_caption, rollup_chart, visible_range
+from script.sensor_api import SensorHistoryClient, SharedSensorPoller
+from script.timeseries_store import get_timeseries_store, sync_feed
 
 st.set_page_config(page_title="EduDetect", layout="wide")
+track_session()
+
+# Siapkan koneksi MongoDB dan model Gemini di latar belakang selama halaman dirender
+warm_up()
+
+# Hub data bersama: semua sesi berbagi satu permintaan ke server per interval
+data_hub = get_data_hub()
 
 # Fungsi untuk mengambil data terbaru dari API
 def fetch_latest_data():
     try:
-        response = requests.get("https://samsung.yogserver.web.id/data/latest")
-        if response.status_code == 200:
-            return response.json()
-        else:
-            st.error(f"Terjadi kesalahan saat mengambil data: Kode status {response.status_code}")
-            return None
+        return data_hub.get("latest")
+    except requests.HTTPError as e:
+        st.error(f"Terjadi kesalahan saat mengambil data: Kode status {e.response.status_code}")
+        return None
     except Exception as e:
         st.error(f"Terjadi kesalahan saat mengambil data: {e}")
         return None
 
-# Fungsi untuk mengambil data historis (10 data terbaru)
-def fetch_historical_data():
-    try:
-        response = requests.get("https://samsung.yogserver.web.id/data/sensor")
-        if response.status_code == 200:
-            data = response.json()
-            recent_data = data[-10:] if len(data) > 10 else data
-            return recent_data
-        else:
-            st.error(f"Terjadi kesalahan saat mengambil data historis: Kode status {response.status_code}")
-            return None
-    except Exception as e:
-        st.error(f"Terjadi kesalahan saat mengambil data historis: {e}")
-        return None
+# Panjang maksimum jendela grafik real-time (titik); tiap sesi memilih jendelanya sendiri
+SENSOR_WINDOW_MAX = 300
+
+# Satu buffer per proses melayani semua sesi dasbor: delta data diambil lewat data hub
+# (satu permintaan per interval), dan DataFrame grafik dibangun sekali untuk semua sesi
+@st.cache_resource
+def get_sensor_poller():
+    client = SensorHistoryClient("/data/sensor", base_url=data_hub.base_url, capacity=SENSOR_WINDOW_MAX,
+                                 session=data_hub.session)
+    return SharedSensorPoller(data_hub, client)
+
+sensor_poller = get_sensor_poller()
+
+# Riwayat sensor di penyimpanan lokal dan bucket rollup-nya untuk grafik tren rentang panjang
+store = get_timeseries_store()
+rollups = get_rollup_engine()
+
+# ID sesi untuk heartbeat ke poller
+if "session_id" not in st.session_state:
+    st.session_state["session_id"] = uuid.uuid4().hex
 
 # Sidebar
 st.sidebar.header("Tentang EduDetect")
 st.sidebar.write("EduDetect adalah sistem monitoring yang memantau kondisi lingkungan di ruang pendidikan.")
 
+# Tampilkan kegagalan koneksi awal ke MongoDB/Gemini (warm-up berjalan di latar belakang)
+if warm_up_error():
+    service, error = warm_up_error()
+    st.sidebar.warning(f"Koneksi awal ke {service} gagal: {error}")
+
+# Jumlah permintaan ke server dibanding jumlah pembacaan oleh sesi
+with st.sidebar.expander("Statistik Data Hub"):
+    st.json(data_hub.stats())
+
 # Konten utama
 st.title("EduDetect")
 st.subheader("Dasbor Monitoring Lingkungan")
@@ -68,29 +93,102 @@ st.success(analysis)
 
 # Tombol untuk memulai/berhenti refresh chart
 run_charts = st.checkbox("Aktifkan Refresh Grafik Real-time", value=True)
+chart_window = st.slider("Jendela Grafik Real-time (titik)", min_value=10, max_value=SENSOR_WINDOW_MAX, value=10, step=10)
+
+# Jumlah minimum titik yang ditambahkan lewat add_rows sebelum grafik dibuat ulang
+# dengan jendela yang dipilih (agar grafik tidak tumbuh tanpa batas)
+CHART_REBASE_MIN_ROWS = 30
+
+# Fungsi untuk memisahkan data suhu dan kelembaban ke format grafik
+def chart_frames(df):
+    temp_df = df[['timestamp', 'temperature']].rename(columns={'timestamp': 'Waktu', 'temperature': 'Suhu'})
+    humidity_df = df[['timestamp', 'humidity']].rename(columns={'timestamp': 'Waktu', 'humidity': 'Kelembaban'})
+    return temp_df, humidity_df
+
+# Grafik dibuat di run penuh (di luar fragment) dari jendela data terbaru dan disimpan
+# di session_state; fragment hanya mengirim titik setelah timestamp terakhir yang sudah
+# tampil lewat add_rows (karena itu requirements.txt mengunci streamlit<1.58)
+_, initial_df = sensor_poller.snapshot()
+if initial_df is None:
+    initial_df = pd.DataFrame({'timestamp': pd.Series(dtype='datetime64[ns]'),
+                               'temperature': pd.Series(dtype=float),
+                               'humidity': pd.Series(dtype=float)})
+initial_df = initial_df.tail(chart_window)
+initial_temp_df, initial_humidity_df = chart_frames(initial_df)
+
+st.subheader("Data Suhu (Real-time)")
+temp_chart = st.line_chart(initial_temp_df, x='Waktu', y='Suhu', use_container_width=True)
+
+st.subheader("Data Kelembaban (Real-time)")
+humidity_chart = st.line_chart(initial_humidity_df, x='Waktu', y='Kelembaban', use_container_width=True)
+
+st.session_state["realtime_charts"] = {
+    "temp": temp_chart,
+    "humidity": humidity_chart,
+    "last_timestamp": initial_df['timestamp'].iloc[-1] if len(initial_df) else None,
+    "added": 0,
+}
+
+# Fungsi untuk menambahkan titik baru ke grafik yang sudah ada
+def append_realtime_rows(df):
+    charts = st.session_state["realtime_charts"]
+    if charts["last_timestamp"] is None:
+        new_df = df.tail(chart_window)
+    else:
+        new_df = df[df['timestamp'] > charts["last_timestamp"]]
+    if new_df.empty:
+        return
+
+    temp_df, humidity_df = chart_frames(new_df)
+    charts["temp"].add_rows(temp_df)
+    charts["humidity"].add_rows(humidity_df)
+    charts["last_timestamp"] = new_df['timestamp'].iloc[-1]
+    charts["added"] += len(new_df)
+
+    if charts["added"] >= max(chart_window, CHART_REBASE_MIN_ROWS):
+        # Buat ulang grafik dengan jendela yang dipilih
+        st.rerun()
+
+# Grafik diperbarui oleh fragment setiap 2 detik tanpa menjalankan ulang seluruh halaman
+# dan tanpa menahan thread script dalam loop
+@st.fragment(run_every=2 if run_charts else None)
+def render_realtime_charts():
+    sensor_poller.touch(st.session_state["session_id"])
+    _, df = sensor_poller.snapshot()
+
+    if df is None or df.empty:
+        if sensor_poller.last_error:
+            st.error(f"Terjadi kesalahan saat mengambil data historis: {sensor_poller.last_error}")
+        else:
+            st.info("Menunggu data sensor...")
+        return
 
-# Placeholder untuk grafik real-time
-temp_chart_placeholder = st.empty()
-humidity_chart_placeholder = st.empty()
-
-# Loop hanya untuk chart
-while run_charts:
-    historical_data = fetch_historical_data()
-
-    if historical_data:
-        df = pd.DataFrame(historical_data)
-        df['timestamp'] = pd.to_datetime(df['timestamp'])
-        df = df.sort_values('timestamp')
+    append_realtime_rows(df)
 
-        temp_df = df[['timestamp', 'temperature']].rename(columns={'timestamp': 'Waktu', 'temperature': 'Suhu'})
-        humidity_df = df[['timestamp', 'humidity']].rename(columns={'timestamp': 'Waktu', 'humidity': 'Kelembaban'})
+render_realtime_charts()
 
-        with temp_chart_placeholder.container():
-            st.subheader("Data Suhu (Real-time)")
-            st.line_chart(temp_df, x='Waktu', y='Suhu', use_container_width=True)
+# Grafik tren rentang panjang: resolusi bucket dipilih otomatis dari rentang yang
+# terlihat, sehingga seminggu data tetap hanya beberapa ratus titik
+st.subheader("Tren Sensor")
+col_range, col_method = st.columns([3, 1])
+view = col_range.selectbox("Rentang Waktu", list(VIEW_RANGES), index=1, key="trend_view")
+use_lttb = col_method.checkbox("LTTB", key="trend_lttb",
+                               help="Pilih titik data mentah yang paling representatif, bukan rata-rata per bucket.")
 
-        with humidity_chart_placeholder.container():
-            st.subheader("Data Kelembaban (Real-time)")
-            st.line_chart(humidity_df, x='Waktu', y='Kelembaban', use_container_width=True)
+try:
+    sync_feed(store, "sensor", data_hub)
+except Exception as e:
+    st.error(f"Terjadi kesalahan saat mengambil data historis: {e}")
 
-    time.sleep(2)
+trend_range = visible_range(store, "sensor", view)
+if trend_range is None:
+    st.info("Belum ada riwayat data sensor.")
+else:
+    resolution, trend_df = rollups.query("sensor", *trend_range, method="lttb" if use_lttb else "rollup")
+    st.caption(resolution_caption(resolution, len(trend_df)))
+    st.altair_chart(rollup_chart(trend_df, resolution, {'temperature': 'Suhu'}, ['orange'], 'Suhu (°C)', height=250),
+                    use_container_width=True)
+    st.altair_chart(rollup_chart(trend_df, resolution, {'humidity': 'Kelembaban'}, ['steelblue'], 'Kelembaban (%)', height=250),
+                    use_container_width=True)
+    st.altair_chart(rollup_chart(trend_df, resolution, {'motion': 'Gerakan'}, ['purple'], 'Proporsi Gerakan', height=200),
+                    use_container_width=True)
@@ -0,0 +1,81 @@
+# bench_batch_inference.py
+# Membandingkan throughput process_frame (satu frame per predict) dengan
+# process_frames (beberapa frame per predict) untuk bobot YOLO11s my_model.pt.
+#
+# Contoh:
+#   python benchmarks/bench_batch_inference.py --model my_model/my_model.pt --video kelas.mp4
+import argparse
+import json
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from script import detection  # noqa: E402
+
+
+# Ambil frame dari video, atau buat frame acak jika video tidak diberikan
+def load_frames(video_path, count, size=(640, 360)):
+    frames = []
+    if video_path:
+        cap = cv2.VideoCapture(video_path)
+        while len(frames) < count:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            frames.append(cv2.resize(frame, size))
+        cap.release()
+    rng = np.random.default_rng(0)
+    while len(frames) < count:
+        frames.append(rng.integers(0, 255, (size[1], size[0], 3), dtype=np.uint8))
+    return frames
+
+
+def bench_single(model, frames):
+    start = time.perf_counter()
+    for frame in frames:
+        detection.process_frame(model, frame)
+    return len(frames) / (time.perf_counter() - start)
+
+
+def bench_batch(model, frames, batch_size):
+    start = time.perf_counter()
+    for i in range(0, len(frames), batch_size):
+        detection.process_frames(model, frames[i:i + batch_size])
+    return len(frames) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark inferensi batch vs satu frame")
+    parser.add_argument("--model", default="my_model/my_model.pt")
+    parser.add_argument("--video", default=None)
+    parser.add_argument("--frames", type=int, default=64)
+    parser.add_argument("--batch-sizes", default="2,4,8")
+    parser.add_argument("--json", default=None, help="Simpan hasil ke file JSON")
+    args = parser.parse_args()
+
+    from ultralytics import YOLO
+    model = YOLO(args.model)
+    frames = load_frames(args.video, args.frames)
+
+    # Pemanasan agar waktu inisialisasi model tidak ikut terukur
+    detection.process_frame(model, frames[0])
+
+    results = {"single": bench_single(model, frames)}
+    print(f"satu frame : {results['single']:.2f} fps")
+    for batch_size in [int(b) for b in args.batch_sizes.split(",")]:
+        fps = bench_batch(model, frames, batch_size)
+        results[f"batch_{batch_size}"] = fps
+        print(f"batch {batch_size:<4}: {fps:.2f} fps ({fps / results['single']:.2f}x)")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
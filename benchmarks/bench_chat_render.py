@@ -0,0 +1,109 @@
+# bench_chat_render.py
+# Membandingkan render streaming lama (placeholder.markdown(full_response + "▌")
+# untuk setiap potongan) dengan StreamRenderer yang menggabungkan potongan,
+# memakai klien Groq tiruan. Placeholder tiruan mencatat jumlah render dan total
+# karakter yang dikirim ke browser. Juga menunjukkan ukuran prompt dengan dan
+# tanpa ChatHistoryManager untuk percakapan panjang.
+#
+# Contoh:
+#   python benchmarks/bench_chat_render.py --chars 8000 --chunk-chars 4 --token-delay 0.001
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fake_groq import FakeGroqClient  # noqa: E402
+from script.chat import ChatHistoryManager, StreamRenderer, estimate_tokens  # noqa: E402
+
+
+# Placeholder tiruan: meniru biaya st.markdown yang sebanding dengan panjang teks
+class CountingPlaceholder:
+    def __init__(self):
+        self.renders = 0
+        self.chars_sent = 0
+
+    def markdown(self, text):
+        self.renders += 1
+        self.chars_sent += len(text)
+        text.encode("utf-8")
+
+
+def naive_render(client, placeholder):
+    start = time.perf_counter()
+    first = None
+    full_response = ""
+    for chunk in client.chat.completions.create(model="fake", messages=[], stream=True):
+        content = chunk.choices[0].delta.content or ""
+        if content and first is None:
+            first = time.perf_counter()
+        full_response += content
+        placeholder.markdown(full_response + "▌")
+    placeholder.markdown(full_response)
+    end = time.perf_counter()
+    return {"ttft_ms": (first - start) * 1000, "total_ms": (end - start) * 1000,
+            "renders": placeholder.renders, "chars_sent": placeholder.chars_sent}
+
+
+def coalesced_render(client, placeholder, interval, max_pending_chars):
+    renderer = StreamRenderer(placeholder, interval=interval, max_pending_chars=max_pending_chars).start()
+    renderer.consume(client.chat.completions.create(model="fake", messages=[], stream=True))
+    stats = renderer.stats()
+    return {"ttft_ms": stats["ttft_ms"], "total_ms": stats["total_ms"], "render_ms": stats["render_ms"],
+            "renders": placeholder.renders, "chars_sent": placeholder.chars_sent}
+
+
+# Ukuran prompt (perkiraan token) per giliran untuk percakapan panjang
+def history_growth(turns, budget):
+    answer = "Jawaban asisten tentang kondisi kelas. " * 30
+    manager = ChatHistoryManager(budget=budget, summarizer=lambda previous, messages: "ringkasan " * 50)
+    messages = []
+    unbounded = bounded = 0
+    for turn in range(turns):
+        messages.append({"role": "user", "content": f"Pertanyaan ke-{turn} tentang suhu dan perhatian siswa?"})
+        unbounded = sum(estimate_tokens(m["content"]) for m in messages)
+        manager.build(messages)
+        bounded = manager.stats()["prompt_tokens"]
+        messages.append({"role": "assistant", "content": answer})
+    return {"turns": turns, "unbounded_tokens": unbounded, "bounded_tokens": bounded, **manager.stats()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark render streaming Chatbot")
+    parser.add_argument("--chars", type=int, default=8000, help="Panjang respons")
+    parser.add_argument("--chunk-chars", type=int, default=4)
+    parser.add_argument("--token-delay", type=float, default=0.0)
+    parser.add_argument("--interval", type=float, default=0.05)
+    parser.add_argument("--max-pending-chars", type=int, default=400)
+    parser.add_argument("--turns", type=int, default=40)
+    parser.add_argument("--budget", type=int, default=6000)
+    parser.add_argument("--json", default=None, help="Simpan hasil ke file JSON")
+    args = parser.parse_args()
+
+    text = ("Suhu kelas stabil dan sebagian besar siswa memperhatikan. " * (args.chars // 58 + 1))[:args.chars]
+
+    def client():
+        return FakeGroqClient(text, chunk_chars=args.chunk_chars, token_delay=args.token_delay)
+
+    results = {
+        "naive": naive_render(client(), CountingPlaceholder()),
+        "coalesced": coalesced_render(client(), CountingPlaceholder(), args.interval, args.max_pending_chars),
+        "history": history_growth(args.turns, args.budget),
+    }
+    for name in ("naive", "coalesced"):
+        r = results[name]
+        print(f"{name:<10}: {r['renders']:>6} render | {r['chars_sent'] / 1e6:>8.2f} MB teks | "
+              f"total {r['total_ms']:.1f} ms | TTFT {r['ttft_ms']:.2f} ms")
+    h = results["history"]
+    print(f"riwayat {h['turns']} giliran: {h['unbounded_tokens']} token tanpa batas vs "
+          f"{h['bounded_tokens']} token dengan anggaran {args.budget} ({h['summaries']} kali diringkas)")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,265 @@
+# bench_geometry.py
+# Membandingkan geometri inferensi pada gambar validasi dataset:
+#   current : jalur lama, frame diperkecil ke 640x360 lalu di-letterbox YOLO
+#   WxH     : input persegi panjang sejajar stride (script/geometry.py)
+#   WxH+roi : sama, ditambah ROI area duduk (--roi)
+# Untuk setiap konfigurasi diukur latensi (persiapan + predict + hitung), mAP50
+# terhadap label YOLO pada koordinat gambar asli, dan galat jumlah siswa
+# (memperhatikan/tidak) per gambar, yaitu angka yang dipakai aplikasi.
+# Prediksi memakai ambang confidence aplikasi (PREDICT_CONF), sehingga mAP50 di
+# sini lebih rendah dari hasil val Ultralytics dan hanya untuk perbandingan antar jalur.
+# Untuk konfigurasi ROI, label yang titik tengahnya di luar ROI tidak dihitung.
+#
+# Contoh:
+#   python benchmarks/bench_geometry.py --data data.yaml --sizes 640x384 640x480 auto \
+#       --roi "0,0.3 1,0.3 1,1 0,1" --json geometry.json
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+import yaml
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from script import detection  # noqa: E402
+from script.geometry import InferenceGeometry, parse_roi, rect_size  # noqa: E402
+from script.model_backend import load_model  # noqa: E402
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp")
+
+
+# Daftar (path gambar, path label) split val dari data.yaml Ultralytics
+def val_images(data_path, limit=None):
+    with open(data_path, "r", encoding="utf-8") as f:
+        data = yaml.safe_load(f)
+    root = data.get("path") or os.path.dirname(os.path.abspath(data_path))
+    if not os.path.isabs(root):
+        root = os.path.join(os.path.dirname(os.path.abspath(data_path)), root)
+    sources = data["val"] if isinstance(data["val"], list) else [data["val"]]
+
+    images = []
+    for source in sources:
+        directory = source if os.path.isabs(source) else os.path.join(root, source)
+        images += sorted(
+            path for path in glob.glob(os.path.join(directory, "**", "*"), recursive=True)
+            if path.lower().endswith(IMAGE_EXTENSIONS)
+        )
+    pairs = []
+    for path in images[:limit]:
+        head, name = path.rsplit(os.sep + "images" + os.sep, 1)
+        label = os.path.join(head, "labels", os.path.splitext(name)[0] + ".txt")
+        pairs.append((path, label))
+    return pairs, data.get("names", {})
+
+
+# Label YOLO (cls cx cy w h ternormalisasi) -> array (n, 5): cls, x1, y1, x2, y2 dalam piksel
+def read_labels(path, width, height):
+    if not os.path.exists(path):
+        return np.zeros((0, 5), dtype=np.float32)
+    rows = np.loadtxt(path, ndmin=2, dtype=np.float32)
+    if rows.size == 0:
+        return np.zeros((0, 5), dtype=np.float32)
+    cls, cx, cy, w, h = rows[:, 0], rows[:, 1] * width, rows[:, 2] * height, rows[:, 3] * width, rows[:, 4] * height
+    return np.stack([cls, cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2], axis=1)
+
+
+def box_iou(a, b):
+    x1 = np.maximum(a[:, None, 0], b[None, :, 0])
+    y1 = np.maximum(a[:, None, 1], b[None, :, 1])
+    x2 = np.minimum(a[:, None, 2], b[None, :, 2])
+    y2 = np.minimum(a[:, None, 3], b[None, :, 3])
+    inter = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    return inter / (area_a[:, None] + area_b[None, :] - inter + 1e-9)
+
+
+# Tandai prediksi satu gambar sebagai TP (IoU >= 0.5, kelas sama, tiap label dipakai sekali)
+def match(pred_boxes, pred_cls, pred_conf, gt, iou_threshold=0.5):
+    tp = np.zeros(len(pred_boxes), dtype=bool)
+    if len(pred_boxes) == 0 or len(gt) == 0:
+        return tp
+    iou = box_iou(pred_boxes, gt[:, 1:])
+    used = np.zeros(len(gt), dtype=bool)
+    for i in np.argsort(-pred_conf):
+        candidates = np.where((gt[:, 0] == pred_cls[i]) & ~used & (iou[i] >= iou_threshold))[0]
+        if len(candidates):
+            best = candidates[np.argmax(iou[i, candidates])]
+            used[best] = True
+            tp[i] = True
+    return tp
+
+
+# AP per kelas (interpolasi 101 titik seperti Ultralytics), rata-rata kelas yang punya label
+def mean_ap(records, gt_classes):
+    aps = {}
+    for cls in np.unique(gt_classes):
+        selected = [record for record in records if record[0] == cls]
+        n_gt = int(np.sum(gt_classes == cls))
+        if not selected:
+            aps[int(cls)] = 0.0
+            continue
+        selected.sort(key=lambda record: -record[1])
+        tp = np.array([record[2] for record in selected], dtype=float)
+        tpc, fpc = np.cumsum(tp), np.cumsum(1 - tp)
+        recall = tpc / n_gt
+        precision = tpc / (tpc + fpc)
+        mrec = np.concatenate(([0.0], recall, [1.0]))
+        mpre = np.flip(np.maximum.accumulate(np.flip(np.concatenate(([1.0], precision, [0.0])))))
+        x = np.linspace(0, 1, 101)
+        y = np.interp(x, mrec, mpre)
+        aps[int(cls)] = float(((y[1:] + y[:-1]) / 2 * np.diff(x)).sum())
+    return (float(np.mean(list(aps.values()))) if aps else 0.0), aps
+
+
+# Jalur lama: resize ke 640x360, YOLO me-letterbox ke ukuran model; kotak diskalakan ke frame asli
+def run_current(model, frame, conf):
+    height, width = frame.shape[:2]
+    source = cv2.resize(frame, (640, 360))
+    result = next(iter(model.predict(source=source, conf=conf, stream=True, verbose=False)))
+    scale = np.array([width / 640, height / 360, width / 640, height / 360], dtype=np.float32)
+    return result, None, scale
+
+
+def run_geometry(model, frame, conf, geometry):
+    source, transform = geometry.prepare(frame)
+    result = next(iter(model.predict(source=source, conf=conf, imgsz=geometry.imgsz, stream=True, verbose=False)))
+    return result, transform, None
+
+
+def evaluate(model, pairs, conf, geometry=None, roi=None, warmup=2):
+    first = cv2.imread(pairs[0][0])
+    for _ in range(warmup):
+        if geometry is None:
+            run_current(model, first, conf)
+        else:
+            run_geometry(model, first, conf, geometry)
+
+    timings, records, gt_classes, count_errors = [], [], [], []
+    for image_path, label_path in pairs:
+        frame = cv2.imread(image_path)
+        if frame is None:
+            continue
+        height, width = frame.shape[:2]
+        gt = read_labels(label_path, width, height)
+        if roi is not None and len(gt):
+            polygon = (roi * (width, height)).astype(np.float32)
+            centers = np.stack([(gt[:, 1] + gt[:, 3]) / 2, (gt[:, 2] + gt[:, 4]) / 2], axis=1)
+            inside = [cv2.pointPolygonTest(polygon, (float(x), float(y)), False) >= 0 for x, y in centers]
+            gt = gt[np.array(inside, dtype=bool)]
+
+        start = time.perf_counter()
+        if geometry is None:
+            result, transform, scale = run_current(model, frame, conf)
+        else:
+            result, transform, scale = run_geometry(model, frame, conf, geometry)
+        _, attentive_count, inattentive_count = detection.annotate_result(result, model.names, False, transform)
+        timings.append(time.perf_counter() - start)
+
+        boxes = result.boxes
+        if boxes is None or len(boxes) == 0:
+            xyxy, cls, confs = np.zeros((0, 4), np.float32), np.zeros(0), np.zeros(0)
+        else:
+            xyxy = boxes.xyxy.cpu().numpy()
+            cls = boxes.cls.cpu().numpy()
+            confs = boxes.conf.cpu().numpy()
+            xyxy = transform.to_original(xyxy) if transform is not None else xyxy * scale
+
+        for c, p, t in zip(cls, confs, match(xyxy, cls, confs, gt)):
+            records.append((c, p, t))
+        gt_classes.extend(gt[:, 0].tolist())
+
+        categories, _ = detection.class_tables(model.names)
+        gt_categories = np.bincount(categories[gt[:, 0].astype(np.intp)], minlength=3) if len(gt) else np.zeros(3, int)
+        count_errors.append((abs(attentive_count - gt_categories[0]), abs(inattentive_count - gt_categories[1])))
+
+    timings.sort()
+    errors = np.array(count_errors, dtype=float).reshape(-1, 2)
+    map50, per_class = mean_ap(records, np.array(gt_classes))
+    return {
+        "images": len(timings),
+        "mean_ms": sum(timings) / len(timings) * 1000,
+        "p50_ms": timings[len(timings) // 2] * 1000,
+        "p95_ms": timings[min(len(timings) - 1, int(len(timings) * 0.95))] * 1000,
+        "fps": len(timings) / sum(timings),
+        "mAP50": map50,
+        "AP50_per_class": {str(model.names.get(c, c)): ap for c, ap in per_class.items()},
+        "count_mae_attentive": float(errors[:, 0].mean()) if len(errors) else 0.0,
+        "count_mae_inattentive": float(errors[:, 1].mean()) if len(errors) else 0.0,
+    }
+
+
+def parse_size(text, sample_shape):
+    if text == "auto":
+        height, width = sample_shape[:2]
+        return rect_size(width, height)
+    width, height = text.lower().split("x")
+    return int(width), int(height)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark geometri inferensi (persegi panjang dan ROI)")
+    parser.add_argument("--weights", default="my_model/my_model.pt")
+    parser.add_argument("--backend", default="pytorch")
+    parser.add_argument("--data", required=True, help="data.yaml dengan split val dan label YOLO")
+    parser.add_argument("--sizes", nargs="+", default=["640x384", "auto"],
+                        help="Ukuran input LEBARxTINGGI atau 'auto' (mengikuti rasio gambar val pertama)")
+    parser.add_argument("--roi", default=None, help="Poligon ROI ternormalisasi, misalnya '0,0.3 1,0.3 1,1 0,1'")
+    parser.add_argument("--limit", type=int, default=None, help="Jumlah maksimum gambar val")
+    parser.add_argument("--conf", type=float, default=detection.PREDICT_CONF)
+    parser.add_argument("--json", default=None, help="Simpan hasil ke file JSON")
+    args = parser.parse_args()
+
+    pairs, _ = val_images(args.data, args.limit)
+    if not pairs:
+        sys.exit("Tidak ada gambar val ditemukan")
+    sample_shape = cv2.imread(pairs[0][0]).shape
+    roi = parse_roi(args.roi)
+
+    configs = [("current", None, None)]
+    for text in args.sizes:
+        size = parse_size(text, sample_shape)
+        if any(name == f"{size[0]}x{size[1]}" for name, _, _ in configs):
+            continue
+        configs.append((f"{size[0]}x{size[1]}", InferenceGeometry(size), None))
+        if roi is not None:
+            configs.append((f"{size[0]}x{size[1]}+roi", InferenceGeometry(size, roi), roi))
+
+    models = {}
+    results = {"images": len(pairs), "conf": args.conf, "roi": args.roi, "configs": {}}
+    for name, geometry, config_roi in configs:
+        # Backend hasil ekspor butuh model dengan ukuran input yang sama
+        imgsz = None if geometry is None or args.backend == "pytorch" else geometry.imgsz
+        if imgsz not in models:
+            models[imgsz] = load_model(args.backend, weights=args.weights, imgsz=imgsz)
+        result = evaluate(models[imgsz], pairs, args.conf, geometry, config_roi)
+        if geometry is not None:
+            result["input_pixels"] = geometry.size[0] * geometry.size[1]
+            result["coverage"] = float(geometry.coverage(sample_shape[1], sample_shape[0]))
+        else:
+            # PyTorch me-letterbox 640x360 ke 640x384 (padding minimum), backend ekspor ke 640x640
+            result["input_pixels"] = 640 * (384 if args.backend == "pytorch" else 640)
+            result["coverage"] = 640 * 360 / result["input_pixels"]
+        results["configs"][name] = result
+
+    baseline = results["configs"]["current"]
+    for name, result in results["configs"].items():
+        result["speedup_vs_current"] = baseline["mean_ms"] / result["mean_ms"]
+        result["delta_mAP50"] = result["mAP50"] - baseline["mAP50"]
+        print(f"{name:<14}: {result['mean_ms']:.1f} ms (p95 {result['p95_ms']:.1f}) | {result['fps']:.2f} fps | "
+              f"{result['speedup_vs_current']:.2f}x | mAP50 {result['mAP50']:.4f} ({result['delta_mAP50']:+.4f}) | "
+              f"MAE jumlah M {result['count_mae_attentive']:.2f} / TM {result['count_mae_inattentive']:.2f} | "
+              f"piksel berguna {result['coverage']:.0%}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
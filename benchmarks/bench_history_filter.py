@@ -0,0 +1,96 @@
+# bench_history_filter.py
+# Membandingkan pemfilteran tanggal lama di halaman Riwayat
+# (df['timestamp'].dt.strftime('%Y-%m-%d') == tanggal, lalu seluruh hasil
+# dikirim ke st.dataframe) dengan indeks waktu terurut + searchsorted +
+# paginasi/downsampling dari script/history.py, pada riwayat sintetis
+# per detik dengan jumlah baris yang bervariasi.
+#
+# Contoh:
+#   python benchmarks/bench_history_filter.py --rows 100000 1000000 --json hasil.json
+import argparse
+import datetime
+import json
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from script.history import build_time_index, downsample, paginate, slice_day  # noqa: E402
+
+
+# Riwayat sensor sintetis: satu baris per detik, berakhir pada end_date
+def synthetic_history(rows, end_date, seed=0):
+    rng = np.random.default_rng(seed)
+    end = pd.Timestamp(end_date) + pd.Timedelta(days=1)
+    timestamps = pd.date_range(end=end - pd.Timedelta(seconds=1), periods=rows, freq="s")
+    return pd.DataFrame({
+        "timestamp": timestamps,
+        "temperature": rng.normal(28.0, 1.5, rows),
+        "humidity": rng.normal(65.0, 5.0, rows),
+        "motion": rng.integers(0, 2, rows),
+    })
+
+
+# Cara lama: bandingkan string tanggal per baris, tampilkan semua hasil
+def old_filter(df, date):
+    selected_date_str = date.strftime('%Y-%m-%d')
+    filtered_df = df[df['timestamp'].dt.strftime('%Y-%m-%d') == selected_date_str]
+    return filtered_df
+
+
+def new_filter(indexed, date, page_size, summary):
+    day = slice_day(indexed, date)
+    return downsample(day, page_size) if summary else paginate(day, 1, page_size)
+
+
+def timed(fn, repeat):
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark pemfilteran tanggal halaman Riwayat")
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--page-size", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", default=None, help="Simpan hasil ke file JSON")
+    args = parser.parse_args()
+
+    date = datetime.date(2025, 3, 1)
+    results = []
+    print(f"{'baris':>10} {'lama (ms)':>10} {'indeks (ms)':>12} {'halaman (ms)':>13} {'ringkas (ms)':>13} {'baris tampil lama':>18}")
+    for rows in args.rows:
+        df = synthetic_history(rows, date)
+        old_s, old_result = timed(lambda: old_filter(df, date), args.repeat)
+        index_s, indexed = timed(lambda: build_time_index(df), args.repeat)
+        page_s, _ = timed(lambda: new_filter(indexed, date, args.page_size, False), args.repeat)
+        summary_s, _ = timed(lambda: new_filter(indexed, date, args.page_size, True), args.repeat)
+        results.append({
+            "rows": rows,
+            "old_filter_s": old_s,
+            "build_index_s": index_s,
+            "page_s": page_s,
+            "summary_s": summary_s,
+            "old_rows_rendered": len(old_result),
+            "new_rows_rendered": min(len(old_result), args.page_size),
+        })
+        print(f"{rows:>10} {old_s * 1000:>10.2f} {index_s * 1000:>12.2f} {page_s * 1000:>13.3f} "
+              f"{summary_s * 1000:>13.3f} {len(old_result):>18}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"page_size": args.page_size, "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+# bench_history_ingest.py
+# Membandingkan pengambilan riwayat halaman Riwayat dari server REST tiruan
+# (benchmarks/fake_api.py) dengan payload besar:
+#   lama      : /data/sensor lalu /data/streamlit berurutan; seluruh body
+#               di-buffer, response.json() menjadi list of dict, lalu disimpan
+#   streaming : kedua feed bersamaan (sync_feeds); body dibaca dengan
+#               iter_content dan di-parse langsung ke array kolom bertipe
+# Penulisan ke penyimpanan kolom sama untuk kedua mode. Setiap percobaan berjalan
+# di proses anak baru ke penyimpanan kosong, sehingga puncak RSS hanya
+# mencerminkan satu kali ingest. Server tiruan berjalan di proses induk.
+#
+# Contoh:
+#   python benchmarks/bench_history_ingest.py --rows 100000 500000 --latency 0.2 --json hasil.json
+import argparse
+import json
+import os
+import resource
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+FEEDS = ["sensor", "streamlit"]
+MODES = ["lama", "streaming"]
+
+
+# Puncak RSS proses ini dalam MB. Di Linux dibaca dari VmHWM, karena ru_maxrss
+# proses anak ikut mewarisi puncak proses induk (server tiruan) saat fork+exec.
+def peak_rss_mb():
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    # ru_maxrss: KB di Linux, byte di macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+# Dijalankan di proses anak: satu kali ingest kedua feed ke penyimpanan baru
+def run_child(mode, url):
+    from script.data_hub import DataHub
+    from script.sensor_api import SensorHistoryClient
+    from script.timeseries_store import FEED_ENDPOINTS, TimeSeriesStore, sync_feeds
+
+    root = tempfile.mkdtemp(prefix="edudetect-ingest-")
+    try:
+        store = TimeSeriesStore(root)
+        hub = DataHub(base_url=url)
+        baseline = peak_rss_mb()
+        start = time.perf_counter()
+        if mode == "lama":
+            for feed in FEEDS:
+                client = SensorHistoryClient(FEED_ENDPOINTS[feed], base_url=url, session=hub.session)
+                store.append(feed, client.fetch(since=store.last_timestamp(feed)))
+        else:
+            for feed, error in sync_feeds(store, FEEDS, hub).items():
+                if error is not None:
+                    raise RuntimeError(f"{feed}: {error}")
+        elapsed = time.perf_counter() - start
+        peak = peak_rss_mb()
+        return {
+            "wall_ms": elapsed * 1000,
+            "peak_rss_mb": peak,
+            "delta_rss_mb": peak - baseline,
+            "rows": {feed: len(store.read_all(feed)) for feed in FEEDS},
+        }
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def run_trial(mode, url):
+    output = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--child", mode, "--url", url],
+        check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def bench(rows, modes, repeat, latency):
+    from benchmarks.fake_api import start_server, stop_server
+
+    server, url = start_server(sensor_rows=rows, detection_rows=rows, latency=latency)
+    try:
+        payload_mb = sum(len(server.dataset.query(feed)) for feed in FEEDS) / (1024 * 1024)
+        results = {}
+        for mode in modes:
+            trials = [run_trial(mode, url) for _ in range(repeat)]
+            expected = {feed: rows for feed in FEEDS}
+            if any(trial["rows"] != expected for trial in trials):
+                raise RuntimeError(f"{mode}: jumlah baris tidak sesuai ({trials[0]['rows']})")
+            results[mode] = {
+                "wall_ms": statistics.median(trial["wall_ms"] for trial in trials),
+                "peak_rss_mb": max(trial["peak_rss_mb"] for trial in trials),
+                "delta_rss_mb": max(trial["delta_rss_mb"] for trial in trials),
+            }
+        return {"rows": rows, "payload_mb": payload_mb, "latency_s": latency, "modes": results}
+    finally:
+        stop_server(server)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ingest riwayat: berurutan+json() vs bersamaan+streaming")
+    parser.add_argument("--rows", type=int, nargs="+", default=[100000, 500000], help="Jumlah record per feed")
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=MODES)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--latency", type=float, default=0.0, help="Jeda buatan server per GET (detik)")
+    parser.add_argument("--json", help="Simpan hasil ke file JSON")
+    parser.add_argument("--child", choices=MODES, help=argparse.SUPPRESS)
+    parser.add_argument("--url", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_child(args.child, args.url)))
+        return
+
+    results = []
+    for rows in args.rows:
+        result = bench(rows, args.modes, args.repeat, args.latency)
+        results.append(result)
+        print(f"\n{rows} record per feed ({result['payload_mb']:.1f} MB JSON total, latency {args.latency}s)")
+        print(f"{'mode':<10} {'wall ms':>10} {'puncak RSS MB':>14} {'+RSS MB':>9}")
+        for mode, stats in result["modes"].items():
+            print(f"{mode:<10} {stats['wall_ms']:>10.1f} {stats['peak_rss_mb']:>14.1f} {stats['delta_rss_mb']:>9.1f}")
+        if "lama" in result["modes"] and "streaming" in result["modes"]:
+            old, new = result["modes"]["lama"], result["modes"]["streaming"]
+            print(f"waktu {old['wall_ms'] / new['wall_ms']:.2f}x lebih cepat, "
+                  f"tambahan memori {old['delta_rss_mb'] / max(new['delta_rss_mb'], 0.1):.1f}x lebih kecil")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
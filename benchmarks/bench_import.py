@@ -0,0 +1,83 @@
+# bench_import.py
+# Mengukur waktu cold-start impor script.langchain (modul yang diimpor oleh
+# Dashboard.py dan pages/Analysis.py saat `streamlit run Dashboard.py`).
+# Setiap pengukuran berjalan di proses Python baru. Dengan --baseline, versi
+# modul dari revisi git lain (misalnya sebelum inisialisasi lazy) ikut diukur.
+#
+# Contoh:
+#   python benchmarks/bench_import.py --runs 5 --baseline HEAD~1
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SNIPPET = (
+    "import time; start = time.perf_counter(); "
+    "import script.langchain; "
+    "print(time.perf_counter() - start)"
+)
+
+
+# Salin folder script/ dari revisi git tertentu ke folder sementara
+def checkout_script_dir(ref):
+    target = tempfile.mkdtemp(prefix="bench_import_")
+    archive = subprocess.run(
+        ["git", "archive", ref, "script"], cwd=ROOT, check=True, capture_output=True
+    ).stdout
+    subprocess.run(["tar", "-x", "-C", target], input=archive, check=True)
+    return target
+
+
+def measure(root, runs):
+    env = dict(os.environ)
+    # Host yang tidak dapat dijangkau: impor tidak boleh menunggu MongoDB
+    env.setdefault("MONGO_URI", "mongodb://10.255.255.1:27017/?serverSelectionTimeoutMS=2000")
+    env.setdefault("EDUDETECT_CACHE_DIR", tempfile.mkdtemp(prefix="bench_import_cache_"))
+    timings = []
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-c", SNIPPET], cwd=root, env=env, capture_output=True, text=True
+        )
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr.strip().splitlines()[-1])
+        timings.append(float(result.stdout.strip().splitlines()[-1]))
+    return {
+        "median_s": statistics.median(timings),
+        "min_s": min(timings),
+        "max_s": max(timings),
+        "runs": runs,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark waktu impor script.langchain")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--baseline", default=None, help="Revisi git pembanding, misalnya HEAD~1")
+    parser.add_argument("--json", default=None, help="Simpan hasil ke file JSON")
+    args = parser.parse_args()
+
+    results = {"current": measure(ROOT, args.runs)}
+    print(f"sekarang  : {results['current']['median_s'] * 1000:.1f} ms (median dari {args.runs})")
+
+    if args.baseline:
+        baseline_root = checkout_script_dir(args.baseline)
+        try:
+            results["baseline"] = measure(baseline_root, args.runs)
+        finally:
+            shutil.rmtree(baseline_root, ignore_errors=True)
+        speedup = results["baseline"]["median_s"] / results["current"]["median_s"]
+        print(f"{args.baseline:<10}: {results['baseline']['median_s'] * 1000:.1f} ms ({speedup:.1f}x lebih lambat)")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+# bench_metrics_overhead.py
+# Mengukur biaya instrumentasi script/metrics.py per pencatatan: timer() dan
+# @timed dibandingkan dengan fungsi kosong, dengan dan tanpa registry sesi.
+# Dipakai untuk memastikan instrumentasi aman dibiarkan aktif di produksi.
+#
+# Contoh:
+#   python benchmarks/bench_metrics_overhead.py --iterations 200000
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from script import metrics  # noqa: E402
+
+
+def noop():
+    return None
+
+
+@metrics.timed("bench_decorated")
+def decorated():
+    return None
+
+
+def run_timer():
+    with metrics.timer("bench_timer"):
+        pass
+
+
+def measure(func, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark overhead instrumentasi metrics")
+    parser.add_argument("--iterations", type=int, default=200000)
+    parser.add_argument("--json", default=None, help="Simpan hasil ke file JSON")
+    args = parser.parse_args()
+
+    results = {"baseline_us": measure(noop, args.iterations)}
+    results["timer_us"] = measure(run_timer, args.iterations)
+    results["decorated_us"] = measure(decorated, args.iterations)
+
+    # Dengan registry sesi aktif setiap pencatatan masuk ke dua registry
+    metrics._SESSION_METRICS.set(metrics.MetricsRegistry())
+    results["timer_with_session_us"] = measure(run_timer, args.iterations)
+
+    started = time.perf_counter()
+    text = metrics.PROCESS_METRICS.prometheus_text()
+    results["export_ms"] = (time.perf_counter() - started) * 1000
+    results["export_bytes"] = len(text)
+
+    for key, value in results.items():
+        print(f"{key:<24}: {value:.3f}" if isinstance(value, float) else f"{key:<24}: {value}")
+    print(f"overhead per tahap      : {results['timer_with_session_us'] - results['baseline_us']:.2f} µs")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
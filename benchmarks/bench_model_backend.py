@@ -0,0 +1,76 @@
+# bench_model_backend.py
+# Membandingkan backend inferensi CPU (PyTorch, ONNX Runtime, OpenVINO FP32/INT8)
+# untuk bobot YOLO11s my_model.pt: latensi per frame, throughput, dan selisihnya
+# terhadap PyTorch. Jika --data diberikan, setiap backend juga divalidasi pada
+# split val dan mAP-nya dibandingkan dengan epoch terakhir di
+# my_model/train/results.csv (mAP50 0.9827, mAP50-95 0.81068).
+# Dataset yang sama dipakai sebagai set kalibrasi untuk ekspor INT8.
+#
+# Contoh:
+#   python benchmarks/bench_model_backend.py --weights my_model/my_model.pt \
+#       --backends pytorch onnx openvino openvino-int8 --data data.yaml --video kelas.mp4
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_batch_inference import load_frames  # noqa: E402
+from script.model_backend import BACKENDS, load_model, measure_latency, reference_metrics, validate  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark backend inferensi CPU")
+    parser.add_argument("--weights", default="my_model/my_model.pt")
+    parser.add_argument("--backends", nargs="+", default=list(BACKENDS), choices=list(BACKENDS))
+    parser.add_argument("--data", default=None, help="data.yaml untuk validasi dan kalibrasi INT8")
+    parser.add_argument("--video", default=None)
+    parser.add_argument("--frames", type=int, default=50)
+    parser.add_argument("--max-map-drop", type=float, default=0.01,
+                        help="Penurunan mAP50-95 maksimum yang masih diterima")
+    parser.add_argument("--json", default=None, help="Simpan hasil ke file JSON")
+    args = parser.parse_args()
+
+    reference = reference_metrics()
+    frames = load_frames(args.video, args.frames)
+    print(f"acuan results.csv (epoch {reference['epoch']}): "
+          f"mAP50 {reference['mAP50']:.4f} | mAP50-95 {reference['mAP50-95']:.4f}")
+
+    results = {"reference": reference, "backends": {}}
+    for backend in args.backends:
+        try:
+            model = load_model(backend, weights=args.weights, data=args.data)
+        except Exception as e:
+            print(f"{backend:<14}: gagal dimuat ({e})")
+            results["backends"][backend] = {"error": str(e)}
+            continue
+
+        result = measure_latency(model, frames)
+        if args.data:
+            result.update(validate(model, args.data, reference=reference))
+            result["accuracy_ok"] = -result["delta_mAP50-95"] <= args.max_map_drop
+        results["backends"][backend] = result
+
+    baseline = results["backends"].get("pytorch", {}).get("mean_ms")
+    for backend, result in results["backends"].items():
+        if "error" in result:
+            continue
+        if baseline:
+            result["speedup_vs_pytorch"] = baseline / result["mean_ms"]
+        line = (f"{backend:<14}: {result['mean_ms']:.1f} ms/frame (p95 {result['p95_ms']:.1f} ms) | "
+                f"{result['fps']:.2f} fps")
+        if baseline:
+            line += f" | {result['speedup_vs_pytorch']:.2f}x vs PyTorch"
+        if "mAP50-95" in result:
+            line += (f" | mAP50-95 {result['mAP50-95']:.4f} ({result['delta_mAP50-95']:+.4f})"
+                     f"{'' if result['accuracy_ok'] else ' TURUN MELEWATI BATAS'}")
+        print(line)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
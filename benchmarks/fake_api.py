@@ -0,0 +1,181 @@
+# fake_api.py
+# Server REST tiruan untuk endpoint samsung.yogserver.web.id yang dipakai aplikasi:
+#   GET  /data/latest            : record sensor terbaru
+#   GET  /data/sensor            : riwayat sensor (filter since/start/end/limit)
+#   GET  /data/streamlit         : riwayat deteksi siswa (filter yang sama)
+#   POST /data/post/streamlit    : log deteksi (satu objek atau array)
+# Data dibangkitkan secara deterministik dan tersebar merata sepanjang satu hari.
+# Arahkan aplikasi ke server ini dengan EDUDETECT_API_URL=<base_url>.
+#
+# Contoh:
+#   python benchmarks/fake_api.py --port 8082 --sensor-rows 10000
+import argparse
+import datetime
+import json
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+
+
+def _timestamps(rows, day):
+    start = datetime.datetime.combine(day, datetime.time())
+    step = 86400 / max(1, rows)
+    return [start + datetime.timedelta(seconds=i * step) for i in range(rows)]
+
+
+def sensor_records(rows, day=None, seed=0):
+    day = day or datetime.date.today()
+    rng = np.random.default_rng(seed)
+    temperature = np.round(27 + 3 * np.sin(np.linspace(0, 2 * np.pi, rows)) + rng.normal(0, 0.3, rows), 2)
+    humidity = np.round(60 + rng.normal(0, 2, rows), 2)
+    motion = rng.integers(0, 2, rows)
+    return [
+        {"timestamp": ts.isoformat(), "temperature": float(t), "humidity": float(h), "motion": int(m)}
+        for ts, t, h, m in zip(_timestamps(rows, day), temperature, humidity, motion)
+    ]
+
+
+def detection_records(rows, day=None, seed=0):
+    day = day or datetime.date.today()
+    rng = np.random.default_rng(seed + 1)
+    attentive = rng.integers(5, 25, rows)
+    inattentive = rng.integers(0, 8, rows)
+    return [
+        {"timestamp": ts.isoformat(), "attentive_count": int(a), "inattentive_count": int(i)}
+        for ts, a, i in zip(_timestamps(rows, day), attentive, inattentive)
+    ]
+
+
+# Dataset yang disajikan server; bisa diganti saat server berjalan (set_rows)
+class FakeDataset:
+    def __init__(self, sensor_rows=1000, detection_rows=1000, day=None):
+        self.lock = threading.Lock()
+        self.posted = 0
+        self.requests = 0
+        self.set_rows(sensor_rows, detection_rows, day)
+
+    def set_rows(self, sensor_rows, detection_rows, day=None):
+        feeds = {
+            "sensor": sensor_records(sensor_rows, day),
+            "streamlit": detection_records(detection_rows, day),
+        }
+        with self.lock:
+            self.feeds = feeds
+            # Kunci urut untuk filter since/start/end (string ISO dengan format sama dapat dibandingkan)
+            self.keys = {feed: [record["timestamp"] for record in records] for feed, records in feeds.items()}
+            self.payloads = {}
+
+    def query(self, feed, since=None, start=None, end=None, limit=None):
+        with self.lock:
+            self.requests += 1
+            records, keys = self.feeds[feed], self.keys[feed]
+            if since is None and start is None and end is None and limit is None:
+                # Respons tanpa filter di-cache sebagai bytes JSON
+                payload = self.payloads.get(feed)
+                if payload is None:
+                    payload = self.payloads[feed] = json.dumps(records).encode()
+                return payload
+            lo = 0
+            if since is not None:
+                lo = bisect_right(keys, _normalize(since))
+            if start is not None:
+                lo = max(lo, bisect_left(keys, _normalize(start)))
+            hi = bisect_right(keys, _normalize(end)) if end is not None else len(keys)
+            selected = records[lo:hi]
+            if limit is not None:
+                selected = selected[-int(limit):]
+            return json.dumps(selected).encode()
+
+    def latest(self):
+        with self.lock:
+            records = self.feeds["sensor"]
+            return json.dumps(records[-1] if records else {}).encode()
+
+    def post(self, body):
+        data = json.loads(body or b"null")
+        with self.lock:
+            self.posted += len(data) if isinstance(data, list) else 1
+
+
+def _normalize(value):
+    return datetime.datetime.fromisoformat(value.replace("Z", "+00:00")).replace(tzinfo=None).isoformat()
+
+
+class FakeAPIHandler(BaseHTTPRequestHandler):
+    dataset = None
+    latency = 0.0
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, body, status=200):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.latency:
+            time.sleep(self.latency)
+        url = urlsplit(self.path)
+        params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        if url.path == "/data/latest":
+            self._send(self.dataset.latest())
+        elif url.path in ("/data/sensor", "/data/streamlit"):
+            feed = url.path.rsplit("/", 1)[1]
+            self._send(self.dataset.query(
+                feed, params.get("since"), params.get("start"), params.get("end"), params.get("limit")
+            ))
+        else:
+            self.send_error(404)
+
+    def do_POST(self):
+        if urlsplit(self.path).path != "/data/post/streamlit":
+            self.send_error(404)
+            return
+        length = int(self.headers.get("Content-Length") or 0)
+        self.dataset.post(self.rfile.read(length))
+        self._send(b'{"status": "ok"}', status=201)
+
+
+# Jalankan server di thread latar belakang; mengembalikan (server, base_url).
+# Dataset bisa diakses lewat server.dataset. latency: jeda buatan per GET (detik).
+def start_server(port=0, sensor_rows=1000, detection_rows=1000, day=None, latency=0.0):
+    dataset = FakeDataset(sensor_rows, detection_rows, day)
+    handler = type("Handler", (FakeAPIHandler,), {"dataset": dataset, "latency": latency})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    server.dataset = dataset
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def stop_server(server):
+    server.shutdown()
+    server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Server REST EduDetect tiruan")
+    parser.add_argument("--port", type=int, default=8082)
+    parser.add_argument("--sensor-rows", type=int, default=1000)
+    parser.add_argument("--detection-rows", type=int, default=1000)
+    parser.add_argument("--latency", type=float, default=0.0, help="Jeda buatan per GET (detik)")
+    args = parser.parse_args()
+
+    server, base_url = start_server(args.port, args.sensor_rows, args.detection_rows, latency=args.latency)
+    print(f"API tiruan berjalan di {base_url} (EDUDETECT_API_URL={base_url})")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        stop_server(server)
+
+
+if __name__ == "__main__":
+    main()
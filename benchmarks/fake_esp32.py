@@ -0,0 +1,121 @@
+# fake_esp32.py
+# Server ESP32-CAM tiruan untuk pengujian lokal tanpa perangkat keras.
+# Menyajikan /capture (satu JPEG) dan /stream (MJPEG multipart) dengan
+# format yang sama seperti firmware CameraWebServer.
+#
+# Contoh:
+#   python benchmarks/fake_esp32.py --port 8081 --fps 15
+#   -> http://127.0.0.1:8081/capture dan http://127.0.0.1:8081/stream
+import argparse
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import cv2
+import numpy as np
+
+BOUNDARY = "123456789000000000000987654321"
+
+
+# Buat frame sintetis: latar kelas dengan kotak "siswa" yang bergeser tiap frame
+def synthetic_frame(index, width=640, height=480):
+    frame = np.full((height, width, 3), 180, dtype=np.uint8)
+    for row in range(3):
+        for col in range(5):
+            x = 40 + col * 115 + (index * 3 + row * 7) % 20
+            y = 60 + row * 130
+            cv2.rectangle(frame, (x, y), (x + 70, y + 100), (60 + col * 30, 90, 140), -1)
+    cv2.putText(frame, f"frame {index}", (10, height - 15),
+                cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 0), 2)
+    return frame
+
+
+def encode_jpeg(frame, quality=80):
+    ok, encoded = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
+    return encoded.tobytes()
+
+
+class FakeESP32Handler(BaseHTTPRequestHandler):
+    fps = 15.0
+    frames = []
+    include_length = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.startswith("/capture"):
+            jpeg = self.frames[int(time.time() * self.fps) % len(self.frames)]
+            self.send_response(200)
+            self.send_header("Content-Type", "image/jpeg")
+            self.send_header("Content-Length", str(len(jpeg)))
+            self.end_headers()
+            self.wfile.write(jpeg)
+        elif self.path.startswith("/stream"):
+            self.send_response(200)
+            self.send_header("Content-Type", f"multipart/x-mixed-replace;boundary={BOUNDARY}")
+            self.end_headers()
+            self._stream()
+        else:
+            self.send_error(404)
+
+    def _stream(self):
+        index = 0
+        interval = 1.0 / self.fps
+        try:
+            while not self.server.stopped.is_set():
+                jpeg = self.frames[index % len(self.frames)]
+                header = f"\r\n--{BOUNDARY}\r\nContent-Type: image/jpeg\r\n"
+                if self.include_length:
+                    header += f"Content-Length: {len(jpeg)}\r\n"
+                header += f"X-Timestamp: {time.time():.6f}\r\n\r\n"
+                self.wfile.write(header.encode() + jpeg)
+                index += 1
+                time.sleep(interval)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+
+# Jalankan server di thread latar belakang; mengembalikan (server, base_url)
+# source_frames: daftar frame BGR yang disajikan (misalnya dari synthetic_video); bawaan kotak bergeser
+def start_server(port=0, fps=15.0, frame_count=30, width=640, height=480, include_length=True,
+                 source_frames=None):
+    if source_frames is None:
+        source_frames = [synthetic_frame(i, width, height) for i in range(frame_count)]
+    frames = [encode_jpeg(frame) for frame in source_frames]
+    handler = type("Handler", (FakeESP32Handler,), {
+        "fps": fps,
+        "frames": frames,
+        "include_length": include_length,
+    })
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    server.stopped = threading.Event()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def stop_server(server):
+    server.stopped.set()
+    server.shutdown()
+    server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Server ESP32-CAM tiruan")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--fps", type=float, default=15.0)
+    parser.add_argument("--no-length", action="store_true", help="Jangan kirim Content-Length per frame")
+    args = parser.parse_args()
+
+    server, base_url = start_server(args.port, args.fps, include_length=not args.no_length)
+    print(f"ESP32-CAM tiruan berjalan di {base_url}/capture dan {base_url}/stream")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        stop_server(server)
+
+
+if __name__ == "__main__":
+    main()
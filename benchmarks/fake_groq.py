@@ -0,0 +1,51 @@
+# fake_groq.py
+# Klien chat completion tiruan dengan antarmuka yang sama seperti Groq
+# (client.chat.completions.create(..., stream=True)) untuk menguji halaman
+# Chatbot dan script/chat.py tanpa API key maupun jaringan.
+#
+# Contoh:
+#   client = FakeGroqClient("Halo! " * 200, chunk_chars=4, token_delay=0.002)
+#   for chunk in client.chat.completions.create(model="x", messages=[...], stream=True):
+#       print(chunk.choices[0].delta.content)
+import time
+from types import SimpleNamespace
+
+
+def _chunk(content):
+    return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=content))])
+
+
+class _Completions:
+    def __init__(self, client):
+        self.client = client
+
+    def create(self, model=None, messages=None, stream=False, **kwargs):
+        self.client.requests.append({"model": model, "messages": messages, **kwargs})
+        text = self.client.response_for(messages)
+        if not stream:
+            return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=text))])
+        return self._stream(text)
+
+    def _stream(self, text):
+        time.sleep(self.client.first_token_delay)
+        size = self.client.chunk_chars
+        for i in range(0, len(text), size):
+            if i and self.client.token_delay:
+                time.sleep(self.client.token_delay)
+            yield _chunk(text[i:i + size])
+        # Potongan terakhir Groq tidak berisi teks
+        yield _chunk(None)
+
+
+class FakeGroqClient:
+    # response: teks jawaban, atau fungsi messages -> teks
+    def __init__(self, response, chunk_chars=4, token_delay=0.0, first_token_delay=0.0):
+        self.response = response
+        self.chunk_chars = chunk_chars
+        self.token_delay = token_delay
+        self.first_token_delay = first_token_delay
+        self.requests = []
+        self.chat = SimpleNamespace(completions=_Completions(self))
+
+    def response_for(self, messages):
+        return self.response(messages) if callable(self.response) else self.response
@@ -0,0 +1,43 @@
+# fake_mongo.py
+# Koleksi sensor MongoDB tiruan (mongomock) dan model Gemini tiruan untuk
+# mengukur analyze_summary tanpa server MongoDB maupun API Google.
+# mongomock hanya dibutuhkan untuk benchmark: pip install mongomock
+import time
+
+from benchmarks.fake_api import sensor_records
+
+
+# Koleksi samsung.sensor berisi `rows` dokumen sensor sintetis
+def sensor_collection(rows=10000, seed=0):
+    try:
+        import mongomock
+    except ImportError as e:
+        raise RuntimeError("mongomock belum terpasang (pip install mongomock)") from e
+
+    collection = mongomock.MongoClient()["samsung"]["sensor"]
+    add_documents(collection, rows, seed)
+    return collection
+
+
+def add_documents(collection, rows, seed=0):
+    if rows:
+        collection.insert_many(sensor_records(rows, seed=seed))
+
+
+class _Response:
+    def __init__(self, text):
+        self.text = text
+
+
+# Pengganti GenerativeModel: generate_content(prompt) -> .text dengan jeda tetap
+class FakeGemini:
+    def __init__(self, text="Ringkasan kondisi kelas.", delay=0.0):
+        self.text = text
+        self.delay = delay
+        self.calls = 0
+
+    def generate_content(self, prompt):
+        self.calls += 1
+        if self.delay:
+            time.sleep(self.delay)
+        return _Response(self.text)
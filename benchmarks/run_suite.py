@@ -0,0 +1,376 @@
+# run_suite.py
+# Suite benchmark offline untuk jalur deteksi dan data, bisa dijalankan di
+# mesin Linux CPU-only tanpa jaringan. Semua dependensi luar diganti tiruan lokal:
+#   - video kelas sintetis (benchmarks/synthetic_video.py)
+#   - ESP32-CAM tiruan /capture dan /stream (benchmarks/fake_esp32.py)
+#   - API samsung.yogserver.web.id tiruan (benchmarks/fake_api.py)
+#   - koleksi sensor MongoDB mongomock dan Gemini tiruan (benchmarks/fake_mongo.py)
+#
+# Bagian yang diukur:
+#   process_frame   : fps dan latensi inferensi per frame serta throughput batch
+#   e2e             : latensi ambil frame -> inferensi -> encode -> log, mode /capture dan /stream
+#   history         : waktu display_filtered_data (halaman Riwayat via AppTest) vs jumlah baris
+#   analyze_summary : biaya ringkasan statistik Mongo + LLM (dingin, cache, inkremental)
+# Jika model YOLO tidak bisa dimuat, process_frame dilewati dan e2e diukur tanpa inferensi
+# (ditandai "inference": false sehingga tidak dibandingkan dengan hasil yang memakai model).
+#
+# Hasil disimpan sebagai JSON; --compare membandingkan dengan hasil commit lain:
+#   python benchmarks/run_suite.py --json base.json
+#   git checkout fitur && python benchmarks/run_suite.py --json new.json --compare base.json
+import argparse
+import datetime
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks import fake_api, fake_esp32  # noqa: E402
+from benchmarks.fake_mongo import FakeGemini, add_documents, sensor_collection  # noqa: E402
+from benchmarks.synthetic_video import ClassroomScene  # noqa: E402
+
+SECTIONS = ["process_frame", "e2e", "history", "analyze_summary"]
+
+
+# Placeholder Streamlit kosong untuk FrameRenderer di luar Streamlit
+class NullPlaceholder:
+    def image(self, *args, **kwargs):
+        pass
+
+    def markdown(self, *args, **kwargs):
+        pass
+
+
+def latency_stats(seconds):
+    ordered = sorted(seconds)
+    if not ordered:
+        return {"samples": 0}
+    total = sum(ordered)
+    return {
+        "samples": len(ordered),
+        "mean_ms": total / len(ordered) * 1000,
+        "p50_ms": ordered[len(ordered) // 2] * 1000,
+        "p95_ms": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000,
+    }
+
+
+# Server tiruan dan folder cache sementara. Variabel lingkungan harus sudah diatur
+# sebelum modul script.* pertama kali diimpor (alamat API dan CACHE_DIR dibaca saat impor).
+def setup_environment(args, frames):
+    cache_dir = tempfile.mkdtemp(prefix="edudetect_bench_")
+    api_server, api_url = fake_api.start_server(sensor_rows=0, detection_rows=0)
+    camera_server, camera_url = fake_esp32.start_server(fps=args.camera_fps, source_frames=frames)
+    os.environ["EDUDETECT_API_URL"] = api_url
+    os.environ["EDUDETECT_CACHE_DIR"] = cache_dir
+    return {
+        "cache_dir": cache_dir,
+        "api_server": api_server,
+        "api_url": api_url,
+        "camera_server": camera_server,
+        "camera_url": camera_url,
+    }
+
+
+def teardown_environment(env):
+    fake_api.stop_server(env["api_server"])
+    fake_esp32.stop_server(env["camera_server"])
+    shutil.rmtree(env["cache_dir"], ignore_errors=True)
+
+
+def load_model(args):
+    from script.model_backend import load_model as load_backend_model
+
+    try:
+        return load_backend_model(args.backend, weights=args.weights), None
+    except Exception as e:
+        return None, f"{type(e).__name__}: {e}"
+
+
+def bench_process_frame(model, frames, batch_size, warmup=3):
+    from script import detection
+
+    for frame in frames[:warmup]:
+        detection.process_frame(model, frame)
+
+    timings = []
+    for frame in frames:
+        start = time.perf_counter()
+        detection.process_frame(model, frame)
+        timings.append(time.perf_counter() - start)
+    result = latency_stats(timings)
+    result["fps"] = len(timings) / sum(timings)
+
+    start = time.perf_counter()
+    for i in range(0, len(frames), batch_size):
+        detection.process_frames(model, frames[i:i + batch_size])
+    result[f"batch{batch_size}_fps"] = len(frames) / (time.perf_counter() - start)
+    return result
+
+
+# Satu langkah jalur deteksi: inferensi (jika ada model), render JPEG, dan antrekan log
+def _handle_frame(model, frame, renderer, telemetry):
+    from script import detection
+
+    if model is not None:
+        img, attentive_count, inattentive_count = detection.process_frame(model, frame)
+    else:
+        img, attentive_count, inattentive_count = frame, 0, 0
+    renderer.render(img, attentive_count, inattentive_count, force=True)
+    telemetry.submit(attentive_count, inattentive_count)
+
+
+def bench_e2e(model, env, count, stream_timeout=30.0):
+    from script.camera import MJPEGStreamReader, capture_frame
+    from script.rendering import FrameRenderer
+    from script.telemetry import TelemetryShipper
+
+    renderer = FrameRenderer(NullPlaceholder(), NullPlaceholder(), quality=75, max_width=960, display_fps=1000)
+    telemetry = TelemetryShipper(spool_path=None).start()
+    result = {"inference": model is not None}
+
+    # Mode /capture: latensi dari permintaan HTTP sampai log diantrekan
+    timings = []
+    for _ in range(count):
+        start = time.perf_counter()
+        frame = capture_frame(f"{env['camera_url']}/capture", timeout=5)
+        if frame is not None:
+            _handle_frame(model, frame, renderer, telemetry)
+        timings.append(time.perf_counter() - start)
+    result["capture"] = latency_stats(timings)
+    result["capture"]["fps"] = len(timings) / sum(timings)
+
+    # Mode /stream: latensi dari frame selesai di-decode pembaca MJPEG sampai log diantrekan
+    reader = MJPEGStreamReader(f"{env['camera_url']}/stream").start()
+    timings = []
+    started = time.perf_counter()
+    try:
+        while len(timings) < count and time.perf_counter() - started < stream_timeout:
+            frame = reader.read(timeout=2)
+            if frame is None:
+                continue
+            _, _, arrived = reader.snapshot()
+            _handle_frame(model, frame, renderer, telemetry)
+            timings.append(time.perf_counter() - arrived)
+        elapsed = time.perf_counter() - started
+    finally:
+        reader.stop()
+    result["stream"] = latency_stats(timings)
+    result["stream"]["fps"] = len(timings) / elapsed if elapsed else 0.0
+    result["stream"]["frames_dropped"] = max(0, reader.stats()["frames_decoded"] - len(timings))
+
+    telemetry.stop()
+    result["encode_ms"] = renderer.stats()["encode_ms"]
+    result["logs_posted"] = env["api_server"].dataset.posted
+    return result
+
+
+def bench_history(env, row_counts):
+    import streamlit as st
+    from streamlit.testing.v1 import AppTest
+
+    from script.metrics import PROCESS_METRICS
+    from script.timeseries_store import STORE_DIR
+
+    results = {}
+    for rows in row_counts:
+        env["api_server"].dataset.set_rows(rows, 0)
+        shutil.rmtree(STORE_DIR, ignore_errors=True)
+        st.cache_resource.clear()
+        PROCESS_METRICS.reset()
+
+        app = AppTest.from_file(os.path.join(ROOT, "pages", "History.py"), default_timeout=600)
+        start = time.perf_counter()
+        app.run()
+        first_run = time.perf_counter() - start
+        if app.exception:
+            results[str(rows)] = {"error": app.exception[0].value}
+            continue
+
+        # Rerun: data sudah tersinkron, yang diukur hanya pembacaan partisi dan tampilan
+        start = time.perf_counter()
+        app.run()
+        rerun = time.perf_counter() - start
+
+        stages = PROCESS_METRICS.snapshot()["stages"]
+        display = stages.get("display_filtered_data", {})
+        results[str(rows)] = {
+            "first_run_ms": first_run * 1000,
+            "rerun_ms": rerun * 1000,
+            "display_filtered_data_ms": display.get("mean_ms"),
+            "fetch_history_ms": stages.get("fetch_history", {}).get("mean_ms"),
+        }
+    return results
+
+
+def bench_analyze_summary(env, rows, new_rows=100):
+    from script import langchain
+    from script.metrics import PROCESS_METRICS
+
+    collection = sensor_collection(rows)
+    langchain.sensor_stats = langchain.SensorStatsStore(collection)
+    cache = langchain.LLMResponseCache(path=os.path.join(env["cache_dir"], "llm_bench.sqlite"))
+    llm = FakeGemini()
+    PROCESS_METRICS.reset()
+
+    def run():
+        start = time.perf_counter()
+        langchain.analyze_summary(llm=llm, cache=cache)
+        return (time.perf_counter() - start) * 1000
+
+    result = {"rows": rows, "cold_ms": run(), "cached_ms": run()}
+    add_documents(collection, new_rows, seed=1)
+    result["incremental_ms"] = run()
+    aggregate = PROCESS_METRICS.snapshot()["stages"].get("mongo_aggregate", {})
+    result["aggregate_max_ms"] = aggregate.get("max_ms")
+    result["llm_calls"] = llm.calls
+    return result
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+# Ratakan hasil menjadi {"bagian.kunci": angka} untuk dibandingkan
+def flatten(data, prefix=""):
+    flat = {}
+    for key, value in data.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten(value, name + "."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = value
+    return flat
+
+
+# Bandingkan dengan hasil sebelumnya: *_ms lebih kecil lebih baik, *fps lebih besar lebih baik
+def compare(current, baseline, threshold):
+    regressions = []
+    skipped = set()
+    if current["results"].get("e2e", {}).get("inference") != baseline.get("results", {}).get("e2e", {}).get("inference"):
+        print("peringatan: e2e diukur dengan dan tanpa inferensi, bagian e2e tidak dibandingkan")
+        skipped.add("e2e")
+    ignored = {"json", "compare", "threshold", "fail_on_regression", "sections"}
+    old_args, new_args = baseline.get("meta", {}).get("args", {}), current["meta"]["args"]
+    differing = sorted(key for key in set(old_args) | set(new_args)
+                       if key not in ignored and old_args.get(key) != new_args.get(key))
+    if differing:
+        print(f"peringatan: parameter berbeda dari hasil acuan ({', '.join(differing)})")
+
+    old = flatten(baseline.get("results", {}))
+    new = flatten(current["results"])
+    print(f"\nperbandingan dengan {baseline.get('meta', {}).get('revision')} (ambang {threshold:.0%}):")
+    for key in sorted(set(old) & set(new)):
+        if not (key.endswith("_ms") or key.endswith("fps")) or not old[key]:
+            continue
+        if key.split(".", 1)[0] in skipped:
+            continue
+        change = (new[key] - old[key]) / old[key]
+        worse = change > threshold if key.endswith("_ms") else change < -threshold
+        flag = "  REGRESI" if worse else ""
+        print(f"  {key:<52} {old[key]:>10.2f} -> {new[key]:>10.2f} ({change:+.1%}){flag}")
+        if worse:
+            regressions.append(key)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Suite benchmark offline EduDetect")
+    parser.add_argument("--sections", nargs="+", default=SECTIONS, choices=SECTIONS)
+    parser.add_argument("--weights", default=os.path.join(ROOT, "my_model", "my_model.pt"))
+    parser.add_argument("--backend", default="pytorch")
+    parser.add_argument("--frames", type=int, default=60, help="Jumlah frame untuk process_frame dan e2e")
+    parser.add_argument("--batch-size", type=int, default=4)
+    parser.add_argument("--width", type=int, default=640)
+    parser.add_argument("--height", type=int, default=480)
+    parser.add_argument("--camera-fps", type=float, default=15.0)
+    parser.add_argument("--history-rows", default="1000,10000,50000")
+    parser.add_argument("--mongo-rows", type=int, default=5000)
+    parser.add_argument("--json", default=None, help="Simpan hasil ke file JSON")
+    parser.add_argument("--compare", default=None, help="File JSON hasil sebelumnya untuk dibandingkan")
+    parser.add_argument("--threshold", type=float, default=0.15, help="Perubahan relatif yang dianggap regresi")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args()
+
+    frames = ClassroomScene(args.width, args.height).frames(args.frames, args.camera_fps)
+    env = setup_environment(args, frames)
+    output = {
+        "meta": {
+            "revision": git_revision(),
+            "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "args": vars(args),
+        },
+        "results": {},
+    }
+    results = output["results"]
+
+    try:
+        model = None
+        if "process_frame" in args.sections or "e2e" in args.sections:
+            model, error = load_model(args)
+            output["meta"]["model"] = None if model is None else f"{args.backend}:{args.weights}"
+            if error:
+                print(f"model tidak dimuat ({error}); inferensi dilewati")
+
+        if "process_frame" in args.sections:
+            if model is None:
+                results["process_frame"] = {"skipped": "model tidak tersedia"}
+            else:
+                results["process_frame"] = bench_process_frame(model, frames, args.batch_size)
+                r = results["process_frame"]
+                print(f"process_frame   : {r['fps']:.2f} fps | p50 {r['p50_ms']:.1f} ms | p95 {r['p95_ms']:.1f} ms | "
+                      f"batch {args.batch_size}: {r[f'batch{args.batch_size}_fps']:.2f} fps")
+
+        if "e2e" in args.sections:
+            results["e2e"] = r = bench_e2e(model, env, args.frames)
+            for mode in ("capture", "stream"):
+                print(f"e2e {mode:<11} : p50 {r[mode]['p50_ms']:.1f} ms | p95 {r[mode]['p95_ms']:.1f} ms | "
+                      f"{r[mode]['fps']:.2f} fps{'' if r['inference'] else ' (tanpa inferensi)'}")
+
+        if "history" in args.sections:
+            row_counts = [int(value) for value in args.history_rows.split(",") if value]
+            results["history"] = bench_history(env, row_counts)
+            for rows, r in results["history"].items():
+                if "error" in r:
+                    print(f"history {rows:>8} baris: gagal ({r['error']})")
+                    continue
+                print(f"history {rows:>8} baris: display_filtered_data {r['display_filtered_data_ms']:.1f} ms | "
+                      f"rerun {r['rerun_ms']:.1f} ms | run pertama {r['first_run_ms']:.1f} ms")
+
+        if "analyze_summary" in args.sections:
+            try:
+                results["analyze_summary"] = r = bench_analyze_summary(env, args.mongo_rows)
+                print(f"analyze_summary : dingin {r['cold_ms']:.1f} ms | cache {r['cached_ms']:.1f} ms | "
+                      f"inkremental {r['incremental_ms']:.1f} ms ({r['rows']} dokumen)")
+            except RuntimeError as e:
+                results["analyze_summary"] = {"skipped": str(e)}
+                print(f"analyze_summary dilewati: {e}")
+    finally:
+        teardown_environment(env)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(output, f, indent=2, default=str)
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(output, json.load(f), args.threshold)
+        if regressions and args.fail_on_regression:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
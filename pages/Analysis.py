@@ -1,14 +1,22 @@
 import streamlit as st
-from script.langchain import analyze_data
+from script.langchain import analyze_data, warm_up, warm_up_error
+from script.metrics import track_session
 
 
 st.set_page_config(page_title="EduDetect - Analisis", layout="wide")
+track_session()
+warm_up()
 st.title("Analisis Data oleh AI")
 
 # Sidebar
 st.sidebar.header("Analisis Data")
 st.sidebar.write("EduDetect melakukan analisis data menggunakan AI untuk memberikan wawasan yang lebih dalam.")
 
+# Tampilkan kegagalan koneksi awal ke MongoDB/Gemini (warm-up berjalan di latar belakang)
+if warm_up_error():
+    service, error = warm_up_error()
+    st.sidebar.warning(f"Koneksi awal ke {service} gagal: {error}")
+
 if 'analysis_result' not in st.session_state:
     with st.spinner("Mengambil dan menganalisis data..."):
         st.session_state['analysis_result'] = analyze_data()
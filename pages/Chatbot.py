@@ -1,6 +1,8 @@
 import streamlit as st
 from groq import Groq
 from dotenv import load_dotenv
+from script.chat import ChatHistoryManager, StreamRenderer, groq_summarizer
+from script.metrics import observe, track_session
 
 # Memuat variabel lingkungan
 load_dotenv()
@@ -8,6 +10,7 @@ client = Groq()
 
 # Konfigurasi halaman Streamlit
 st.set_page_config(page_title="EduDetect - Chatbot", layout="wide")
+track_session()
 
 # Sidebar Chatbot
 st.sidebar.header("Chatbot")
@@ -20,6 +23,17 @@ st.title("Chatbot AI")
 if "messages" not in st.session_state:
     st.session_state.messages = []
 
+# Riwayat yang dikirim ke model dibatasi anggaran token: pesan lama diringkas oleh model kecil
+if "chat_history" not in st.session_state:
+    st.session_state.chat_history = ChatHistoryManager(budget=6000, keep_recent=6, summarizer=groq_summarizer(client))
+
+# Statistik respons terakhir
+with st.sidebar.expander("Statistik Respons"):
+    if "chat_stats" in st.session_state:
+        st.json(st.session_state.chat_stats)
+    else:
+        st.caption("Belum ada respons.")
+
 # Menampilkan riwayat chat
 for message in st.session_state.messages:
     with st.chat_message(message["role"]):
@@ -37,27 +51,26 @@ if prompt := st.chat_input("Apa yang ingin Anda tanyakan?"):
     # Menampilkan respons asisten dalam kontainer chat
     with st.chat_message("assistant"):
         message_placeholder = st.empty()
-        full_response = ""
+
+        # Potongan respons digabung dan placeholder hanya digambar ulang ~20 kali per detik
+        renderer = StreamRenderer(message_placeholder, interval=0.05, max_pending_chars=400).start()
         
-        # Membuat permintaan ke API Groq
+        # Membuat permintaan ke API Groq (riwayat sudah dipangkas sesuai anggaran token)
         chat_completion = client.chat.completions.create(
             model="llama-3.3-70b-versatile",
-            messages=[
-                {"role": m["role"], "content": m["content"]} 
-                for m in st.session_state.messages
-            ],
+            messages=st.session_state.chat_history.build(st.session_state.messages),
             temperature=0.7,
             max_completion_tokens=4096,
             stream=True,
         )
         
         # Menampilkan respons secara streaming
-        for chunk in chat_completion:
-            content = chunk.choices[0].delta.content or ""
-            full_response += content
-            message_placeholder.markdown(full_response + "▌")
-        
-        message_placeholder.markdown(full_response)
+        full_response = renderer.consume(chat_completion)
+        response_stats = renderer.stats()
+        st.session_state.chat_stats = {**response_stats, **st.session_state.chat_history.stats()}
+        if response_stats["ttft_ms"] is not None:
+            observe("llm_groq_ttft", response_stats["ttft_ms"] / 1000)
+        observe("llm_groq_stream", response_stats["total_ms"] / 1000)
     
     # Menambahkan respons asisten ke riwayat chat
     st.session_state.messages.append({"role": "assistant", "content": full_response})
@@ -2,19 +2,38 @@ import streamlit as st
 import cv2
 import pandas as pd
 import numpy as np
-from ultralytics import YOLO
-import plotly.graph_objects as go
-import threading
 import requests
 import altair as alt
 import datetime
-import urllib.request
+import os
+import shutil
+import tempfile
 import time
+from script import detection
+from script.adaptive import AdaptiveSkipper, FrameDiffGate, InferenceGate, IoTMotionFlag
+from script.batch_video import (
+    JOB_ACTIVE_STATUSES, BatchVideoAnalyzer, create_job, delete_job, get_progress, load_summary, result_paths
+)
+from script.camera import CAPTURE_PORT, MJPEGStreamReader, capture_frame, capture_url_from_stream
+from script.data_hub import get_data_hub
+from script.geometry import GEOMETRY_SIZES, InferenceGeometry, parse_roi, parse_roi_list
+from script.metrics import count, timed, track_session
+from script.model_backend import BACKENDS, DEFAULT_BACKEND, load_model as load_backend_model
+from script.pipeline import FramePipeline
+from script.rendering import FrameRenderer, encode_jpeg
+from script.ring_buffer import TimeSeriesRing
+from script.rollup import VIEW_RANGES, get_rollup_engine, resolution_caption, rollup_chart, visible_range
+from script.scheduler import MultiCameraScheduler, parse_camera_list
+from script.telemetry import TelemetryShipper
+from script.timeseries_store import get_timeseries_store, sync_feed
 
 # Konfigurasi halaman
 st.set_page_config(page_title="Smart Deteksi Kelas", layout="wide")
 st.title("🎥 Smart Deteksi Siswa di Kelas")
 
+# Waktu tiap tahap dicatat per proses dan per sesi (lihat halaman Performance)
+track_session()
+
 # Sidebar
 st.sidebar.header("Sistem Deteksi")
 st.sidebar.write("EduDetect melakukan deteksi siswa di kelas menggunakan AI berbasis Computer Vision secara real-time.")
@@ -22,269 +41,565 @@ st.sidebar.write("EduDetect melakukan deteksi siswa di kelas menggunakan AI berb
 # Tambahkan pilihan sumber input
 input_source = st.sidebar.radio(
     "Pilih Sumber Input:",
-    ["ESP32-CAM Live Stream", "File Video"]
+    ["ESP32-CAM Live Stream", "Multi Kamera Kelas", "File Video"]
 )
 
-# Cache model
-@st.cache_resource
-def load_model():
-    return YOLO("../my_model/my_model.pt")
-
-model = load_model()
-
-# Mapping label
-label_short = {
-    'memperhatikan': 'M',
-    'tidak_memperhatikan': 'TM'
-}
+# Backend inferensi CPU: PyTorch, ONNX Runtime, atau OpenVINO (opsional INT8).
+# Bawaan diambil dari EDUDETECT_MODEL_BACKEND; hasil ekspor dibuat sekali lalu dipakai ulang.
+model_backend = st.sidebar.selectbox(
+    "Backend Inferensi", list(BACKENDS), index=list(BACKENDS).index(DEFAULT_BACKEND)
+)
 
-# Fungsi untuk mengambil data terbaru dari API
+# Geometri inferensi: ukuran input persegi panjang (sejajar stride) dan ROI area duduk.
+# Persegi 640x640 tanpa ROI adalah jalur lama (frame di-letterbox oleh YOLO).
+with st.sidebar.expander("Geometri Inferensi"):
+    inference_size_label = st.selectbox(
+        "Ukuran Input Inferensi", list(GEOMETRY_SIZES),
+        help="Ukuran persegi panjang mengikuti rasio kamera sehingga lebih sedikit piksel padding yang diproses."
+    )
+    roi_text = st.text_input(
+        "ROI Area Duduk (x,y ternormalisasi)", value="",
+        help="Titik poligon dalam koordinat 0-1 dipisah spasi, misalnya: 0,0.35 1,0.35 1,1 0,1. Kosongkan untuk seluruh frame."
+    )
+inference_size = GEOMETRY_SIZES[inference_size_label]
+try:
+    roi = parse_roi(roi_text)
+except ValueError as e:
+    st.sidebar.warning(f"ROI tidak valid ({e}), memakai seluruh frame.")
+    roi = None
+inference_geometry = None if inference_size == (640, 640) and roi is None else InferenceGeometry(inference_size, roi)
+
+# Cache model per backend dan ukuran input (backend hasil ekspor memakai ukuran input tetap)
+@st.cache_resource
+def load_model(backend, imgsz=None):
+    return load_backend_model(backend, imgsz=imgsz)
+
+model_imgsz = None if inference_geometry is None or model_backend == "pytorch" else inference_geometry.imgsz
+try:
+    model = load_model(model_backend, model_imgsz)
+except Exception as e:
+    st.sidebar.warning(f"Backend {model_backend} gagal dimuat ({e}), memakai PyTorch.")
+    model = load_model("pytorch")
+
+# Pengaturan inferensi batch
+batch_size = st.sidebar.slider("Ukuran Batch Inferensi", min_value=1, max_value=8, value=1)
+batch_max_wait_ms = st.sidebar.slider("Maks. Tunggu Batch (ms)", min_value=0, max_value=200, value=50, step=10)
+
+# Jika video tidak ditampilkan, frame tidak perlu disalin dan digambari kotak deteksi
+show_annotated_video = st.sidebar.checkbox("Tampilkan Video Anotasi", value=True)
+
+# Pengaturan tampilan: kualitas/lebar JPEG dan fps tampilan (terpisah dari fps inferensi)
+with st.sidebar.expander("Pengaturan Tampilan"):
+    jpeg_quality = st.slider("Kualitas JPEG", min_value=30, max_value=95, value=75, step=5)
+    display_max_width = st.select_slider("Lebar Maks. Frame (px)", options=[320, 480, 640, 960, 1280], value=960)
+    display_fps = st.slider("FPS Tampilan", min_value=1, max_value=30, value=10)
+
+# Inferensi hanya dijalankan jika frame berubah (dan sensor gerak IoT aktif, untuk kamera live)
+with st.sidebar.expander("Inferensi Adaptif"):
+    motion_gating = st.checkbox("Lewati frame tanpa perubahan", value=True)
+    diff_threshold = st.slider("Ambang perubahan frame (%)", min_value=0.5, max_value=10.0, value=1.0, step=0.5)
+    use_iot_motion_flag = st.checkbox("Gunakan sensor gerak IoT", value=True)
+    max_infer_interval = st.slider("Inferensi paksa tiap (detik)", min_value=1, max_value=30, value=5)
+
+# Jumlah titik terakhir yang ditampilkan pada grafik real-time
+history_window = st.sidebar.slider("Jendela Grafik Real-time (titik)", min_value=10, max_value=300, value=30, step=10)
+
+# Hub data bersama untuk semua halaman dan sesi
+data_hub = get_data_hub()
+
+# Riwayat perhatian siswa disimpan di penyimpanan kolom lokal dan hanya disinkronkan secara inkremental
+store = get_timeseries_store()
+
+# Bucket rollup untuk grafik rentang panjang, dipakai bersama oleh semua sesi
+rollups = get_rollup_engine()
+
+# Fungsi untuk mengambil data terbaru dari API ke penyimpanan lokal.
+# Mengembalikan True jika sudah ada data yang tersimpan.
 def fetch_latest_data():
     try:
-        response = requests.get("https://samsung.yogserver.web.id/data/streamlit")
-        if response.status_code == 200:
-            return response.json()
-        else:
-            st.error(f"Terjadi kesalahan saat mengambil data: Kode status {response.status_code}")
-            return None
+        sync_feed(store, "streamlit", data_hub, max_age=10)
+    except requests.HTTPError as e:
+        st.error(f"Terjadi kesalahan saat mengambil data: Kode status {e.response.status_code}")
     except Exception as e:
         st.error(f"Terjadi kesalahan saat mengambil data: {e}")
-        return None
+    return store.last_timestamp("streamlit") is not None
     
-# Fungsi untuk logging data ke server secara paralel
+# Satu pengirim log per proses: koneksi keep-alive, POST dalam batch,
+# dan antrean file lokal jika server tidak dapat dihubungi
+@st.cache_resource
+def get_telemetry():
+    return TelemetryShipper().start()
+
+telemetry = get_telemetry()
+
+# Fungsi untuk logging data ke server (tidak memblokir, dikirim oleh thread latar belakang)
+@timed("send_log")
 def send_log(attentive_count, inattentive_count):
-    try:
-        requests.post(
-            "https://samsung.yogserver.web.id/data/post/streamlit",
-            json={
-                "attentive_count": attentive_count,
-                "inattentive_count": inattentive_count,
-            },
-            timeout=1
-        )
-    except Exception as e:
-        print(f"Logging gagal: {e}")
+    telemetry.submit(attentive_count, inattentive_count)
 
 # Fungsi ambil gambar dari ESP32
+@timed("get_capture_frame")
 def get_capture_frame(url):
     try:
-        resp = urllib.request.urlopen(url, timeout=5)
-        image_array = np.asarray(bytearray(resp.read()), dtype=np.uint8)
-        frame = cv2.imdecode(image_array, cv2.IMREAD_COLOR)
-        return frame
+        return capture_frame(url, timeout=5)
     except Exception as e:
+        count("capture_errors")
         st.error(f"Gagal mengambil gambar dari ESP32-CAM: {e}")
         return None
 
-# Fungsi untuk memproses frame
-def process_frame(frame, frame_no):
-    results = model.predict(source=frame, conf=0.3, stream=True)
-    
-    attentive_count = 0
-    inattentive_count = 0
-    
-    for r in results:
-        img = r.orig_img.copy()
-        for box in r.boxes:
-            cls_id = int(box.cls[0])
-            label = model.names[cls_id]
-            short_label = label_short.get(label, label)
-
-            if short_label == 'M':
-                color = (0, 255, 0)
-                attentive_count += 1
-            elif short_label == 'TM':
-                color = (0, 0, 255)
-                inattentive_count += 1
-            else:
-                color = (255, 255, 0)
+# Fungsi untuk memproses frame. overlay menyimpan kotak terakhir untuk frame yang tidak diinferensi.
+def process_frame(frame, frame_no, overlay=None):
+    return detection.process_frame(
+        model, frame, annotate=show_annotated_video, geometry=inference_geometry, overlay=overlay
+    )
 
-            x1, y1, x2, y2 = map(int, box.xyxy[0])
-            cv2.rectangle(img, (x1, y1), (x2, y2), color, 2)
-            cv2.putText(img, short_label, (x1, y1 - 10),
-                        cv2.FONT_HERSHEY_SIMPLEX, 0.6, color, 2)
-    
-    # Return processed image and counts
-    return img, attentive_count, inattentive_count
+# Fungsi untuk memproses beberapa frame sekaligus dalam satu panggilan predict.
+# Hanya frame terakhir di batch yang ditampilkan, jadi hanya frame itu yang digambar.
+def process_frames(frames, overlay=None):
+    return detection.process_frames(
+        model, frames, annotate=show_annotated_video, annotate_last_only=True, geometry=inference_geometry,
+        overlay=overlay
+    )
 
-# Fungsi untuk mengupdate visualisasi
-def update_visualizations(img, attentive_count, inattentive_count, video_placeholder, chart_placeholder, text_placeholder, frame_no):
-    total = attentive_count + inattentive_count
-    percent = int((attentive_count / total) * 100) if total > 0 else 0
-
-    # Tampilkan frame
-    img_rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-    video_placeholder.image(img_rgb, channels="RGB", use_container_width=True)
-
-    # Pie chart
-    fig = go.Figure(data=[go.Pie(
-        labels=["Memperhatikan", "Tidak"],
-        values=[attentive_count, inattentive_count],
-        hole=0.6,
-        marker_colors=["lightgreen", "red"],
-        textinfo='none',
-        sort=False,
-        direction='clockwise'
-    )])
-
-    fig.update_layout(
-        showlegend=False,
-        annotations=[dict(text=f"{percent}%", x=0.5, y=0.5, font_size=24, showarrow=False)],
-        margin=dict(t=10, b=10, l=10, r=10),
-        height=300
+# Renderer ringan per tampilan: frame JPEG, indikator HTML di placeholder yang sama,
+# dan pembaruan dibatasi ke fps tampilan (inferensi tetap berjalan pada fps-nya sendiri)
+def make_renderer(video_placeholder, gauge_placeholder):
+    return FrameRenderer(
+        video_placeholder, gauge_placeholder,
+        quality=jpeg_quality, max_width=display_max_width, display_fps=display_fps
     )
 
-    chart_placeholder.plotly_chart(fig, use_container_width=True, key=f"chart_{frame_no}")
-    text_placeholder.markdown(
-        "<h5 style='text-align: center;'>Siswa Memperhatikan</h5>",
-        unsafe_allow_html=True
+# Gate inferensi sesuai pengaturan sidebar; None jika gating dimatikan
+def make_inference_gate(use_iot_motion=True):
+    if not motion_gating:
+        return None
+    motion_flag = IoTMotionFlag(data_hub) if use_iot_motion and use_iot_motion_flag else None
+    return InferenceGate(
+        FrameDiffGate(threshold=diff_threshold / 100), motion_flag, max_interval=max_infer_interval
     )
 
-# Fungsi untuk menampilkan data historis 
+# Fungsi untuk mengupdate visualisasi
+def update_visualizations(renderer, img, attentive_count, inattentive_count, force=False):
+    return renderer.render(img, attentive_count, inattentive_count, force=force)
+
+# Fungsi untuk menampilkan data historis.
+# Resolusi grafik dipilih otomatis dari rentang yang terlihat (rollup min/rata-rata/maks
+# per menit, 15 menit, jam, atau hari), sehingga jumlah titik tetap kecil untuk rentang panjang.
 def display_historical_data():
-    data = fetch_latest_data()
-    if data:
-        st.subheader("Data Historis Perhatian Siswa")
-        chart_data = pd.DataFrame(data)
-        if 'timestamp' in chart_data.columns:
-            chart_data['timestamp'] = pd.to_datetime(chart_data['timestamp'])
-
-            # Ubah nama kolom untuk label Indonesia
-            renamed_data = chart_data.rename(columns={
-                'attentive_count': 'Memperhatikan',
-                'inattentive_count': 'Tidak Memperhatikan'
-            })
-
-            # Ubah format untuk Altair
-            melted_data = renamed_data.melt(
-                id_vars=['timestamp'],
-                value_vars=['Memperhatikan', 'Tidak Memperhatikan'],
-                var_name='Kategori',
-                value_name='Jumlah'
-            )
-
-            # Chart dengan label dan tooltip Bahasa Indonesia
-            chart = alt.Chart(melted_data).mark_line(point=True).encode(
-                x=alt.X('timestamp:T', title='Waktu', axis=alt.Axis(format='%H:%M:%S')),
-                y=alt.Y('Jumlah:Q', title='Jumlah Siswa'),
-                color=alt.Color('Kategori:N', title='Kategori', scale=alt.Scale(domain=['Memperhatikan', 'Tidak Memperhatikan'], range=['green', 'red'])),
-                tooltip=[
-                    alt.Tooltip('timestamp:T', title='Waktu', format='%Y-%m-%d %H:%M:%S'),
-                    alt.Tooltip('Kategori:N', title='Kategori'),
-                    alt.Tooltip('Jumlah:Q', title='Jumlah Siswa')
-                ]
-            ).properties(
-                width='container',
-                height=300
-            ).interactive()
-            
-            st.altair_chart(chart, use_container_width=True)
-        else:
-            st.line_chart(chart_data[['Memperhatikan', 'Tidak Memperhatikan']], use_container_width=True)
+    if not fetch_latest_data():
+        return
+    st.subheader("Data Historis Perhatian Siswa")
+    col_range, col_method = st.columns([3, 1])
+    view = col_range.selectbox("Rentang Waktu", list(VIEW_RANGES), index=1, key="history_view")
+    use_lttb = col_method.checkbox("LTTB", key="history_lttb",
+                                   help="Pilih titik data mentah yang paling representatif, bukan rata-rata per bucket.")
+
+    start, end = visible_range(store, "streamlit", view)
+    resolution, chart_data = rollups.query("streamlit", start, end, method="lttb" if use_lttb else "rollup")
+    if len(chart_data) == 0:
+        st.info("Tidak ada data pada rentang waktu ini.")
+        return
+
+    # Chart dengan label dan tooltip Bahasa Indonesia
+    chart = rollup_chart(
+        chart_data, resolution,
+        {'attentive_count': 'Memperhatikan', 'inattentive_count': 'Tidak Memperhatikan'},
+        ['green', 'red'], 'Jumlah Siswa'
+    )
+    st.altair_chart(chart, use_container_width=True)
+    st.caption(resolution_caption(resolution, len(chart_data)))
+
+# Kolom riwayat deteksi untuk line chart real-time
+HISTORY_COLUMNS = ['Memperhatikan', 'Tidak Memperhatikan']
+
+# Spesifikasi line chart real-time dibangun sekali; setiap pembaruan hanya mengganti datanya.
+# Data disimpan lebar (satu kolom per kategori) dan diubah ke format panjang oleh Vega lewat transform_fold.
+def build_realtime_chart():
+    return alt.Chart().transform_fold(
+        HISTORY_COLUMNS, as_=['Kategori', 'Jumlah']
+    ).mark_line(point=True).encode(
+        x=alt.X('timestamp:T', title='Waktu', axis=alt.Axis(format='%H:%M:%S')),
+        y=alt.Y('Jumlah:Q', title='Jumlah Siswa'),
+        color=alt.Color('Kategori:N', title='Kategori', scale=alt.Scale(domain=HISTORY_COLUMNS, range=['green', 'red'])),
+        tooltip=[
+            alt.Tooltip('timestamp:T', title='Waktu', format='%Y-%m-%d %H:%M:%S'),
+            alt.Tooltip('Kategori:N', title='Kategori'),
+            alt.Tooltip('Jumlah:Q', title='Jumlah Siswa')
+        ]
+    ).properties(
+        width='container',
+        height=300,
+        title="Tren Perhatian Siswa Secara Real-time"
+    ).interactive()
+
+realtime_chart = build_realtime_chart()
+
+# Fungsi untuk menambahkan titik baru dan memperbarui line chart real-time.
+# detection_history adalah TimeSeriesRing: append O(1), jendela terakhir dibaca tanpa salinan.
+def update_realtime_chart(detection_history, attentive_count, inattentive_count, line_chart_placeholder):
+    detection_history.append(datetime.datetime.now(), attentive_count, inattentive_count)
+
+    # Update real-time line chart jika ada data
+    if len(detection_history) > 1:
+        line_chart_placeholder.altair_chart(
+            realtime_chart.properties(data=detection_history.frame()), use_container_width=True
+        )
+
+# Generator tahap decode: jarak antar frame yang diproses ditentukan oleh skipper
+# (berdasarkan latensi inferensi). Frame yang dilewati hanya di-grab tanpa di-decode.
+# Setiap frame yang diambil diberi tanda apakah perlu inferensi (gate perubahan frame).
+# Dengan geometri inferensi, frame tidak diperkecil di sini: geometri memotong ROI dan
+# mengubah ukuran sekali langsung ke ukuran input, dan kotak dipetakan ke frame asli.
+def read_video_frames(cap, skipper, gate=None):
+    frame_no = 0
+    while cap.isOpened():
+        if not skipper.should_process(frame_no):
+            if not cap.grab():
+                break
+            frame_no += 1
+            continue
+
+        ret, frame = cap.read()
+        if not ret:
+            break
+
+        if inference_geometry is None:
+            frame = cv2.resize(frame, (640, 360))
+        yield frame_no, frame, gate is None or gate.decide(frame)
+
+        frame_no += 1
+
+# Frame yang tidak diinferensi ditampilkan dengan kotak deteksi terakhir (jika video anotasi aktif)
+def carried_frame(frame, overlay):
+    return overlay.draw(frame) if show_annotated_video else None
+
+# Fungsi tahap inferensi pipeline. Frame tanpa perubahan tidak diinferensi;
+# jumlah siswa dan kotak deteksi dari inferensi terakhir dipakai ulang (carry forward).
+# Latensi inferensi dicatat ke skipper untuk menyesuaikan jarak frame.
+def make_video_inference(skipper):
+    last_counts = [0, 0]
+    overlay = detection.DetectionOverlay()
+
+    def passthrough(frame_no, frame, display=True):
+        img = carried_frame(frame, overlay) if display else None
+        return frame_no, img, last_counts[0], last_counts[1]
+
+    def infer_one(item):
+        frame_no, frame, needs_inference = item
+        if not needs_inference:
+            return passthrough(frame_no, frame)
+        start = time.perf_counter()
+        img, attentive_count, inattentive_count = process_frame(frame, frame_no, overlay)
+        skipper.record(time.perf_counter() - start)
+        last_counts[:] = [attentive_count, inattentive_count]
+        return frame_no, img, attentive_count, inattentive_count
+
+    def infer_batch(items):
+        to_infer = [item for item in items if item[2]]
+        outputs = {}
+        if to_infer:
+            start = time.perf_counter()
+            results = process_frames([frame for _, frame, _ in to_infer], overlay)
+            skipper.record(time.perf_counter() - start, items=len(to_infer))
+            outputs = {item[0]: result for item, result in zip(to_infer, results)}
+
+        # Seperti frame yang diinferensi, hanya frame terakhir di batch yang digambar
+        processed = []
+        for i, (frame_no, frame, _) in enumerate(items):
+            if frame_no in outputs:
+                img, attentive_count, inattentive_count = outputs[frame_no]
+                last_counts[:] = [attentive_count, inattentive_count]
+                processed.append((frame_no, img, attentive_count, inattentive_count))
+            else:
+                processed.append(passthrough(frame_no, frame, display=i == len(items) - 1))
+        return processed
+
+    return infer_one, infer_batch
+
+# Satu penganalisis batch per backend; worker proses memuat modelnya sendiri
+@st.cache_resource
+def get_batch_analyzer(backend):
+    return BatchVideoAnalyzer(backend=backend)
+
+# Tampilkan hasil analisis batch: ringkasan, grafik per detik, dan file unduhan
+def render_batch_result(job_id, progress):
+    if progress["status"] == "error":
+        st.error(f"Analisis video gagal: {progress.get('error')}")
+        return
+    if progress["status"] == "cancelled":
+        st.warning("Analisis video dibatalkan.")
+        return
+
+    summary = load_summary(job_id) or {}
+    paths = result_paths(job_id)
+    a, b, c = st.columns(3)
+    a.metric("Durasi Video", f"{summary.get('duration_s', 0):.0f} detik", border=True)
+    b.metric("Rata-rata Memperhatikan", f"{summary.get('attention_percent', 0):.0f}%", border=True)
+    c.metric("Waktu Proses", f"{summary.get('processing_s', 0):.1f} detik",
+             f"{summary.get('realtime_factor') or 0:.1f}x waktu nyata", border=True)
+
+    if "csv" in paths:
+        result_df = pd.read_csv(paths["csv"]).rename(columns={
+            'second': 'Detik', 'attentive_count': 'Memperhatikan', 'inattentive_count': 'Tidak Memperhatikan'
+        })
+        st.line_chart(result_df, x='Detik', y=HISTORY_COLUMNS, color=['#008000', '#ff0000'])
+        with open(paths["csv"], "rb") as f:
+            st.download_button("Unduh Hasil per Detik (CSV)", f, file_name=f"analisis_{job_id[:8]}.csv", mime="text/csv")
+    if "video" in paths:
+        with open(paths["video"], "rb") as f:
+            st.download_button("Unduh Video Anotasi", f, file_name=f"anotasi_{job_id[:8]}.mp4", mime="video/mp4")
+
+    # File job dihapus setelah hasil diunduh; job yang tidak dihapus dibersihkan otomatis
+    # oleh cleanup_jobs saat job baru dibuat
+    if st.button("Hapus Hasil Analisis"):
+        delete_job(job_id)
+        st.session_state.pop("video_job", None)
+        st.rerun()
+
+# Format statistik throughput per tahap pipeline
+def format_pipeline_stats(stats):
+    return (
+        f"Decode: {stats['decode']['fps']:.1f} fps | "
+        f"Inferensi: {stats['inference']['fps']:.1f} fps ({stats['inference']['avg_ms']:.0f} ms/frame) | "
+        f"Tampilan: {stats['present']['fps']:.1f} fps | "
+        f"Frame dibuang: {stats['inference']['dropped']}"
+    )
+
+# Format statistik inferensi adaptif: frame skip dinamis dan gerbang inferensi (perubahan frame/gerakan IoT)
+def format_adaptive_stats(skipper_stats, gate):
+    text = ""
+    if skipper_stats is not None:
+        text = (
+            f"Inferensi tiap {skipper_stats['every']} frame (latensi {skipper_stats['latency_ms']:.0f} ms) | "
+            f"Frame dilewati: {skipper_stats['skipped']}"
+        )
+    if gate is not None:
+        stats = gate.stats()
+        iot = {True: "aktif", False: "tidak aktif", None: "-"}[stats['iot_motion']]
+        text += (" | " if text else "") + (
+            f"Inferensi: {stats['inferred']} | Dilewati (statis): {stats['skipped_static']} | "
+            f"Dilewati (tidak ada gerakan IoT): {stats['skipped_idle']} | Sensor gerak: {iot}"
+        )
+    return text
+
+# Format statistik penyajian frame ke browser
+def format_render_stats(stats):
+    return (
+        f"Frame ditampilkan: {stats['rendered']} | Dilewati (batas fps tampilan): {stats['skipped']} | "
+        f"Encode JPEG: {stats['encode_ms']:.1f} ms ({stats['kb_per_frame']:.0f} KB/frame)"
+    )
+
+# Format statistik antrean pengiriman log
+def format_telemetry_stats(stats):
+    return (
+        f"Log terkirim: {stats['sent']} | Antrean log: {stats['queue_depth']} | "
+        f"Antrean lokal: {stats['spool_depth']} | Log dibuang: {stats['dropped']}"
+    )
 
 # Tampilkan antarmuka berdasarkan pilihan sumber input
 if input_source == "File Video":
     # Upload video
     video_file = st.file_uploader("Upload Video MP4", type=["mp4"])
-    
-    if video_file is not None:
-        tfile = open("temp_video.mp4", 'wb')
-        tfile.write(video_file.read())
-        video_path = "temp_video.mp4"
+
+    # Live: video diproses dan ditampilkan frame demi frame di sesi ini.
+    # Batch: seluruh video dianalisis di process pool tanpa tampilan, progres dipantau di halaman.
+    analysis_mode = st.radio(
+        "Mode Analisis",
+        ["Live (tampilkan saat diproses)", "Batch (analisis penuh di latar belakang)"],
+        horizontal=True
+    )
+    batch_mode = analysis_mode.startswith("Batch")
+
+    if video_file is not None and batch_mode:
+        if st.button("Mulai Analisis Batch"):
+            job_id = create_job(video_file)
+            get_batch_analyzer(model_backend).submit(job_id, geometry=inference_geometry)
+            st.session_state["video_job"] = job_id
+
+    if batch_mode and st.session_state.get("video_job"):
+        job_id = st.session_state["video_job"]
+        job_progress = get_progress(job_id)
+        job_running = job_progress is not None and job_progress["status"] in JOB_ACTIVE_STATUSES
+
+        # Progres job dibaca ulang setiap detik selama analisis berjalan
+        @st.fragment(run_every=1 if job_running else None)
+        def render_batch_job():
+            progress = get_progress(job_id)
+            if progress is None:
+                st.warning("Job analisis tidak ditemukan.")
+                return
+            if progress["status"] in JOB_ACTIVE_STATUSES:
+                st.progress(
+                    progress["progress"],
+                    text=f"Menganalisis video... {progress['frames_done']}/{progress.get('frames_total') or '?'} frame "
+                         f"({progress['segments_done']}/{progress.get('segments_total') or '?'} segmen)"
+                )
+                if st.button("Batalkan Analisis"):
+                    get_batch_analyzer(model_backend).cancel(job_id)
+                return
+            if job_running:
+                # Job baru selesai: jalankan ulang halaman untuk berhenti polling dan menampilkan hasil
+                st.rerun()
+            render_batch_result(job_id, progress)
+
+        render_batch_job()
+
+    if video_file is not None and not batch_mode:
+        # File sementara per upload, sehingga sesi lain tidak saling menimpa
+        with tempfile.NamedTemporaryFile(suffix=".mp4", delete=False) as tfile:
+            shutil.copyfileobj(video_file, tfile)
+        video_path = tfile.name
 
         cap = cv2.VideoCapture(video_path)
-        frame_no = 0
 
         col1, col2 = st.columns([2, 1])
         video_placeholder = col1.empty()
-        chart_placeholder = col2.empty()
-        text_placeholder = col2.empty()
+        gauge_placeholder = col2.empty()
         line_chart_placeholder = st.empty()
+        stats_placeholder = st.empty()
+        renderer = make_renderer(video_placeholder, gauge_placeholder)
 
-        process_every_n_frames = 2
         log_every_n_frames = 15
+
+        # Jarak frame menyesuaikan latensi inferensi agar pemrosesan mengikuti fps video
+        skipper = AdaptiveSkipper(cap.get(cv2.CAP_PROP_FPS))
+        gate = make_inference_gate(use_iot_motion=False)
+        infer_video_frame, infer_video_batch = make_video_inference(skipper)
         
         # Data untuk real-time line chart
-        detection_history = {
-            'timestamp': [],
-            'Memperhatikan': [],
-            'Tidak Memperhatikan': []
-        }
-
-        while cap.isOpened():
-            ret, frame = cap.read()
-            if not ret:
-                break
-
-            frame = cv2.resize(frame, (640, 360))
+        detection_history = TimeSeriesRing(history_window, HISTORY_COLUMNS)
+
+        # Pipeline: decode dan inferensi di thread worker, tampilan di thread script.
+        # Antrean hasil membuang frame lama sehingga UI selalu menampilkan frame terbaru.
+        pipeline = FramePipeline(
+            read_video_frames(cap, skipper, gate),
+            infer_video_frame,
+            queue_size=4,
+            drop_frames=False,
+            infer_batch=infer_video_batch if batch_size > 1 else None,
+            batch_size=batch_size,
+            max_wait=batch_max_wait_ms / 1000
+        ).start()
+
+        last_log_bucket = -1
+        try:
+            for frame_no, img, attentive_count, inattentive_count in pipeline.results():
+                # Kirim log tiap N frame di background (frame yang dilewati tahap tampilan tetap terhitung)
+                log_bucket = frame_no // log_every_n_frames
+                if log_bucket != last_log_bucket:
+                    last_log_bucket = log_bucket
+                    send_log(attentive_count, inattentive_count)
 
-            if frame_no % process_every_n_frames == 0:
-                img, attentive_count, inattentive_count = process_frame(frame, frame_no)
-                
-                # Kirim log tiap N frame di background
-                if frame_no % log_every_n_frames == 0:
-                    threading.Thread(
-                        target=send_log,
-                        args=(attentive_count, inattentive_count),
-                        daemon=True
-                    ).start()
-                    
                     # Tambahkan data ke history untuk line chart
-                    current_time = datetime.datetime.now()
-                    detection_history['timestamp'].append(current_time)
-                    detection_history['Memperhatikan'].append(attentive_count)
-                    detection_history['Tidak Memperhatikan'].append(inattentive_count)
-                    
-                    # Batasi jumlah data yang ditampilkan (tampilkan 30 titik terakhir)
-                    if len(detection_history['timestamp']) > 30:
-                        detection_history['timestamp'] = detection_history['timestamp'][-30:]
-                        detection_history['Memperhatikan'] = detection_history['Memperhatikan'][-30:]
-                        detection_history['Tidak Memperhatikan'] = detection_history['Tidak Memperhatikan'][-30:]
-                    
-                    # Update real-time line chart jika ada data
-                    if len(detection_history['timestamp']) > 1:
-                        history_df = pd.DataFrame(detection_history)
-                        
-                        # Ubah format untuk Altair
-                        melted_history = history_df.melt(
-                            id_vars=['timestamp'],
-                            value_vars=['Memperhatikan', 'Tidak Memperhatikan'],
-                            var_name='Kategori',
-                            value_name='Jumlah'
-                        )
-                        
-                        # Buat line chart real-time
-                        real_time_chart = alt.Chart(melted_history).mark_line(point=True).encode(
-                            x=alt.X('timestamp:T', title='Waktu', axis=alt.Axis(format='%H:%M:%S')),
-                            y=alt.Y('Jumlah:Q', title='Jumlah Siswa'),
-                            color=alt.Color('Kategori:N', title='Kategori', scale=alt.Scale(domain=['Memperhatikan', 'Tidak Memperhatikan'], range=['green', 'red'])),
-                            tooltip=[
-                                alt.Tooltip('timestamp:T', title='Waktu', format='%Y-%m-%d %H:%M:%S'),
-                                alt.Tooltip('Kategori:N', title='Kategori'),
-                                alt.Tooltip('Jumlah:Q', title='Jumlah Siswa')
-                            ]
-                        ).properties(
-                            width='container',
-                            height=300,
-                            title="Tren Perhatian Siswa Secara Real-time"
-                        ).interactive()
-                        
-                        line_chart_placeholder.altair_chart(real_time_chart, use_container_width=True)
-
-                update_visualizations(img, attentive_count, inattentive_count, video_placeholder, chart_placeholder, text_placeholder, frame_no)
+                    update_realtime_chart(detection_history, attentive_count, inattentive_count, line_chart_placeholder)
 
-            frame_no += 1
-            cv2.waitKey(1)
-
-        cap.release()
-        st.success("Pemrosesan video selesai!")
+                if update_visualizations(renderer, img, attentive_count, inattentive_count):
+                    stats_placeholder.caption(
+                        format_pipeline_stats(pipeline.stats()) + "  \n" + format_adaptive_stats(skipper.stats(), gate) + "  \n"
+                        + format_render_stats(renderer.stats()) + "  \n" + format_telemetry_stats(telemetry.stats())
+                    )
+        finally:
+            pipeline.stop()
+            pipeline.join(timeout=2)
+            cap.release()
+            os.remove(video_path)
+
+        if pipeline.error is not None:
+            st.error(f"Pemrosesan video gagal: {pipeline.error}")
+        else:
+            st.success("Pemrosesan video selesai!")
 
     # Tampilkan data historis
     display_historical_data()
 
+elif input_source == "Multi Kamera Kelas":
+    # Satu kamera per baris: "nama=url" atau hanya url (/stream atau /capture)
+    camera_text = st.text_area(
+        "Daftar Kamera Kelas",
+        value="Kelas A=http://192.168.100.168:81/stream\nKelas B=http://192.168.100.169/capture",
+        help="Satu kamera per baris dengan format nama=url. URL /stream dibaca sebagai MJPEG, selain itu polling /capture."
+    )
+    # ROI per kamera (nama sama seperti daftar kamera); kamera tanpa ROI memakai ROI sidebar
+    camera_roi_text = st.text_area(
+        "ROI per Kamera (opsional)", value="",
+        help="Satu kamera per baris dengan format nama=x,y x,y ... (koordinat 0-1), misalnya: Kelas A=0,0.3 1,0.3 1,1 0,1"
+    )
+    grid_columns = st.sidebar.slider("Kolom Grid Kamera", min_value=1, max_value=4, value=2)
+    cameras = parse_camera_list(camera_text)
+    try:
+        camera_rois = parse_roi_list(camera_roi_text)
+    except ValueError as e:
+        st.warning(f"ROI per kamera tidak valid ({e}), diabaikan.")
+        camera_rois = {}
+
+    run_multi = st.button("Mulai Deteksi Multi Kamera")
+
+    if run_multi and cameras:
+        # Grid slot per kamera
+        cells = []
+        camera_ids = list(cameras)
+        for row_start in range(0, len(camera_ids), grid_columns):
+            columns = st.columns(grid_columns)
+            for column, camera_id in zip(columns, camera_ids[row_start:row_start + grid_columns]):
+                column.markdown(f"**{camera_id}**")
+                cells.append((column.empty(), column.empty()))
+        summary_placeholder = st.empty()
+
+        stop_button_col = st.columns(3)[1]
+        stop_button = stop_button_col.button("Stop Deteksi")
+
+        # Satu model YOLO dipakai bersama oleh semua kamera; frame dari tiap kamera digabung dalam batch
+        # Semua kamera memakai ukuran input yang sama agar satu batch tetap berukuran seragam
+        geometries = {
+            camera_id: InferenceGeometry(inference_size, camera_rois.get(camera_id, roi))
+            for camera_id in cameras
+        } if inference_geometry is not None or camera_rois else None
+        scheduler = MultiCameraScheduler(
+            model, cameras, batch_size=max(batch_size, len(cameras)), annotate=show_annotated_video,
+            geometries=geometries
+        ).start()
+
+        render_no = 0
+        try:
+            while not stop_button:
+                for (image_placeholder, caption_placeholder), slot in zip(cells, scheduler.snapshot()):
+                    if slot["img"] is not None:
+                        image_placeholder.image(encode_jpeg(slot["img"], jpeg_quality, display_max_width), use_container_width=True)
+                    elif slot["frames"] == 0:
+                        image_placeholder.info("Menunggu frame dari kamera...")
+                    caption_placeholder.caption(
+                        f"Memperhatikan: {slot['attentive_count']} | Tidak: {slot['inattentive_count']} | "
+                        f"{slot['fps']:.1f} fps | latensi {slot['latency_ms']:.0f} ms"
+                    )
+
+                stats = scheduler.stats()
+                summary_placeholder.caption(
+                    f"Batch inferensi: {stats['batches']}" + (f" | Galat: {stats['error']}" if stats['error'] else "")
+                )
+
+                time.sleep(0.2)
+                render_no += 1
+                stop_button = stop_button_col.button("Stop Deteksi", key=f"stop_multi_btn_{render_no}")
+        finally:
+            scheduler.stop()
+
+        st.success("Deteksi multi kamera dihentikan")
+
 else:  # ESP32-CAM Live Stream
+    # Mode stream memakai satu koneksi MJPEG (/stream); mode capture melakukan polling /capture per frame
+    connection_mode = st.radio(
+        "Mode Koneksi ESP32-CAM",
+        ["Stream MJPEG (/stream)", "Capture (/capture)"],
+        horizontal=True
+    )
+    use_stream = connection_mode.startswith("Stream")
+
     # Input URL ESP32-CAM
-    esp_url = st.text_input("Masukkan URL ESP32-CAM", value="http://192.168.100.168/capture")
+    default_url = "http://192.168.100.168:81/stream" if use_stream else "http://192.168.100.168/capture"
+    esp_url = st.text_input("Masukkan URL ESP32-CAM", value=default_url)
+    if use_stream:
+        # Cadangan /capture disajikan firmware di port HTTP, bukan di port stream (81)
+        capture_port = st.number_input("Port /capture Cadangan", min_value=1, max_value=65535, value=CAPTURE_PORT)
     
     # Tombol mulai
     run_stream = st.button("Mulai Deteksi Live")
@@ -293,95 +608,78 @@ else:  # ESP32-CAM Live Stream
         # Layout
         col1, col2 = st.columns([2, 1])
         video_placeholder = col1.empty()
-        chart_placeholder = col2.empty()
-        text_placeholder = col2.empty()
+        gauge_placeholder = col2.empty()
         line_chart_placeholder = st.empty()
+        stats_placeholder = st.empty()
+        renderer = make_renderer(video_placeholder, gauge_placeholder)
         
         frame_no = 0
         streaming_active = True
+
+        # Kelas statis atau kosong tidak memicu inferensi; jumlah terakhir dipakai ulang
+        gate = make_inference_gate()
+        attentive_count, inattentive_count = 0, 0
+        overlay = detection.DetectionOverlay()
         
         # Data untuk real-time line chart
-        detection_history = {
-            'timestamp': [],
-            'Memperhatikan': [],
-            'Tidak Memperhatikan': []
-        }
+        detection_history = TimeSeriesRing(history_window, HISTORY_COLUMNS)
         
         # Buat tombol Stop di luar loop untuk menghindari pembuatan berulang
         stop_button_col = st.columns(3)[1]  # Menempatkan tombol di tengah
         stop_button = stop_button_col.button("Stop Deteksi")
+
+        # Pembaca stream berjalan di thread latar belakang dan selalu menyimpan frame terbaru
+        reader = MJPEGStreamReader(esp_url).start() if use_stream else None
+        capture_url = capture_url_from_stream(esp_url, int(capture_port)) if use_stream else esp_url
         
-        while streaming_active and not stop_button:
-            frame = get_capture_frame(esp_url)
-            if frame is None:
-                st.warning("Tidak dapat terhubung ke ESP32-CAM. Coba lagi dalam 3 detik...")
-                time.sleep(3)
-                continue
+        try:
+            while streaming_active and not stop_button:
+                if reader is not None:
+                    frame = reader.read(timeout=5)
+                    if frame is None and reader.frames_decoded == 0:
+                        # Stream tidak tersedia: gunakan polling /capture sebagai cadangan
+                        st.warning("Stream MJPEG tidak tersedia, beralih ke mode capture...")
+                        reader.stop()
+                        reader = None
+                        continue
+                else:
+                    frame = get_capture_frame(capture_url)
+                if frame is None:
+                    st.warning("Tidak dapat terhubung ke ESP32-CAM. Coba lagi dalam 3 detik...")
+                    time.sleep(3)
+                    continue
                 
-            img, attentive_count, inattentive_count = process_frame(frame, frame_no)
+                if gate is None or gate.decide(frame):
+                    img, attentive_count, inattentive_count = process_frame(frame, frame_no, overlay)
+                else:
+                    img = carried_frame(frame, overlay)
             
-            # Update visualisasi
-            update_visualizations(img, attentive_count, inattentive_count, video_placeholder, chart_placeholder, text_placeholder, frame_no)
+                # Update visualisasi
+                if update_visualizations(renderer, img, attentive_count, inattentive_count) and gate is not None:
+                    stats_placeholder.caption(format_adaptive_stats(None, gate))
             
-            # Log dan update chart setiap 5 frame
-            if frame_no % 5 == 0:
-                # Kirim log
-                threading.Thread(
-                    target=send_log,
-                    args=(attentive_count, inattentive_count),
-                    daemon=True
-                ).start()
+                # Log dan update chart setiap 5 frame
+                if frame_no % 5 == 0:
+                    # Kirim log
+                    send_log(attentive_count, inattentive_count)
                 
-                # Update line chart
-                current_time = datetime.datetime.now()
-                detection_history['timestamp'].append(current_time)
-                detection_history['Memperhatikan'].append(attentive_count)
-                detection_history['Tidak Memperhatikan'].append(inattentive_count)
-                
-                # Batasi jumlah data
-                if len(detection_history['timestamp']) > 30:
-                    detection_history['timestamp'] = detection_history['timestamp'][-30:]
-                    detection_history['Memperhatikan'] = detection_history['Memperhatikan'][-30:]
-                    detection_history['Tidak Memperhatikan'] = detection_history['Tidak Memperhatikan'][-30:]
-                
-                # Update real-time line chart
-                if len(detection_history['timestamp']) > 1:
-                    history_df = pd.DataFrame(detection_history)
-                    
-                    # Ubah format untuk Altair
-                    melted_history = history_df.melt(
-                        id_vars=['timestamp'],
-                        value_vars=['Memperhatikan', 'Tidak Memperhatikan'],
-                        var_name='Kategori',
-                        value_name='Jumlah'
-                    )
-                    
-                    # Buat line chart real-time
-                    real_time_chart = alt.Chart(melted_history).mark_line(point=True).encode(
-                        x=alt.X('timestamp:T', title='Waktu', axis=alt.Axis(format='%H:%M:%S')),
-                        y=alt.Y('Jumlah:Q', title='Jumlah Siswa'),
-                        color=alt.Color('Kategori:N', title='Kategori', scale=alt.Scale(domain=['Memperhatikan', 'Tidak Memperhatikan'], range=['green', 'red'])),
-                        tooltip=[
-                            alt.Tooltip('timestamp:T', title='Waktu', format='%Y-%m-%d %H:%M:%S'),
-                            alt.Tooltip('Kategori:N', title='Kategori'),
-                            alt.Tooltip('Jumlah:Q', title='Jumlah Siswa')
-                        ]
-                    ).properties(
-                        width='container',
-                        height=300,
-                        title="Tren Perhatian Siswa Secara Real-time"
-                    ).interactive()
-                    
-                    line_chart_placeholder.altair_chart(real_time_chart, use_container_width=True)
+                    # Update line chart
+                    update_realtime_chart(detection_history, attentive_count, inattentive_count, line_chart_placeholder)
             
-            frame_no += 1
-            time.sleep(0.2)  # 5 fps
+                frame_no += 1
+                if reader is None:
+                    time.sleep(0.2)  # 5 fps (mode polling)
             
-            # Check if stop button is pressed using Streamlit's experimental get_query_params
-            stop_button = stop_button_col.button("Stop Deteksi", key=f"stop_btn_{frame_no}")
-            if stop_button:
-                streaming_active = False
-                break
+                # Check if stop button is pressed using Streamlit's experimental get_query_params
+                stop_button = stop_button_col.button("Stop Deteksi", key=f"stop_btn_{frame_no}")
+                if stop_button:
+                    streaming_active = False
+                    break
+        finally:
+            if reader is not None:
+                reader.stop()
+            if gate is not None:
+                gate.close()
         
         st.success("Deteksi live stream dihentikan")
         
@@ -2,8 +2,13 @@ import streamlit as st
 import requests
 import pandas as pd
 from datetime import datetime
+from script.data_hub import get_data_hub
+from script.history import build_time_index, downsample, page_count, paginate, slice_day, to_display
+from script.metrics import timed, track_session
+from script.timeseries_store import get_timeseries_store, sync_feeds
 
 st.set_page_config(page_title="EduDetect - Riwayat Data", layout="wide")
+track_session()
 
 # Sidebar History
 st.sidebar.header("History")
@@ -29,49 +34,88 @@ placeholder_sensor = st.empty()
 placeholder_streamlit = st.empty()
 
 # Fungsi untuk mengambil data dari server
-@st.cache_data(ttl=300)  # Cache data selama 5 menit
-def fetch_data_sensor():
-    try:
-        response = requests.get("https://samsung.yogserver.web.id/data/sensor")
-        if response.status_code == 200:
-            return response.json()
-        else:
-            st.error(f"Terjadi kesalahan saat mengambil data sensor: {response.status_code}")
-            return None
-    except Exception as e:
-        st.error(f"Terjadi kesalahan saat mengambil data sensor: {e}")
-        return None
-    
-@st.cache_data(ttl=300)  # Cache data selama 5 menit
-def fetch_data_streamlit():
-    try:
-        response = requests.get("https://samsung.yogserver.web.id/data/streamlit")
-        if response.status_code == 200:
-            return response.json()
-        else:
-            st.error(f"Terjadi kesalahan saat mengambil data streamlit: {response.status_code}")
-            return None
-    except Exception as e:
-        st.error(f"Terjadi kesalahan saat mengambil data streamlit: {e}")
+# Hub data bersama: permintaan yang sama dari banyak sesi digabung menjadi satu
+data_hub = get_data_hub()
+
+# Riwayat disimpan di penyimpanan kolom lokal yang dipartisi per hari; server
+# hanya diminta record baru, dan membaca satu tanggal hanya menyentuh partisi hari itu
+store = get_timeseries_store()
+
+# Kedua feed disinkronkan bersamaan, sehingga waktu tunggu halaman mengikuti
+# permintaan terlama, bukan jumlah keduanya
+sync_errors = sync_feeds(store, ["sensor", "streamlit"], data_hub)
+
+# Baca partisi tanggal yang dipilih setelah sinkronisasi.
+# Jika server gagal dihubungi, data lokal yang sudah tersimpan tetap ditampilkan.
+def fetch_history(feed, date, label):
+    error = sync_errors.get(feed)
+    if isinstance(error, requests.HTTPError):
+        st.error(f"Terjadi kesalahan saat mengambil data {label}: {error.response.status_code}")
+    elif error is not None:
+        st.error(f"Terjadi kesalahan saat mengambil data {label}: {error}")
+    if store.last_timestamp(feed) is None:
         return None
+    return store.read_day(feed, date)
+
+# Hanya data pada tanggal yang dipilih yang dibaca
+def fetch_data_sensor(date):
+    return fetch_history("sensor", date, "sensor")
+
+def fetch_data_streamlit(date):
+    return fetch_history("streamlit", date, "streamlit")
 
 # Garis pemisah
 st.markdown("---")
 
-# Fungsi untuk menampilkan dataframe dengan pemfilteran tanggal
+# Jumlah baris per halaman tabel
+PAGE_SIZES = [100, 500, 1000]
+
+# Indeks waktu dibangun sekali per dataset dan disimpan di session_state, sehingga
+# pindah halaman atau mengubah ukuran halaman tidak membangun ulang indeks
+def get_time_index(df, data_name):
+    cache = st.session_state.setdefault("history_index", {})
+    key = (data_name, selected_date, len(df))
+    if key not in cache:
+        if len(cache) >= 4:
+            cache.clear()
+        cache[key] = build_time_index(df)
+    return cache[key]
+
+# Fungsi untuk menampilkan dataframe dengan pemfilteran tanggal.
+# Pemilihan tanggal memakai searchsorted pada indeks waktu, dan hanya satu
+# halaman (atau ringkasan hasil downsampling) yang dikirim ke browser.
+@timed("display_filtered_data")
 def display_filtered_data(df, data_name):
-    # Konversi kolom timestamp ke format datetime jika ada
     if 'timestamp' in df.columns:
-        df['timestamp'] = pd.to_datetime(df['timestamp'])
-        
+        indexed = get_time_index(df, data_name)
+
         # Filter data berdasarkan tanggal yang dipilih
         selected_date_str = selected_date.strftime('%Y-%m-%d')
-        filtered_df = df[df['timestamp'].dt.strftime('%Y-%m-%d') == selected_date_str]
+        filtered_df = slice_day(indexed, selected_date)
         
         st.subheader(f"{data_name}")
         if len(filtered_df) > 0:
-            st.dataframe(filtered_df, use_container_width=True)
-            st.caption(f"Menampilkan {len(filtered_df)} {data_name.lower()} pada tanggal {selected_date_str}")
+            col_mode, col_size, col_page = st.columns([2, 1, 1])
+            summary_mode = col_mode.toggle(
+                "Tampilkan ringkasan (downsampling)",
+                key=f"{data_name}_summary",
+                help="Menampilkan baris yang tersebar merata sepanjang hari, bukan per halaman."
+            )
+            page_size = col_size.selectbox("Baris per halaman", PAGE_SIZES, key=f"{data_name}_page_size")
+
+            if summary_mode:
+                shown_df = downsample(filtered_df, page_size)
+                caption = f"Menampilkan ringkasan {len(shown_df)} dari {len(filtered_df)} {data_name.lower()} pada tanggal {selected_date_str}"
+            else:
+                pages = page_count(len(filtered_df), page_size)
+                page = col_page.number_input(
+                    f"Halaman (1-{pages})", min_value=1, max_value=pages, value=1, key=f"{data_name}_page"
+                )
+                shown_df = paginate(filtered_df, page, page_size)
+                caption = f"Menampilkan halaman {page} dari {pages} ({len(filtered_df)} {data_name.lower()}) pada tanggal {selected_date_str}"
+
+            st.dataframe(to_display(shown_df), use_container_width=True)
+            st.caption(caption)
         else:
             st.warning(f"Tidak ada {data_name.lower()} tersedia untuk tanggal {selected_date_str}")
     else:
@@ -80,9 +124,8 @@ def display_filtered_data(df, data_name):
         st.caption(f"Kolom timestamp tidak ditemukan dalam {data_name.lower()}. Menampilkan semua data.")
 
 # Tampilkan Data Sensor
-data_sensor = fetch_data_sensor()
-if data_sensor:
-    df_sensor = pd.DataFrame(data_sensor)
+df_sensor = fetch_data_sensor(selected_date)
+if df_sensor is not None:
     display_filtered_data(df_sensor, "Riwayat Data Sensor IoT")
 else:
     st.subheader("Riwayat Data Sensor ioT")
@@ -92,9 +135,8 @@ else:
 st.markdown("---")
 
 # Tampilkan Data Streamlit
-data_streamlit = fetch_data_streamlit()
-if data_streamlit:
-    df_streamlit = pd.DataFrame(data_streamlit)
+df_streamlit = fetch_data_streamlit(selected_date)
+if df_streamlit is not None:
     display_filtered_data(df_streamlit, "Riwayat Data Deteksi Siswa")
 else:
     st.subheader("Riwayat Data Deteksi Siswa")
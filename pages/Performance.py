@@ -0,0 +1,108 @@
+import streamlit as st
+import pandas as pd
+from script.metrics import METRICS_FILE, METRICS_PORT, PROCESS_METRICS, start_exporter, track_session
+
+st.set_page_config(page_title="EduDetect - Performa", layout="wide")
+session_metrics = track_session()
+
+# Sidebar
+st.sidebar.header("Performa")
+st.sidebar.write("Halaman ini menampilkan latensi setiap tahap pemrosesan EduDetect secara langsung.")
+
+scope = st.sidebar.radio("Cakupan Data", ["Proses Server", "Sesi Ini"])
+auto_refresh = st.sidebar.checkbox("Perbarui Otomatis", value=True)
+refresh_interval = st.sidebar.slider("Interval Pembaruan (detik)", min_value=1, max_value=10, value=2)
+
+if st.sidebar.button("Reset Statistik Sesi"):
+    session_metrics.reset()
+
+st.title("Performa Sistem")
+st.caption(
+    "Proses Server: gabungan semua sesi dan thread latar belakang di proses ini. "
+    "Sesi Ini: hanya tahap yang dijalankan oleh halaman-halaman di tab browser ini. "
+    "Persentil dihitung dari 1024 sampel terakhir setiap tahap."
+)
+
+# Nama tampilan untuk tahap yang dicatat
+STAGE_LABELS = {
+    "process_frame": "Inferensi 1 frame",
+    "process_frames": "Inferensi batch",
+    "encode_jpeg": "Encode JPEG",
+    "get_capture_frame": "Ambil gambar ESP32",
+    "send_log": "Antrekan log deteksi",
+    "telemetry_post": "POST log ke server",
+    "fetch_latest": "GET /data/latest",
+    "fetch_sensor": "GET /data/sensor",
+    "fetch_streamlit": "GET /data/streamlit",
+    "fetch_history": "GET riwayat (inkremental)",
+    "mongo_aggregate": "Query MongoDB",
+    "llm_gemini": "Gemini generate",
+    "llm_groq_ttft": "Groq token pertama",
+    "llm_groq_stream": "Groq respons penuh",
+    "llm_groq_summary": "Groq ringkasan riwayat",
+}
+
+
+# Tabel p50/p95 per tahap dari snapshot registry
+def stages_frame(snapshot):
+    rows = [
+        {
+            "Tahap": STAGE_LABELS.get(stage, stage),
+            "Kode": stage,
+            "Jumlah": summary["count"],
+            "Per Detik": round(summary["rate"], 2),
+            "p50 (ms)": round(summary["p50_ms"], 2),
+            "p95 (ms)": round(summary["p95_ms"], 2),
+            "Rata-rata (ms)": round(summary["mean_ms"], 2),
+            "Maks (ms)": round(summary["max_ms"], 2),
+            "Error": summary["errors"],
+        }
+        for stage, summary in snapshot["stages"].items()
+    ]
+    return pd.DataFrame(rows)
+
+
+@st.fragment(run_every=refresh_interval if auto_refresh else None)
+def render_metrics():
+    registry = PROCESS_METRICS if scope == "Proses Server" else session_metrics
+    snapshot = registry.snapshot()
+
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Waktu Aktif", f"{snapshot['uptime_s'] / 60:.1f} menit")
+    col2.metric("Tahap Tercatat", len(snapshot["stages"]))
+    col3.metric("Frame Diproses", snapshot["counters"].get("frames_processed", 0))
+
+    if not snapshot["stages"]:
+        st.info("Belum ada tahap yang tercatat. Buka halaman Deteksi, Dasbor, atau Chatbot terlebih dahulu.")
+        return
+
+    df = stages_frame(snapshot)
+    st.markdown("### Latensi per Tahap")
+    st.dataframe(df, use_container_width=True, hide_index=True)
+
+    st.markdown("### p50 / p95 per Tahap (ms)")
+    st.bar_chart(df.set_index("Tahap")[["p50 (ms)", "p95 (ms)"]], stack=False)
+
+    if snapshot["counters"]:
+        st.markdown("### Counter")
+        st.dataframe(
+            pd.DataFrame(list(snapshot["counters"].items()), columns=["Kejadian", "Jumlah"]),
+            use_container_width=True, hide_index=True
+        )
+
+
+render_metrics()
+
+# Format Prometheus untuk scraping atau textfile collector
+with st.expander("Ekspor Prometheus"):
+    text = PROCESS_METRICS.prometheus_text()
+    st.write(f"File ekspor (diperbarui setiap 15 detik): `{METRICS_FILE}`")
+    if METRICS_PORT:
+        st.write(f"Endpoint HTTP: `http://<host>:{METRICS_PORT}/metrics`")
+        exporter_error = start_exporter().last_error
+        if exporter_error:
+            st.warning(f"Endpoint HTTP tidak aktif: {exporter_error}")
+    else:
+        st.caption("Atur EDUDETECT_METRICS_PORT untuk mengaktifkan endpoint HTTP /metrics.")
+    st.download_button("Unduh metrics.prom", text, file_name="metrics.prom", mime="text/plain")
+    st.code(text, language="text")
@@ -0,0 +1,164 @@
+# adaptive.py
+# Penjadwalan inferensi adaptif:
+# - AdaptiveSkipper: mengukur latensi inferensi (EMA) dan memilih setiap berapa
+#   frame sumber inferensi dijalankan agar pemrosesan tetap mengikuti fps sumber
+# - FrameDiffGate: cek perubahan frame yang murah (gambar abu-abu kecil + absdiff)
+# - IoTMotionFlag: flag `motion` dari /data/latest lewat data hub (tanpa memblokir)
+# - InferenceGate: menggabungkan keduanya; kelas statis atau kosong tidak
+#   memicu inferensi, dan jumlah siswa terakhir dipakai ulang (carry forward)
+import math
+import threading
+import time
+
+import cv2
+import numpy as np
+
+
+class AdaptiveSkipper:
+    # source_fps: fps video sumber; alpha: bobot EMA latensi; max_skip: jarak maksimum antar frame yang diproses
+    def __init__(self, source_fps, alpha=0.2, min_skip=1, max_skip=30):
+        self.source_fps = source_fps or 30.0
+        self.alpha = alpha
+        self.min_skip = min_skip
+        self.max_skip = max_skip
+        self.latency = None
+        self._last_processed = None
+        self.processed = 0
+        self.skipped = 0
+
+    # Catat waktu inferensi untuk `items` frame (misalnya satu batch)
+    def record(self, seconds, items=1):
+        per_frame = seconds / max(1, items)
+        if self.latency is None:
+            self.latency = per_frame
+        else:
+            self.latency = self.alpha * per_frame + (1 - self.alpha) * self.latency
+
+    # Jarak frame sumber antar inferensi agar inferensi tidak tertinggal dari waktu nyata
+    @property
+    def every(self):
+        if self.latency is None:
+            return self.min_skip
+        return min(self.max_skip, max(self.min_skip, math.ceil(self.latency * self.source_fps)))
+
+    def should_process(self, frame_no):
+        if self._last_processed is None or frame_no - self._last_processed >= self.every:
+            self._last_processed = frame_no
+            self.processed += 1
+            return True
+        self.skipped += 1
+        return False
+
+    def stats(self):
+        return {
+            "every": self.every,
+            "latency_ms": (self.latency or 0.0) * 1000,
+            "processed": self.processed,
+            "skipped": self.skipped,
+        }
+
+
+class FrameDiffGate:
+    # threshold: proporsi piksel yang berubah agar frame dianggap berubah
+    # pixel_delta: selisih intensitas minimum per piksel; size: ukuran gambar pembanding
+    def __init__(self, threshold=0.01, pixel_delta=25, size=(80, 45)):
+        self.threshold = threshold
+        self.pixel_delta = pixel_delta
+        self.size = size
+        self._reference = None
+        self._candidate = None
+        self.last_score = 0.0
+
+    def _signature(self, frame):
+        small = cv2.resize(frame, self.size, interpolation=cv2.INTER_AREA)
+        gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY) if small.ndim == 3 else small
+        return cv2.GaussianBlur(gray, (3, 3), 0)
+
+    # Bandingkan dengan frame terakhir yang diinferensi
+    def changed(self, frame):
+        self._candidate = self._signature(frame)
+        if self._reference is None:
+            self.last_score = 1.0
+            return True
+        diff = cv2.absdiff(self._candidate, self._reference)
+        self.last_score = np.count_nonzero(diff > self.pixel_delta) / diff.size
+        return self.last_score >= self.threshold
+
+    # Jadikan frame terakhir yang dicek sebagai pembanding (dipanggil saat inferensi dijalankan)
+    def accept(self):
+        if self._candidate is not None:
+            self._reference = self._candidate
+
+
+# Flag gerakan dari sensor IoT. Diperbarui oleh poller data hub di latar belakang,
+# sehingga active() tidak pernah menunggu jaringan. None jika data belum ada atau sudah basi.
+class IoTMotionFlag:
+    def __init__(self, hub, key="latest", max_age=10.0):
+        self.max_age = max_age
+        self._value = None
+        self._updated = None
+        self._lock = threading.Lock()
+        self._unsubscribe = hub.subscribe(key, self._on_data)
+
+    def _on_data(self, data):
+        if not isinstance(data, dict) or "motion" not in data:
+            return
+        with self._lock:
+            self._value = data["motion"] == 1
+            self._updated = time.monotonic()
+
+    def active(self):
+        with self._lock:
+            if self._updated is None or time.monotonic() - self._updated > self.max_age:
+                return None
+            return self._value
+
+    def close(self):
+        self._unsubscribe()
+
+
+class InferenceGate:
+    # max_interval: inferensi tetap dijalankan paling lambat setiap max_interval detik
+    def __init__(self, diff_gate=None, motion_flag=None, max_interval=5.0):
+        self.diff_gate = diff_gate
+        self.motion_flag = motion_flag
+        self.max_interval = max_interval
+        self._last_infer = None
+        self.inferred = 0
+        self.skipped_static = 0
+        self.skipped_idle = 0
+
+    # True jika frame perlu diinferensi; jika False, pakai hasil inferensi terakhir
+    def decide(self, frame, now=None):
+        now = time.monotonic() if now is None else now
+        changed = self.diff_gate.changed(frame) if self.diff_gate is not None else True
+        motion = self.motion_flag.active() if self.motion_flag is not None else None
+        due = self._last_infer is None or now - self._last_infer >= self.max_interval
+
+        if not due:
+            if not changed:
+                self.skipped_static += 1
+                return False
+            if motion is False:
+                self.skipped_idle += 1
+                return False
+
+        self._last_infer = now
+        if self.diff_gate is not None:
+            self.diff_gate.accept()
+        self.inferred += 1
+        return True
+
+    def stats(self):
+        motion = self.motion_flag.active() if self.motion_flag is not None else None
+        return {
+            "inferred": self.inferred,
+            "skipped_static": self.skipped_static,
+            "skipped_idle": self.skipped_idle,
+            "diff_score": self.diff_gate.last_score if self.diff_gate is not None else None,
+            "iot_motion": motion,
+        }
+
+    def close(self):
+        if self.motion_flag is not None:
+            self.motion_flag.close()
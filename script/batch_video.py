@@ -0,0 +1,377 @@
+# batch_video.py
+# Analisis video offline (tanpa tampilan) dengan process pool.
+# Setiap upload mendapat folder job sendiri di CACHE_DIR/video_jobs/<job_id>,
+# video dibagi menjadi segmen waktu yang sejajar dengan detik, lalu setiap
+# segmen dianalisis oleh worker proses yang memuat modelnya sendiri.
+# Hasil per segmen (jumlah per detik + video anotasi) digabung menjadi:
+#   result.csv     : second, attentive_count, inattentive_count, samples
+#   summary.json   : ringkasan (durasi, rata-rata, waktu proses)
+#   annotated.mp4  : video anotasi frame yang dianalisis
+# Progres ditulis ke file di folder job sehingga bisa dibaca dari sesi
+# Streamlit mana pun lewat get_progress(job_id). Job lama dibersihkan saat job
+# baru dibuat (cleanup_jobs), sehingga folder job tidak tumbuh tanpa batas.
+import csv
+import json
+import math
+import multiprocessing
+import os
+import shutil
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+
+import cv2
+
+from script.config import CACHE_DIR
+
+JOBS_DIR = os.path.join(CACHE_DIR, "video_jobs")
+
+# Progres worker ditulis setiap N frame
+_PROGRESS_EVERY = 10
+
+# Status job yang belum selesai
+JOB_ACTIVE_STATUSES = ("uploaded", "queued", "running", "merging")
+
+# Batas penyimpanan job: umur maksimum (detik) dan jumlah maksimum folder job
+JOB_MAX_AGE = 24 * 3600
+JOB_MAX_COUNT = 20
+
+# Model milik proses worker (dimuat sekali oleh initializer pool)
+_WORKER = {}
+
+
+def job_dir(job_id, root=JOBS_DIR):
+    return os.path.join(root, job_id)
+
+
+def _write_json(path, data):
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(path + ".tmp", path)
+
+
+def _read_json(path, default=None):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+
+def _set_status(directory, **fields):
+    path = os.path.join(directory, "status.json")
+    status = _read_json(path, {})
+    status.update(fields)
+    _write_json(path, status)
+
+
+# Simpan upload (file-like atau bytes) ke folder job baru. Mengembalikan job_id.
+def create_job(upload, root=JOBS_DIR, chunk_size=1 << 20):
+    cleanup_jobs(root)
+    job_id = uuid.uuid4().hex
+    directory = job_dir(job_id, root)
+    os.makedirs(directory)
+    with open(os.path.join(directory, "input.mp4"), "wb") as f:
+        if isinstance(upload, (bytes, bytearray)):
+            f.write(upload)
+        else:
+            while True:
+                chunk = upload.read(chunk_size)
+                if not chunk:
+                    break
+                f.write(chunk)
+    _set_status(directory, status="uploaded", created_at=time.time())
+    return job_id
+
+
+# Hapus job yang lebih tua dari max_age, lalu job selesai yang paling lama jika
+# jumlahnya melebihi max_jobs. Job yang masih berjalan hanya dihapus jika sudah
+# melewati max_age (misalnya tertinggal karena proses dihentikan). Mengembalikan job_id yang dihapus.
+def cleanup_jobs(root=JOBS_DIR, max_age=JOB_MAX_AGE, max_jobs=JOB_MAX_COUNT, now=None):
+    now = time.time() if now is None else now
+    try:
+        names = os.listdir(root)
+    except OSError:
+        return []
+
+    jobs = []
+    for job_id in names:
+        directory = job_dir(job_id, root)
+        if not os.path.isdir(directory):
+            continue
+        status = _read_json(os.path.join(directory, "status.json"), {})
+        created_at = status.get("created_at") or os.path.getmtime(directory)
+        jobs.append((created_at, job_id, status.get("status") in JOB_ACTIVE_STATUSES))
+    jobs.sort()
+
+    removed = []
+    excess = len(jobs) - max_jobs
+    for created_at, job_id, active in jobs:
+        expired = now - created_at > max_age
+        if expired or (excess > 0 and not active):
+            delete_job(job_id, root)
+            removed.append(job_id)
+            excess -= 1
+    return removed
+
+
+# Bagi video menjadi segmen [start_frame, end_frame) yang batasnya jatuh di awal detik
+def plan_segments(frame_count, fps, segments):
+    fps = fps or 30.0
+    seconds = max(1, math.ceil(frame_count / fps))
+    segments = max(1, min(segments, seconds))
+    per_segment = math.ceil(seconds / segments)
+    plan = []
+    for index, first_second in enumerate(range(0, seconds, per_segment)):
+        start = int(round(first_second * fps))
+        end = min(frame_count, int(round((first_second + per_segment) * fps)))
+        if end > start:
+            plan.append((index, start, end))
+    return plan
+
+
+def _init_worker(backend, weights, threads, imgsz):
+    cv2.setNumThreads(1)
+    try:
+        import torch
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+    from script.model_backend import load_model
+    _WORKER["model"] = load_model(backend, weights=weights, imgsz=imgsz)
+
+
+# Analisis satu segmen di proses worker (geometry: InferenceGeometry atau None untuk seluruh frame)
+def _analyze_segment(directory, index, start, end, fps, stride, annotate, geometry=None):
+    from script import detection
+
+    model = _WORKER["model"]
+    cap = cv2.VideoCapture(os.path.join(directory, "input.mp4"))
+    cap.set(cv2.CAP_PROP_POS_FRAMES, start)
+    progress_path = os.path.join(directory, f"progress_{index:03d}.json")
+    cancel_path = os.path.join(directory, "cancel")
+    video_path = os.path.join(directory, f"segment_{index:03d}.mp4")
+
+    writer = None
+    per_second = {}
+    total = end - start
+    frame_no = start
+    cancelled = False
+    try:
+        while frame_no < end:
+            offset = frame_no - start
+            if offset % stride == 0:
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                img, attentive_count, inattentive_count = detection.process_frame(
+                    model, frame, annotate=annotate, geometry=geometry
+                )
+                second = int(frame_no // fps)
+                bucket = per_second.setdefault(second, [0, 0, 0])
+                bucket[0] += attentive_count
+                bucket[1] += inattentive_count
+                bucket[2] += 1
+                if img is not None:
+                    if writer is None:
+                        fourcc = cv2.VideoWriter_fourcc(*"mp4v")
+                        writer = cv2.VideoWriter(video_path, fourcc, fps / stride, (img.shape[1], img.shape[0]))
+                    writer.write(img)
+            elif not cap.grab():
+                break
+            frame_no += 1
+
+            if (frame_no - start) % _PROGRESS_EVERY == 0:
+                _write_json(progress_path, {"done": frame_no - start, "total": total})
+                if os.path.exists(cancel_path):
+                    cancelled = True
+                    break
+    finally:
+        cap.release()
+        if writer is not None:
+            writer.release()
+
+    # Segmen yang dihentikan lewat file cancel mencatat progres sebenarnya, bukan selesai
+    done = frame_no - start if cancelled else total
+    _write_json(progress_path, {"done": done, "total": total})
+    return index, per_second, video_path if writer is not None else None
+
+
+class BatchVideoAnalyzer:
+    # workers: jumlah proses; sample_fps: jumlah frame yang dianalisis per detik video
+    def __init__(self, workers=None, backend="pytorch", weights=None, sample_fps=5,
+                 annotate=True, root=JOBS_DIR):
+        self.workers = workers or max(1, (os.cpu_count() or 2) // 2)
+        self.backend = backend
+        self.weights = weights
+        self.sample_fps = sample_fps
+        self.annotate = annotate
+        self.root = root
+        self._threads = {}
+
+    # Mulai analisis di thread latar belakang; progres dibaca lewat get_progress.
+    # geometry: ukuran input dan ROI yang sama dengan mode live (None = seluruh frame 640x640)
+    def submit(self, job_id, geometry=None):
+        directory = job_dir(job_id, self.root)
+        _set_status(directory, status="queued")
+        thread = threading.Thread(target=self._run, args=(job_id, geometry), name=f"video-job-{job_id[:8]}", daemon=True)
+        self._threads[job_id] = thread
+        thread.start()
+        return job_id
+
+    def cancel(self, job_id):
+        open(os.path.join(job_dir(job_id, self.root), "cancel"), "w").close()
+
+    def _run(self, job_id, geometry=None):
+        directory = job_dir(job_id, self.root)
+        started = time.time()
+        try:
+            cap = cv2.VideoCapture(os.path.join(directory, "input.mp4"))
+            frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+            fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+            cap.release()
+            if frame_count <= 0:
+                raise ValueError("Video tidak dapat dibaca atau tidak berisi frame")
+
+            stride = max(1, int(round(fps / self.sample_fps))) if self.sample_fps else 1
+            plan = plan_segments(frame_count, fps, self.workers * 2)
+            _set_status(directory, status="running", frames_total=frame_count, fps=fps,
+                        segments_total=len(plan), started_at=started)
+
+            weights = self.weights
+            if weights is None:
+                from script.model_backend import WEIGHTS_PATH
+                weights = WEIGHTS_PATH
+            threads = max(1, (os.cpu_count() or 1) // self.workers)
+            # Backend hasil ekspor memakai ukuran input tetap, jadi diekspor sesuai geometri
+            imgsz = None if geometry is None or self.backend == "pytorch" else geometry.imgsz
+            context = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(
+                max_workers=min(self.workers, len(plan)), mp_context=context,
+                initializer=_init_worker, initargs=(self.backend, weights, threads, imgsz)
+            ) as pool:
+                futures = [
+                    pool.submit(_analyze_segment, directory, index, start, end, fps, stride, self.annotate, geometry)
+                    for index, start, end in plan
+                ]
+                outputs = [future.result() for future in futures]
+
+            if os.path.exists(os.path.join(directory, "cancel")):
+                _set_status(directory, status="cancelled", finished_at=time.time())
+                return
+
+            _set_status(directory, status="merging")
+            self._merge(directory, outputs, fps, frame_count, stride, started)
+        except Exception as e:
+            _set_status(directory, status="error", error=str(e), finished_at=time.time())
+        finally:
+            self._threads.pop(job_id, None)
+
+    def _merge(self, directory, outputs, fps, frame_count, stride, started):
+        outputs.sort(key=lambda output: output[0])
+
+        # Segmen sejajar dengan detik, tetapi jumlah tetap dijumlahkan jika ada detik yang sama
+        per_second = {}
+        for _, segment_counts, _ in outputs:
+            for second, (attentive, inattentive, samples) in segment_counts.items():
+                bucket = per_second.setdefault(int(second), [0, 0, 0])
+                bucket[0] += attentive
+                bucket[1] += inattentive
+                bucket[2] += samples
+
+        with open(os.path.join(directory, "result.csv"), "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["second", "attentive_count", "inattentive_count", "samples"])
+            for second in sorted(per_second):
+                attentive, inattentive, samples = per_second[second]
+                writer.writerow([second, round(attentive / samples), round(inattentive / samples), samples])
+
+        annotated = self._concat_videos(directory, [path for _, _, path in outputs if path], fps / stride)
+
+        attentive_total = sum(bucket[0] for bucket in per_second.values())
+        inattentive_total = sum(bucket[1] for bucket in per_second.values())
+        duration = frame_count / fps
+        processing = time.time() - started
+        summary = {
+            "duration_s": duration,
+            "processing_s": processing,
+            "realtime_factor": duration / processing if processing else None,
+            "seconds": len(per_second),
+            "frames_analyzed": sum(bucket[2] for bucket in per_second.values()),
+            "attention_percent": (
+                attentive_total / (attentive_total + inattentive_total) * 100
+                if attentive_total + inattentive_total else 0.0
+            ),
+        }
+        _write_json(os.path.join(directory, "summary.json"), summary)
+        _set_status(directory, status="done", finished_at=time.time(),
+                    annotated_video=annotated is not None)
+        os.remove(os.path.join(directory, "input.mp4"))
+
+    @staticmethod
+    def _concat_videos(directory, paths, fps):
+        if not paths:
+            return None
+        output_path = os.path.join(directory, "annotated.mp4")
+        writer = None
+        for path in paths:
+            cap = cv2.VideoCapture(path)
+            while True:
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                if writer is None:
+                    fourcc = cv2.VideoWriter_fourcc(*"mp4v")
+                    writer = cv2.VideoWriter(output_path, fourcc, fps, (frame.shape[1], frame.shape[0]))
+                writer.write(frame)
+            cap.release()
+            os.remove(path)
+        if writer is not None:
+            writer.release()
+        return output_path
+
+
+# Progres job untuk ditampilkan halaman (dibaca dari file, aman dari proses/sesi mana pun)
+def get_progress(job_id, root=JOBS_DIR):
+    directory = job_dir(job_id, root)
+    status = _read_json(os.path.join(directory, "status.json"))
+    if status is None:
+        return None
+    done = 0
+    segments_done = 0
+    try:
+        names = os.listdir(directory)
+    except OSError:
+        names = []
+    for name in names:
+        if name.startswith("progress_") and name.endswith(".json"):
+            progress = _read_json(os.path.join(directory, name), {})
+            done += progress.get("done", 0)
+            segments_done += progress.get("done", 0) >= progress.get("total", 1)
+    total = status.get("frames_total") or 0
+    return {
+        **status,
+        "frames_done": done,
+        "segments_done": segments_done,
+        "progress": 1.0 if status.get("status") == "done" else (min(1.0, done / total) if total else 0.0),
+    }
+
+
+# Lokasi file hasil job yang sudah selesai
+def result_paths(job_id, root=JOBS_DIR):
+    directory = job_dir(job_id, root)
+    paths = {
+        "csv": os.path.join(directory, "result.csv"),
+        "summary": os.path.join(directory, "summary.json"),
+        "video": os.path.join(directory, "annotated.mp4"),
+    }
+    return {key: path for key, path in paths.items() if os.path.exists(path)}
+
+
+def load_summary(job_id, root=JOBS_DIR):
+    return _read_json(os.path.join(job_dir(job_id, root), "summary.json"))
+
+
+def delete_job(job_id, root=JOBS_DIR):
+    shutil.rmtree(job_dir(job_id, root), ignore_errors=True)
@@ -0,0 +1,268 @@
+# camera.py
+# Pembaca frame ESP32-CAM.
+# - capture_frame: mode polling, satu permintaan HTTP /capture per frame.
+# - MJPEGStreamReader: mode stream, satu koneksi panjang ke /stream. Batas
+#   multipart diurai bertahap di thread latar belakang dan hanya frame
+#   terbaru yang di-decode.
+import re
+import threading
+import time
+import urllib.request
+from urllib.parse import urlsplit, urlunsplit
+
+import cv2
+import numpy as np
+
+# Batas default firmware contoh CameraWebServer ESP32
+DEFAULT_BOUNDARY = b"123456789000000000000987654321"
+
+_CONTENT_LENGTH = re.compile(rb"content-length:\s*(\d+)", re.IGNORECASE)
+_BOUNDARY = re.compile(r"boundary=\"?([^\";]+)\"?", re.IGNORECASE)
+
+
+# Fungsi ambil satu gambar dari endpoint /capture (melempar exception jika gagal)
+def capture_frame(url, timeout=5):
+    with urllib.request.urlopen(url, timeout=timeout) as resp:
+        image_array = np.frombuffer(resp.read(), dtype=np.uint8)
+    return cv2.imdecode(image_array, cv2.IMREAD_COLOR)
+
+
+# Firmware contoh CameraWebServer ESP32 menyajikan /stream di port 81 dan /capture di port HTTP 80
+STREAM_PORT = 81
+CAPTURE_PORT = 80
+
+
+# Ubah URL /stream menjadi URL /capture untuk mode polling. Port stream bawaan (81)
+# dipetakan ke capture_port (port HTTP firmware); port lain (misalnya server tiruan
+# yang menyajikan keduanya) dipertahankan.
+def capture_url_from_stream(url, capture_port=CAPTURE_PORT):
+    parts = urlsplit(url)
+    host = parts.hostname or ""
+    if ":" in host:
+        host = f"[{host}]"
+    port = parts.port
+    if port == STREAM_PORT:
+        port = capture_port
+    scheme = parts.scheme or "http"
+    default_port = 443 if scheme == "https" else 80
+    netloc = host if port in (None, default_port) else f"{host}:{port}"
+    return urlunsplit((scheme, netloc, "/capture", "", ""))
+
+
+# Decode JPEG langsung dari potongan buffer tanpa menyalin bytes ke objek baru
+def decode_jpeg(buffer, start, end):
+    view = memoryview(buffer)
+    jpeg = None
+    try:
+        jpeg = np.frombuffer(view[start:end], dtype=np.uint8)
+        return cv2.imdecode(jpeg, cv2.IMREAD_COLOR)
+    finally:
+        jpeg = None
+        view.release()
+
+
+# Pengurai multipart/x-mixed-replace bertahap.
+# feed() menerima potongan bytes dari socket; setiap pemanggilan mengembalikan
+# posisi (start, end) JPEG lengkap terakhir di dalam buffer, atau None.
+class MultipartParser:
+    # Batas ukuran buffer jika batas multipart tidak pernah ditemukan
+    MAX_BUFFER = 8 * 1024 * 1024
+
+    def __init__(self, boundary=DEFAULT_BOUNDARY):
+        self.boundary = b"--" + boundary.lstrip(b"-")
+        self.buffer = bytearray()
+        self._pos = 0
+        self.parts = 0
+
+    def feed(self, chunk):
+        self.buffer += chunk
+        latest = None
+        while True:
+            part = self._next_part()
+            if part is None:
+                break
+            latest = part
+            self.parts += 1
+        if latest is None and len(self.buffer) - self._pos > self.MAX_BUFFER:
+            self.buffer.clear()
+            self._pos = 0
+        return latest
+
+    # Buang bagian buffer yang sudah diproses (dipanggil setelah frame di-decode)
+    def compact(self):
+        if self._pos:
+            del self.buffer[:self._pos]
+            self._pos = 0
+
+    def _next_part(self):
+        buffer = self.buffer
+        start = buffer.find(self.boundary, self._pos)
+        if start < 0:
+            return None
+        header_end = buffer.find(b"\r\n\r\n", start)
+        if header_end < 0:
+            return None
+        body_start = header_end + 4
+
+        match = _CONTENT_LENGTH.search(buffer, start, header_end)
+        if match:
+            body_end = body_start + int(match.group(1))
+            if body_end > len(buffer):
+                return None
+            self._pos = body_end
+        else:
+            # Tanpa Content-Length: JPEG berakhir sebelum batas berikutnya
+            next_boundary = buffer.find(self.boundary, body_start)
+            if next_boundary < 0:
+                return None
+            body_end = next_boundary
+            while body_end > body_start and buffer[body_end - 1] in b"\r\n":
+                body_end -= 1
+            self._pos = next_boundary
+        return body_start, body_end
+
+
+class MJPEGStreamReader:
+    # url           : endpoint MJPEG, misalnya http://192.168.100.168:81/stream
+    # chunk_size    : ukuran baca per iterasi dari socket
+    # reconnect_wait: jeda sebelum mencoba menyambung ulang
+    def __init__(self, url, timeout=5, chunk_size=64 * 1024, reconnect_wait=1.0):
+        self.url = url
+        self.timeout = timeout
+        self.chunk_size = chunk_size
+        self.reconnect_wait = reconnect_wait
+
+        self._stop_event = threading.Event()
+        self._cond = threading.Condition()
+        self._thread = None
+        self._frame = None
+        self._frame_time = None
+        self._seq = 0
+        self._last_read_seq = 0
+
+        self.parts_received = 0
+        self.frames_decoded = 0
+        self.reconnects = 0
+        self.last_error = None
+        self.connected = False
+        self._started = None
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop_event.clear()
+            self._started = time.perf_counter()
+            self._thread = threading.Thread(target=self._run, name="mjpeg-reader", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout=2):
+        self._stop_event.set()
+        with self._cond:
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    # Frame terbaru tanpa menunggu (None jika belum ada)
+    def latest(self):
+        with self._cond:
+            return self._frame
+
+    # (nomor urut, frame, waktu diterima) dari frame terbaru tanpa menunggu
+    def snapshot(self):
+        with self._cond:
+            return self._seq, self._frame, self._frame_time
+
+    # Tunggu frame yang lebih baru dari frame terakhir yang dibaca
+    def read(self, timeout=None):
+        with self._cond:
+            if not self._cond.wait_for(
+                lambda: self._seq > self._last_read_seq or self._stop_event.is_set(),
+                timeout
+            ):
+                return None
+            self._last_read_seq = self._seq
+            return self._frame
+
+    def stats(self):
+        elapsed = time.perf_counter() - self._started if self._started else 0.0
+        return {
+            "connected": self.connected,
+            "parts_received": self.parts_received,
+            "frames_decoded": self.frames_decoded,
+            "fps": self.frames_decoded / elapsed if elapsed > 0 else 0.0,
+            "reconnects": self.reconnects,
+            "last_error": self.last_error,
+        }
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            try:
+                self._read_stream()
+            except Exception as e:
+                self.last_error = str(e)
+            self.connected = False
+            if self._stop_event.wait(self.reconnect_wait):
+                break
+            self.reconnects += 1
+
+    def _read_stream(self):
+        with urllib.request.urlopen(self.url, timeout=self.timeout) as resp:
+            self.connected = True
+            match = _BOUNDARY.search(resp.headers.get("Content-Type", ""))
+            boundary = match.group(1).encode() if match else DEFAULT_BOUNDARY
+            parser = MultipartParser(boundary)
+            read = getattr(resp, "read1", resp.read)
+
+            while not self._stop_event.is_set():
+                chunk = read(self.chunk_size)
+                if not chunk:
+                    break
+                before = parser.parts
+                latest = parser.feed(chunk)
+                self.parts_received += parser.parts - before
+                if latest is None:
+                    continue
+
+                # Hanya JPEG lengkap terakhir yang di-decode; frame lama dilewati
+                frame = decode_jpeg(parser.buffer, *latest)
+                parser.compact()
+                if frame is None:
+                    continue
+                self.frames_decoded += 1
+                with self._cond:
+                    self._frame = frame
+                    self._frame_time = time.perf_counter()
+                    self._seq += 1
+                    self._cond.notify_all()
+
+
+# Pembaca mode polling /capture dengan antarmuka yang sama seperti MJPEGStreamReader
+class CapturePoller(MJPEGStreamReader):
+    # interval: jeda minimum antar permintaan /capture
+    def __init__(self, url, timeout=5, interval=0.2, reconnect_wait=1.0):
+        super().__init__(url, timeout=timeout, reconnect_wait=reconnect_wait)
+        self.interval = interval
+
+    def _read_stream(self):
+        while not self._stop_event.is_set():
+            start = time.perf_counter()
+            frame = capture_frame(self.url, timeout=self.timeout)
+            self.connected = True
+            self.parts_received += 1
+            if frame is not None:
+                self.frames_decoded += 1
+                with self._cond:
+                    self._frame = frame
+                    self._frame_time = time.perf_counter()
+                    self._seq += 1
+                    self._cond.notify_all()
+            remaining = self.interval - (time.perf_counter() - start)
+            if remaining > 0 and self._stop_event.wait(remaining):
+                break
+
+
+# Pilih pembaca sesuai URL: /stream -> MJPEG, selain itu polling /capture
+def open_camera(url, timeout=5):
+    if urlsplit(url).path.rstrip("/").endswith("stream"):
+        return MJPEGStreamReader(url, timeout=timeout)
+    return CapturePoller(url, timeout=timeout)
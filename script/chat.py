@@ -0,0 +1,210 @@
+# chat.py
+# Pendukung halaman Chatbot:
+# - ChatHistoryManager: menjaga prompt tetap di bawah anggaran token. Pesan lama
+#   diringkas (jika ada summarizer) atau dibuang, pesan terbaru selalu dikirim utuh.
+# - StreamRenderer: menggabungkan potongan respons streaming dan hanya
+#   menggambar ulang placeholder pada laju tetap atau jika potongan baru sudah
+#   cukup besar, serta mencatat time-to-first-token dan waktu render.
+# Keduanya tidak bergantung pada Streamlit maupun Groq secara langsung sehingga
+# bisa diuji dengan klien streaming palsu (lihat benchmarks/fake_groq.py).
+import time
+
+from script.metrics import timer
+
+# Perkiraan kasar jumlah karakter per token dan overhead per pesan (tanpa tokenizer)
+CHARS_PER_TOKEN = 4
+MESSAGE_OVERHEAD_TOKENS = 4
+
+
+def estimate_tokens(text):
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def message_tokens(message):
+    return estimate_tokens(message["content"]) + MESSAGE_OVERHEAD_TOKENS
+
+
+class ChatHistoryManager:
+    # budget: anggaran token riwayat yang dikirim ke model
+    # keep_recent: jumlah pesan terbaru yang tidak pernah diringkas
+    # low_water: setelah melewati anggaran, riwayat dipangkas sampai proporsi ini
+    #            sehingga peringkasan tidak terjadi di setiap giliran
+    # summarizer: fungsi (ringkasan_sebelumnya, pesan_pesan) -> ringkasan baru; None = buang saja
+    def __init__(self, budget=6000, keep_recent=6, low_water=0.6, summarizer=None, summary_max_tokens=400):
+        self.budget = budget
+        self.keep_recent = keep_recent
+        self.low_water = low_water
+        self.summarizer = summarizer
+        self.summary_max_tokens = summary_max_tokens
+        self.summary = ""
+        self.compacted = 0
+        self.summaries = 0
+        self.last_error = None
+        self.last_prompt_tokens = 0
+
+    def reset(self):
+        self.summary = ""
+        self.compacted = 0
+
+    def _summary_message(self):
+        return {"role": "system", "content": f"Ringkasan percakapan sebelumnya:\n{self.summary}"}
+
+    # Pesan yang dikirim ke model untuk riwayat lengkap `messages` (pesan terakhir = pertanyaan baru)
+    def build(self, messages):
+        if len(messages) < self.compacted:
+            # Riwayat dihapus atau diganti: mulai dari awal
+            self.reset()
+
+        pending = messages[self.compacted:]
+        summary_tokens = message_tokens(self._summary_message()) if self.summary else 0
+        if summary_tokens + sum(message_tokens(m) for m in pending) > self.budget:
+            self._compact(pending)
+
+        prompt = ([self._summary_message()] if self.summary else []) + [
+            {"role": m["role"], "content": m["content"]} for m in messages[self.compacted:]
+        ]
+
+        # Jika pesan terbaru saja sudah melebihi anggaran, buang yang terlama (pesan terakhir tetap dikirim)
+        while len(prompt) > 1 and sum(message_tokens(m) for m in prompt) > self.budget:
+            prompt.pop(1 if self.summary and len(prompt) > 2 else 0)
+        self.last_prompt_tokens = sum(message_tokens(m) for m in prompt)
+        return prompt
+
+    def _compact(self, pending):
+        target = self.budget * self.low_water
+        keep_from = max(0, len(pending) - self.keep_recent)
+        tokens = sum(message_tokens(m) for m in pending)
+        evict = 0
+        while evict < keep_from and tokens > target:
+            tokens -= message_tokens(pending[evict])
+            evict += 1
+        if evict == 0:
+            return
+
+        evicted = pending[:evict]
+        self.compacted += evict
+        if self.summarizer is None:
+            return
+        try:
+            summary = self.summarizer(self.summary, evicted)
+            self.summary = summary[:self.summary_max_tokens * CHARS_PER_TOKEN]
+            self.summaries += 1
+            self.last_error = None
+        except Exception as e:
+            # Peringkasan gagal: pesan lama tetap dibuang agar prompt tetap dalam anggaran
+            self.last_error = str(e)
+
+    def stats(self):
+        return {
+            "prompt_tokens": self.last_prompt_tokens,
+            "compacted_messages": self.compacted,
+            "summaries": self.summaries,
+            "summary_tokens": estimate_tokens(self.summary) if self.summary else 0,
+            "last_error": self.last_error,
+        }
+
+
+# Summarizer berbasis Groq (model kecil, tanpa streaming)
+def groq_summarizer(client, model="llama-3.1-8b-instant", max_tokens=300):
+    def summarize(previous, messages):
+        transcript = "\n".join(f"{m['role']}: {m['content']}" for m in messages)
+        if previous:
+            transcript = f"Ringkasan sebelumnya:\n{previous}\n\nLanjutan percakapan:\n{transcript}"
+        with timer("llm_groq_summary"):
+            completion = client.chat.completions.create(
+                model=model,
+                messages=[
+                    {"role": "system", "content": (
+                        "Ringkas percakapan berikut dalam Bahasa Indonesia, maksimal 150 kata. "
+                        "Pertahankan fakta, angka, nama, dan pertanyaan yang belum terjawab."
+                    )},
+                    {"role": "user", "content": transcript},
+                ],
+                temperature=0.2,
+                max_completion_tokens=max_tokens,
+            )
+        return completion.choices[0].message.content.strip()
+    return summarize
+
+
+class StreamRenderer:
+    # placeholder: objek dengan .markdown(text), misalnya st.empty()
+    # interval: jarak minimum antar render (detik); max_pending_chars: render lebih
+    # awal jika teks baru yang belum ditampilkan sudah sepanjang ini
+    def __init__(self, placeholder, interval=0.05, max_pending_chars=400, cursor="▌"):
+        self.placeholder = placeholder
+        self.interval = interval
+        self.max_pending_chars = max_pending_chars
+        self.cursor = cursor
+
+        self._parts = []
+        self._pending = 0
+        self._last_flush = None
+        self.started_at = None
+        self.first_token_at = None
+        self.finished_at = None
+        self.chunks = 0
+        self.flushes = 0
+        self.render_seconds = 0.0
+
+    @property
+    def text(self):
+        return "".join(self._parts)
+
+    # Tandai awal permintaan (untuk menghitung time-to-first-token)
+    def start(self, now=None):
+        self.started_at = time.perf_counter() if now is None else now
+        return self
+
+    def feed(self, content, now=None):
+        if not content:
+            return
+        now = time.perf_counter() if now is None else now
+        if self.started_at is None:
+            self.started_at = now
+        if self.first_token_at is None:
+            self.first_token_at = now
+        self._parts.append(content)
+        self._pending += len(content)
+        self.chunks += 1
+        if (self._last_flush is None or now - self._last_flush >= self.interval
+                or self._pending >= self.max_pending_chars):
+            self._flush(self.cursor, now)
+
+    def _flush(self, suffix, now):
+        start = time.perf_counter()
+        text = self.text
+        self._parts = [text]
+        self.placeholder.markdown(text + suffix)
+        self.render_seconds += time.perf_counter() - start
+        self._pending = 0
+        self._last_flush = now
+        self.flushes += 1
+
+    # Render akhir tanpa kursor; mengembalikan teks lengkap
+    def finish(self, now=None):
+        now = time.perf_counter() if now is None else now
+        self._flush("", now)
+        self.finished_at = now
+        return self.text
+
+    # Baca seluruh stream chat completion (format OpenAI/Groq) lalu render akhir
+    def consume(self, stream):
+        if self.started_at is None:
+            self.start()
+        for chunk in stream:
+            if not chunk.choices:
+                continue
+            self.feed(chunk.choices[0].delta.content or "")
+        return self.finish()
+
+    def stats(self):
+        end = self.finished_at if self.finished_at is not None else time.perf_counter()
+        return {
+            "ttft_ms": (self.first_token_at - self.started_at) * 1000 if self.first_token_at is not None else None,
+            "total_ms": (end - self.started_at) * 1000 if self.started_at is not None else None,
+            "render_ms": self.render_seconds * 1000,
+            "chunks": self.chunks,
+            "flushes": self.flushes,
+            "chars": len(self.text),
+        }
@@ -0,0 +1,12 @@
+# config.py
+# Konfigurasi bersama untuk modul-modul di folder script.
+import os
+
+# Alamat server API EduDetect
+API_BASE_URL = os.environ.get("EDUDETECT_API_URL", "https://samsung.yogserver.web.id")
+
+# Folder cache lokal (antrean telemetri, penyimpanan data, dsb.)
+CACHE_DIR = os.environ.get(
+    "EDUDETECT_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache")
+)
@@ -0,0 +1,214 @@
+# data_hub.py
+# Hub data bersama untuk satu proses Streamlit (dibuat lewat st.cache_resource).
+# - get(): membaca snapshot terbaru; jika lebih tua dari max_age, satu sesi
+#   saja yang mengambil ulang ke server sementara sesi lain menunggu hasil yang
+#   sama (request coalescing). N sesi = satu permintaan upstream per interval.
+# - subscribe(): callback dipanggil setiap ada data baru; feed yang punya
+#   pelanggan di-poll oleh thread latar belakang setiap interval.
+import threading
+import time
+
+import requests
+import streamlit as st
+from requests.adapters import HTTPAdapter
+
+from script.config import API_BASE_URL
+from script.metrics import count, timer
+
+# Endpoint bawaan yang dipakai oleh halaman-halaman aplikasi. Riwayat /data/sensor
+# dan /data/streamlit tidak diambil utuh di sini: feed itu dibaca secara inkremental
+# (SharedSensorPoller lewat add_feed, dan sync_feed ke penyimpanan lokal).
+DEFAULT_FEEDS = {
+    "latest": "/data/latest",
+}
+
+
+class _Entry:
+    def __init__(self):
+        self.data = None
+        self.fetched_at = None
+        self.version = 0
+        self.error = None
+        self.inflight = None
+        self.upstream_requests = 0
+        self.reads = 0
+        self.coalesced = 0
+        self.subscriber_errors = 0
+        self.subscriber_error = None
+
+
+class DataHub:
+    def __init__(self, base_url=API_BASE_URL, feeds=None, interval=2.0, timeout=10, session=None):
+        self.base_url = base_url
+        self.feeds = dict(DEFAULT_FEEDS if feeds is None else feeds)
+        self.interval = interval
+        self.timeout = timeout
+
+        self.session = session or requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._entries = {}
+        self._loaders = {}
+        self._subscribers = {}
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stop_event = threading.Event()
+
+    # Daftarkan feed dengan loader sendiri (misalnya poll() yang hanya mengambil
+    # delta); dibaca lewat get(key) dan di-poll untuk pelanggan seperti feed bawaan
+    def add_feed(self, key, loader):
+        with self._lock:
+            self._loaders[key] = loader
+
+    # Loader untuk feed terdaftar: loader dari add_feed, atau GET endpoint lalu parse JSON
+    def _feed_loader(self, key):
+        with self._lock:
+            loader = self._loaders.get(key)
+        if loader is not None:
+            return loader
+        def load():
+            # Key tidak terdaftar -> KeyError dicatat sebagai error entry, bukan menggantung get()
+            url = f"{self.base_url}{self.feeds[key]}"
+            with timer(f"fetch_{key}"):
+                response = self.session.get(url, timeout=self.timeout)
+                response.raise_for_status()
+                return response.json()
+        return load
+
+    def _entry(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = _Entry()
+            return entry
+
+    # Ambil data untuk key. loader opsional untuk key selain feed terdaftar
+    # (misalnya riwayat per tanggal). Melempar exception jika pengambilan gagal.
+    def get(self, key, loader=None, max_age=None):
+        max_age = self.interval if max_age is None else max_age
+        entry = self._entry(key)
+
+        with self._lock:
+            entry.reads += 1
+            fresh = entry.fetched_at is not None and time.monotonic() - entry.fetched_at < max_age
+            if fresh:
+                if entry.error is not None and entry.data is None:
+                    raise entry.error
+                return entry.data
+            inflight = entry.inflight
+            if inflight is None:
+                inflight = entry.inflight = threading.Event()
+                leader = True
+            else:
+                entry.coalesced += 1
+                leader = False
+                count("fetch_coalesced")
+
+        if leader:
+            self._refresh(key, entry, loader or self._feed_loader(key), inflight)
+        else:
+            inflight.wait(self.timeout + 1)
+
+        with self._lock:
+            if entry.error is not None and entry.data is None:
+                raise entry.error
+            return entry.data
+
+    def _refresh(self, key, entry, loader, inflight):
+        try:
+            data = loader()
+            with self._lock:
+                entry.data = data
+                entry.error = None
+                entry.version += 1
+                callbacks = list(self._subscribers.get(key, ()))
+        except Exception as e:
+            with self._lock:
+                entry.error = e
+                # Data lama tetap disajikan; percobaan berikutnya setelah max_age berlalu
+                callbacks = []
+        finally:
+            with self._lock:
+                entry.upstream_requests += 1
+                entry.fetched_at = time.monotonic()
+                entry.inflight = None
+            inflight.set()
+
+        for callback in callbacks:
+            try:
+                callback(entry.data)
+            except Exception as e:
+                # Kegagalan satu pelanggan tidak menghentikan pelanggan lain
+                count("hub_subscriber_failed")
+                with self._lock:
+                    entry.subscriber_errors += 1
+                    entry.subscriber_error = e
+
+    # Berlangganan pembaruan feed terdaftar; mengembalikan fungsi untuk berhenti berlangganan
+    def subscribe(self, key, callback):
+        with self._lock:
+            self._subscribers.setdefault(key, []).append(callback)
+        self._ensure_poller()
+
+        def unsubscribe():
+            with self._lock:
+                callbacks = self._subscribers.get(key, [])
+                if callback in callbacks:
+                    callbacks.remove(callback)
+        return unsubscribe
+
+    def version(self, key):
+        return self._entry(key).version
+
+    def last_error(self, key):
+        return self._entry(key).error
+
+    # Exception terakhir dari callback pelanggan key (None jika belum pernah gagal)
+    def last_subscriber_error(self, key):
+        return self._entry(key).subscriber_error
+
+    def _ensure_poller(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="data-hub-poller", daemon=True)
+            self._thread.start()
+
+    # Poll feed yang punya pelanggan; get() dengan max_age=interval memastikan
+    # satu permintaan upstream per interval meski juga dibaca oleh sesi lain
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            with self._lock:
+                keys = [key for key, callbacks in self._subscribers.items() if callbacks]
+            for key in keys:
+                try:
+                    self.get(key)
+                except Exception:
+                    pass
+
+    def stop(self):
+        self._stop_event.set()
+
+    # Jumlah permintaan upstream dan jumlah pembacaan (fan-out) per key
+    def stats(self):
+        with self._lock:
+            result = {}
+            for key, entry in self._entries.items():
+                result[str(key)] = {
+                    "upstream_requests": entry.upstream_requests,
+                    "reads": entry.reads,
+                    "coalesced": entry.coalesced,
+                    "fan_out": entry.reads / entry.upstream_requests if entry.upstream_requests else 0.0,
+                    "subscribers": len(self._subscribers.get(key, ())),
+                    "version": entry.version,
+                    "error": str(entry.error) if entry.error else None,
+                    "subscriber_errors": entry.subscriber_errors,
+                    "subscriber_error": str(entry.subscriber_error) if entry.subscriber_error else None,
+                }
+            return result
+
+
+# Satu hub per proses Streamlit, dipakai bersama oleh semua halaman dan sesi
+@st.cache_resource
+def get_data_hub():
+    return DataHub()
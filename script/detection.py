@@ -0,0 +1,182 @@
+# detection.py
+# Fungsi inferensi YOLO yang dipakai bersama oleh halaman Deteksi dan benchmark.
+import threading
+from functools import lru_cache
+
+import cv2
+import numpy as np
+
+from script.metrics import count, timed
+
+# Mapping label
+LABEL_SHORT = {
+    'memperhatikan': 'M',
+    'tidak_memperhatikan': 'TM'
+}
+
+# Ambang confidence prediksi
+PREDICT_CONF = 0.3
+
+# Model YOLO dibagikan antar sesi dan thread (st.cache_resource), sedangkan
+# predict tidak aman dipanggil bersamaan pada satu instance model
+_PREDICT_LOCK = threading.Lock()
+
+# Indeks kategori hasil hitung: 0 = memperhatikan, 1 = tidak memperhatikan, 2 = lainnya
+CATEGORY_COLORS = [(0, 255, 0), (0, 0, 255), (255, 255, 0)]
+_CATEGORY_BY_SHORT = {'M': 0, 'TM': 1}
+
+
+# Tabel id kelas -> indeks kategori dan label pendek, dibuat sekali per model
+@lru_cache(maxsize=8)
+def _class_tables(names_items):
+    size = max((cls_id for cls_id, _ in names_items), default=-1) + 1
+    categories = np.full(size, 2, dtype=np.intp)
+    short_labels = [''] * size
+    for cls_id, label in names_items:
+        short_label = LABEL_SHORT.get(label, label)
+        categories[cls_id] = _CATEGORY_BY_SHORT.get(short_label, 2)
+        short_labels[cls_id] = short_label
+    return categories, short_labels
+
+
+def class_tables(names):
+    if not isinstance(names, dict):
+        names = dict(enumerate(names))
+    return _class_tables(tuple(sorted(names.items())))
+
+
+# Fungsi untuk menghitung siswa dan (opsional) menggambar kotak deteksi dari satu Results.
+# Kelas dan koordinat diambil sekali sebagai array NumPy, bukan per kotak.
+# Jika annotate=False, gambar tidak disalin maupun digambar dan img bernilai None.
+# transform (FrameTransform dari script.geometry): kotak dipetakan kembali ke frame asli.
+# overlay (DetectionOverlay): kotak yang digambar disimpan untuk frame berikutnya yang tidak diinferensi.
+def annotate_result(r, names, annotate=True, transform=None, overlay=None):
+    categories, short_labels = class_tables(names)
+
+    boxes = r.boxes
+    if boxes is None or len(boxes) == 0:
+        cls_ids = np.empty(0, dtype=np.intp)
+        xyxy = np.empty((0, 4), dtype=np.int32)
+    else:
+        cls_ids = boxes.cls.cpu().numpy().astype(np.intp)
+        xyxy = boxes.xyxy.cpu().numpy()
+        if transform is not None:
+            xyxy = transform.to_original(xyxy)
+        xyxy = xyxy.astype(np.int32)
+
+    box_categories = categories[cls_ids]
+    counts = np.bincount(box_categories, minlength=3)
+    attentive_count = int(counts[0])
+    inattentive_count = int(counts[1])
+
+    if not annotate:
+        return None, attentive_count, inattentive_count
+
+    img = (r.orig_img if transform is None else transform.original).copy()
+    labels = [short_labels[c] for c in cls_ids.tolist()]
+    draw_boxes(img, xyxy, box_categories, labels)
+    if transform is not None:
+        transform.draw_roi(img)
+    if overlay is not None:
+        overlay.update(xyxy, box_categories, labels, transform)
+    return img, attentive_count, inattentive_count
+
+
+# Kotak deteksi terakhir (koordinat frame asli) untuk frame yang tidak diinferensi,
+# misalnya dilewati InferenceGate karena kelas statis. Kotak digambar ulang pada frame
+# baru, sehingga video anotasi tidak berubah menjadi frame mentah selama jumlah siswa
+# dari inferensi terakhir dipakai ulang.
+class DetectionOverlay:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._last = None
+
+    def update(self, xyxy, box_categories, labels, transform=None):
+        with self._lock:
+            self._last = (xyxy, box_categories, labels, transform)
+
+    # Salinan frame dengan kotak terakhir (frame apa adanya jika belum ada deteksi)
+    def draw(self, frame):
+        with self._lock:
+            last = self._last
+        img = frame.copy()
+        if last is None:
+            return img
+        xyxy, box_categories, labels, transform = last
+        draw_boxes(img, xyxy, box_categories, labels)
+        if transform is not None:
+            transform.draw_roi(img)
+        return img
+
+
+# Gambar semua kotak: satu panggilan polylines per kategori warna, lalu label teks
+def draw_boxes(img, xyxy, box_categories, labels):
+    if len(xyxy) == 0:
+        return img
+
+    x1, y1, x2, y2 = xyxy[:, 0], xyxy[:, 1], xyxy[:, 2], xyxy[:, 3]
+    corners = np.stack([
+        np.stack([x1, y1], axis=1),
+        np.stack([x2, y1], axis=1),
+        np.stack([x2, y2], axis=1),
+        np.stack([x1, y2], axis=1),
+    ], axis=1).astype(np.int32)
+
+    for category, color in enumerate(CATEGORY_COLORS):
+        mask = box_categories == category
+        if mask.any():
+            cv2.polylines(img, list(corners[mask]), True, color, 2)
+
+    for (bx1, by1), category, label in zip(xyxy[:, :2].tolist(), box_categories.tolist(), labels):
+        cv2.putText(img, label, (bx1, by1 - 10),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, CATEGORY_COLORS[category], 2)
+    return img
+
+
+# Siapkan frame sesuai geometri inferensi (InferenceGeometry atau None = frame apa adanya)
+def _prepare(frame, geometry):
+    if geometry is None:
+        return frame, None
+    return geometry.prepare(frame)
+
+
+# imgsz untuk predict jika semua input berukuran sama (input sudah sejajar stride, letterbox tidak menambah padding)
+def _predict_options(sources, geometries):
+    if any(geometry is None for geometry in geometries):
+        return {}
+    shapes = {source.shape[:2] for source in sources}
+    return {"imgsz": shapes.pop()} if len(shapes) == 1 else {}
+
+
+# Fungsi untuk memproses satu frame
+@timed("process_frame")
+def process_frame(model, frame, annotate=True, geometry=None, overlay=None):
+    count("frames_processed")
+    source, transform = _prepare(frame, geometry)
+    options = _predict_options([source], [geometry])
+    with _PREDICT_LOCK:
+        for r in model.predict(source=source, conf=PREDICT_CONF, stream=True, **options):
+            return annotate_result(r, model.names, annotate, transform, overlay)
+    return (frame if annotate else None), 0, 0
+
+
+# Fungsi untuk memproses beberapa frame dalam satu panggilan predict.
+# Hasil dikembalikan dalam urutan yang sama dengan frame masukan.
+# annotate_last_only=True hanya menggambar frame terakhir (yang akan ditampilkan).
+# geometry: satu geometri untuk semua frame atau list geometri per frame (misalnya ROI per kamera).
+@timed("process_frames")
+def process_frames(model, frames, annotate=True, annotate_last_only=False, geometry=None, overlay=None):
+    if not frames:
+        return []
+    count("frames_processed", len(frames))
+    geometries = geometry if isinstance(geometry, (list, tuple)) else [geometry] * len(frames)
+    prepared = [_prepare(frame, frame_geometry) for frame, frame_geometry in zip(frames, geometries)]
+    sources = [source for source, _ in prepared]
+    options = _predict_options(sources, geometries)
+    with _PREDICT_LOCK:
+        results = model.predict(source=sources, conf=PREDICT_CONF, **options)
+    last = len(results) - 1
+    return [
+        annotate_result(r, model.names, annotate and (not annotate_last_only or i == last), transform, overlay)
+        for i, (r, (_, transform)) in enumerate(zip(results, prepared))
+    ]
@@ -0,0 +1,170 @@
+# geometry.py
+# Geometri input inferensi YOLO:
+# - ukuran persegi panjang yang sejajar stride (misalnya 640x384 untuk video 16:9)
+#   sebagai ganti letterbox persegi 640x640 yang sebagian besar berisi padding
+# - region of interest (ROI) per kamera berupa poligon ternormalisasi (0-1) yang
+#   hanya mencakup area tempat duduk; frame dipotong ke kotak pembatas ROI dan
+#   area di luar poligon diisi warna padding sebelum inferensi
+# Kotak hasil deteksi dipetakan kembali ke koordinat frame asli lewat FrameTransform.
+import math
+
+import cv2
+import numpy as np
+
+# Warna padding yang sama dengan letterbox Ultralytics
+PAD_VALUE = 114
+
+# Pilihan ukuran inferensi (lebar, tinggi); persegi 640x640 adalah jalur lama
+GEOMETRY_SIZES = {
+    "Persegi 640x640": (640, 640),
+    "4:3 640x480": (640, 480),
+    "16:9 640x384": (640, 384),
+}
+
+
+# Ukuran persegi panjang sejajar stride untuk rasio frame tertentu (sisi terpanjang = imgsz)
+def rect_size(width, height, imgsz=640, stride=32):
+    scale = imgsz / max(width, height)
+    return (
+        max(stride, math.ceil(width * scale / stride) * stride),
+        max(stride, math.ceil(height * scale / stride) * stride),
+    )
+
+
+# Ubah teks "x,y x,y ..." (koordinat ternormalisasi 0-1) menjadi poligon; None jika kosong
+def parse_roi(text):
+    text = (text or "").replace(";", " ").strip()
+    if not text:
+        return None
+    points = []
+    for pair in text.split():
+        x, y = pair.split(",")
+        points.append((min(1.0, max(0.0, float(x))), min(1.0, max(0.0, float(y)))))
+    if len(points) < 3:
+        raise ValueError("ROI membutuhkan minimal 3 titik")
+    return np.array(points, dtype=np.float32)
+
+
+# ROI per kamera: satu baris "nama=x,y x,y ..." per kamera
+def parse_roi_list(text):
+    rois = {}
+    for line in (text or "").splitlines():
+        line = line.strip()
+        if not line or line.startswith("#") or "=" not in line:
+            continue
+        name, points = line.split("=", 1)
+        roi = parse_roi(points)
+        if roi is not None:
+            rois[name.strip()] = roi
+    return rois
+
+
+class FrameTransform:
+    # Pemetaan dari koordinat input inferensi ke koordinat frame asli
+    def __init__(self, original, scale, pad, offset, polygon=None):
+        self.original = original
+        self.scale = scale
+        self.pad = pad
+        self.offset = offset
+        self.polygon = polygon
+
+    # Kotak xyxy (koordinat input inferensi) -> koordinat frame asli
+    def to_original(self, xyxy):
+        xyxy = np.asarray(xyxy, dtype=np.float32).reshape(-1, 4)
+        pad_x, pad_y = self.pad
+        offset_x, offset_y = self.offset
+        boxes = (xyxy - (pad_x, pad_y, pad_x, pad_y)) / self.scale + (offset_x, offset_y, offset_x, offset_y)
+        height, width = self.original.shape[:2]
+        np.clip(boxes[:, 0::2], 0, width, out=boxes[:, 0::2])
+        np.clip(boxes[:, 1::2], 0, height, out=boxes[:, 1::2])
+        return boxes
+
+    # Gambar garis ROI pada frame anotasi
+    def draw_roi(self, img, color=(255, 200, 0)):
+        if self.polygon is not None:
+            cv2.polylines(img, [self.polygon.astype(np.int32)], True, color, 1)
+        return img
+
+
+class _Layout:
+    def __init__(self, bbox, scale, resized, pad, mask, polygon):
+        self.bbox = bbox
+        self.scale = scale
+        self.resized = resized
+        self.pad = pad
+        self.mask = mask
+        self.polygon = polygon
+
+
+class InferenceGeometry:
+    # size: (lebar, tinggi) input inferensi, kelipatan stride model
+    # roi : poligon ternormalisasi (N, 2) atau None untuk seluruh frame
+    def __init__(self, size=(640, 640), roi=None, pad_value=PAD_VALUE):
+        self.size = tuple(size)
+        self.roi = roi
+        self.pad_value = pad_value
+        self._layouts = {}
+
+    # imgsz untuk predict Ultralytics (tinggi, lebar)
+    @property
+    def imgsz(self):
+        return self.size[1], self.size[0]
+
+    # Potongan, skala, padding, dan mask dihitung sekali per ukuran frame
+    def _layout(self, width, height):
+        layout = self._layouts.get((width, height))
+        if layout is not None:
+            return layout
+
+        polygon = None
+        x0, y0, x1, y1 = 0, 0, width, height
+        if self.roi is not None:
+            polygon = self.roi * (width, height)
+            x0, y0 = np.floor(polygon.min(axis=0)).astype(int)
+            x1, y1 = np.ceil(polygon.max(axis=0)).astype(int)
+            x0, y0 = max(0, x0), max(0, y0)
+            x1, y1 = min(width, max(x1, x0 + 1)), min(height, max(y1, y0 + 1))
+
+        target_w, target_h = self.size
+        crop_w, crop_h = x1 - x0, y1 - y0
+        scale = min(target_w / crop_w, target_h / crop_h)
+        resized = (max(1, round(crop_w * scale)), max(1, round(crop_h * scale)))
+        pad = ((target_w - resized[0]) // 2, (target_h - resized[1]) // 2)
+
+        mask = None
+        if polygon is not None:
+            points = ((polygon - (x0, y0)) * scale).round().astype(np.int32)
+            mask = np.zeros((resized[1], resized[0]), dtype=np.uint8)
+            cv2.fillPoly(mask, [points], 1)
+            mask = mask.astype(bool)
+            if mask.all():
+                # ROI berbentuk persegi panjang: cukup dipotong
+                mask = None
+
+        layout = self._layouts[(width, height)] = _Layout((x0, y0, x1, y1), scale, resized, pad, mask, polygon)
+        return layout
+
+    # Frame BGR -> (gambar input inferensi berukuran `size`, FrameTransform)
+    def prepare(self, frame):
+        height, width = frame.shape[:2]
+        layout = self._layout(width, height)
+        x0, y0, x1, y1 = layout.bbox
+        crop = frame[y0:y1, x0:x1]
+        interpolation = cv2.INTER_AREA if layout.scale < 1 else cv2.INTER_LINEAR
+        resized = cv2.resize(crop, layout.resized, interpolation=interpolation)
+
+        target_w, target_h = self.size
+        canvas = np.full((target_h, target_w) + frame.shape[2:], self.pad_value, dtype=frame.dtype)
+        pad_x, pad_y = layout.pad
+        region = canvas[pad_y:pad_y + layout.resized[1], pad_x:pad_x + layout.resized[0]]
+        if layout.mask is None:
+            region[...] = resized
+        else:
+            np.copyto(region, resized, where=layout.mask[..., None] if resized.ndim == 3 else layout.mask)
+        return canvas, FrameTransform(frame, layout.scale, layout.pad, (x0, y0), layout.polygon)
+
+    # Proporsi piksel input yang berasal dari frame (bukan padding/luar ROI)
+    def coverage(self, width, height):
+        layout = self._layout(width, height)
+        used = layout.mask.sum() if layout.mask is not None else layout.resized[0] * layout.resized[1]
+        return used / (self.size[0] * self.size[1])
@@ -0,0 +1,57 @@
+# history.py
+# Fungsi bantu halaman Riwayat: indeks waktu terurut, pemotongan per tanggal
+# dengan searchsorted, paginasi, dan downsampling. Semua operasi setelah
+# indeks dibangun bekerja dengan potongan (slice) sehingga waktu render tidak
+# bergantung pada jumlah total baris.
+import datetime
+
+import numpy as np
+import pandas as pd
+
+
+# Bangun DataFrame dengan DatetimeIndex terurut dari kolom timestamp.
+# Jika data sudah terurut (misalnya dari penyimpanan lokal), tidak ada pengurutan ulang.
+def build_time_index(df, column='timestamp'):
+    timestamps = df[column]
+    if not pd.api.types.is_datetime64_any_dtype(timestamps):
+        timestamps = pd.to_datetime(timestamps)
+    index = pd.DatetimeIndex(timestamps, name=column)
+    indexed = df.drop(columns=[column]).set_axis(index, axis=0)
+    if not index.is_monotonic_increasing:
+        indexed = indexed.sort_index(kind='stable')
+    return indexed
+
+
+# Baris pada satu tanggal: dua pencarian biner pada indeks, bukan perbandingan per baris
+def slice_day(indexed, date):
+    start = pd.Timestamp(datetime.datetime.combine(date, datetime.time.min))
+    if indexed.index.tz is not None:
+        start = start.tz_localize(indexed.index.tz)
+    end = start + pd.Timedelta(days=1)
+    lo = indexed.index.searchsorted(start, side='left')
+    hi = indexed.index.searchsorted(end, side='left')
+    return indexed.iloc[lo:hi]
+
+
+def page_count(total_rows, page_size):
+    return max(1, -(-total_rows // page_size))
+
+
+# Satu halaman data (page dimulai dari 1)
+def paginate(df, page, page_size):
+    page = min(max(1, page), page_count(len(df), page_size))
+    start = (page - 1) * page_size
+    return df.iloc[start:start + page_size]
+
+
+# Ambil paling banyak max_rows baris yang tersebar merata (baris pertama dan terakhir selalu ikut)
+def downsample(df, max_rows):
+    if len(df) <= max_rows:
+        return df
+    positions = np.linspace(0, len(df) - 1, max_rows).round().astype(np.intp)
+    return df.iloc[np.unique(positions)]
+
+
+# Kembalikan indeks waktu menjadi kolom timestamp untuk ditampilkan
+def to_display(df, column='timestamp'):
+    return df.rename_axis(column).reset_index()
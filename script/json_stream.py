@@ -0,0 +1,210 @@
+# json_stream.py
+# Parser JSON inkremental untuk respons riwayat berbentuk array objek
+# ([{...}, {...}, ...]). Potongan byte dari response.iter_content() didekode
+# dengan parser C bawaan modul json (json.loads per potongan, atau scanner yang
+# dipakai JSONDecoder.raw_decode per elemen), lalu setiap batch langsung
+# dimasukkan ke array kolom bertipe (ColumnBuilder). Daftar dict untuk seluruh
+# respons tidak pernah disimpan: yang ada di memori hanya sisa potongan yang
+# belum lengkap, satu batch nilai, dan array kolom hasil akhirnya.
+import codecs
+import json
+import re
+
+import numpy as np
+import pandas as pd
+
+# Ukuran potongan untuk iter_content
+CHUNK_SIZE = 64 * 1024
+
+# Nilai int64 untuk NaT (timestamp yang tidak bisa di-parse)
+NAT = np.iinfo(np.int64).min
+
+_SCAN = json.JSONDecoder().scan_once
+_WHITESPACE = re.compile(r"\s*")
+_SEPARATOR = re.compile(r"\s*,\s*")
+
+
+# Hasilkan elemen array JSON per batch (satu list per potongan input) dari
+# iterable potongan bytes/str. Melempar ValueError jika dokumen bukan array,
+# tidak valid, atau terpotong.
+def iter_json_batches(chunks):
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    buffer = ""
+    pos = 0
+    # Status: "[" = menunggu awal array, "value" = menunggu elemen,
+    # "next" = menunggu "," atau "]", "end" = array selesai
+    state = "["
+    empty = True
+    done = False
+    chunks = iter(chunks)
+
+    while not done:
+        chunk = next(chunks, None)
+        if chunk is None:
+            text = decoder.decode(b"", final=True)
+            done = True
+        else:
+            text = decoder.decode(chunk) if isinstance(chunk, bytes) else chunk
+        buffer = buffer[pos:] + text
+        pos = 0
+        size = len(buffer)
+        batch = []
+        bulk = True
+
+        while True:
+            pos = _WHITESPACE.match(buffer, pos).end()
+            if pos == size:
+                break
+            if state == "value":
+                if bulk:
+                    # Jalur cepat: semua elemen lengkap sampai "}" terakhir di potongan
+                    # didekode sekaligus oleh json.loads; jika potongan itu ternyata
+                    # bukan batas elemen (misalnya "}" di dalam string atau objek
+                    # bersarang), elemen dibaca satu per satu dengan scanner
+                    bulk = False
+                    cut = buffer.rfind("}", pos) + 1
+                    if cut > pos:
+                        try:
+                            values = json.loads("[" + buffer[pos:cut] + "]")
+                        except ValueError:
+                            pass
+                        else:
+                            batch.extend(values)
+                            empty = False
+                            pos = cut
+                            state = "next"
+                            continue
+                try:
+                    value, end = _SCAN(buffer, pos)
+                except (StopIteration, json.JSONDecodeError):
+                    if empty and buffer[pos] == "]":
+                        pos += 1
+                        state = "end"
+                        continue
+                    if done:
+                        raise ValueError("Elemen JSON tidak valid")
+                    # Elemen belum lengkap: tunggu potongan berikutnya
+                    break
+                if not done and buffer[pos] not in '{["':
+                    # Skalar (angka, true/false/null) mungkin masih berlanjut di potongan
+                    # berikutnya, misalnya "-25000000000." + "0]": scanner sudah berhasil
+                    # membaca "-25000000000". Tunggu sampai skalar diikuti "," atau "]".
+                    follow = _WHITESPACE.match(buffer, end).end()
+                    if follow == size or buffer[follow] not in ",]":
+                        break
+                batch.append(value)
+                empty = False
+                # Jalur cepat: pemisah "," langsung diikuti elemen berikutnya
+                separator = _SEPARATOR.match(buffer, end)
+                if separator is not None:
+                    pos = separator.end()
+                else:
+                    pos = end
+                    state = "next"
+            elif state == "next":
+                char = buffer[pos]
+                if char == ",":
+                    state = "value"
+                elif char == "]":
+                    state = "end"
+                else:
+                    raise ValueError(f"Karakter tak terduga {char!r} dalam array JSON")
+                pos += 1
+            elif state == "[":
+                if buffer[pos] != "[":
+                    raise ValueError("Respons JSON bukan array")
+                pos += 1
+                state = "value"
+            else:
+                raise ValueError("Data tambahan setelah akhir array JSON")
+
+        if batch:
+            yield batch
+
+    if state != "end":
+        raise ValueError("Array JSON terpotong")
+
+
+# Hasilkan setiap elemen array JSON satu per satu
+def iter_json_array(chunks):
+    for batch in iter_json_batches(chunks):
+        yield from batch
+
+
+# Kumpulkan record (dict) menjadi array kolom bertipe.
+# schema: nama kolom -> dtype NumPy; kolom "timestamp" selalu ada dan disimpan
+# sebagai int64 nanodetik (UTC naive, sama seperti parse_timestamp).
+# Nilai ditampung per batch lalu dikonversi sekaligus, sehingga biaya per record
+# kecil dan memori sementara dibatasi ukuran batch.
+class ColumnBuilder:
+    def __init__(self, schema, batch_size=8192):
+        self.schema = {name: np.dtype(dtype) for name, dtype in schema.items()}
+        self.batch_size = batch_size
+        self.records = 0
+        self._chunks = {name: [] for name in ("timestamp", *self.schema)}
+        self._batch = {name: [] for name in ("timestamp", *self.schema)}
+        self._pending = 0
+
+    # Tambahkan list record sekaligus (misalnya satu batch dari iter_json_batches)
+    def add_batch(self, records):
+        for name, values in self._batch.items():
+            values.extend([record.get(name) for record in records])
+        self.records += len(records)
+        self._pending += len(records)
+        if self._pending >= self.batch_size:
+            self._flush()
+
+    def add(self, record):
+        self.add_batch([record])
+
+    def extend(self, records):
+        records = list(records)
+        for i in range(0, len(records), self.batch_size):
+            self.add_batch(records[i:i + self.batch_size])
+        return self
+
+    def _flush(self):
+        raw = self._batch["timestamp"]
+        if not raw:
+            return
+        self._chunks["timestamp"].append(_timestamps_ns(raw))
+        for name, dtype in self.schema.items():
+            fill = np.nan if dtype.kind == "f" else 0
+            values = self._batch[name]
+            self._chunks[name].append(np.array([fill if value is None else value for value in values], dtype=dtype))
+        for values in self._batch.values():
+            values.clear()
+        self._pending = 0
+
+    # Dict kolom -> array; baris tanpa timestamp yang valid dibuang
+    def finish(self):
+        self._flush()
+        columns = {}
+        for name, chunks in self._chunks.items():
+            dtype = np.dtype(np.int64) if name == "timestamp" else self.schema[name]
+            columns[name] = np.concatenate(chunks) if chunks else np.empty(0, dtype=dtype)
+            chunks.clear()
+        valid = columns["timestamp"] != NAT
+        if not valid.all():
+            columns = {name: values[valid] for name, values in columns.items()}
+        return columns
+
+
+# Timestamp ISO 8601 -> int64 nanodetik. Nilai yang gagal di-parse secara
+# vektor (misalnya format campuran) dicoba ulang satu per satu.
+def _timestamps_ns(values):
+    parsed = pd.to_datetime(values, utc=True, errors="coerce", format="ISO8601")
+    result = parsed.as_unit("ns").asi8.copy()
+    for i in np.flatnonzero(result == NAT):
+        if values[i] is None:
+            continue
+        try:
+            timestamp = pd.Timestamp(values[i])
+        except (ValueError, TypeError):
+            continue
+        if timestamp is pd.NaT:
+            continue
+        if timestamp.tzinfo is not None:
+            timestamp = timestamp.tz_convert("UTC").tz_localize(None)
+        result[i] = timestamp.as_unit("ns").value
+    return result
@@ -1,78 +1,342 @@
 # agent.py
+import hashlib
+import json
+import numbers
 import os
-import pandas as pd
-from pymongo import MongoClient
-import google.generativeai as genai
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+from script.config import CACHE_DIR
+from script.metrics import count, timer
 
 # === Konfigurasi API ===
 GOOGLE_API_KEY = os.environ.get("GOOGLE_API_KEY")
 MONGO_URI = os.environ.get("MONGO_URI")
-genai.configure(api_key=GOOGLE_API_KEY)
+LLM_MODEL_NAME = "gemini-2.0-flash"
 
-# === MongoDB Setup ===
-client = MongoClient(MONGO_URI)
-db = client['samsung']
-collection = db['sensor']
+# === Klien lazy ===
+# pymongo dan google.generativeai baru diimpor dan dikonfigurasi saat pertama
+# kali dibutuhkan, sehingga mengimpor modul ini tidak memperlambat startup
+# halaman. Setiap klien dibuat sekali per proses (singleton).
+_init_lock = threading.Lock()
+_mongo_client = None
+_gemini_model = None
 
-# === Fungsi ambil dan analisis data sensor ===
-def analyze_summary():
-    data = list(collection.find({}, {"_id": 0}))
-    if not data:
-        return "Data sensor tidak ditemukan."
+# Klien MongoDB bersama (pymongo mengelola pool koneksi di dalamnya)
+def get_mongo_client():
+    global _mongo_client
+    if _mongo_client is None:
+        with _init_lock:
+            if _mongo_client is None:
+                from pymongo import MongoClient
+                _mongo_client = MongoClient(MONGO_URI, maxPoolSize=20, serverSelectionTimeoutMS=5000)
+    return _mongo_client
 
-    df = pd.DataFrame(data)
+def get_collection():
+    return get_mongo_client()['samsung']['sensor']
 
-    # Statistik ringkas
-    summary = {
-        "Jumlah data": len(df),
-        "Rata-rata suhu": round(df["temperature"].mean(), 2),
-        "Suhu maksimum": df["temperature"].max(),
-        "Suhu minimum": df["temperature"].min(),
-        "Rata-rata kelembaban": round(df["humidity"].mean(), 2),
-    }
+# Instance GenerativeModel bersama
+def get_gemini_model():
+    global _gemini_model
+    if _gemini_model is None:
+        with _init_lock:
+            if _gemini_model is None:
+                import google.generativeai as genai
+                genai.configure(api_key=GOOGLE_API_KEY)
+                _gemini_model = genai.GenerativeModel(LLM_MODEL_NAME)
+    return _gemini_model
 
-    # Format ke dalam string untuk prompt
-    summary_text = "\n".join([f"- {key}: {value}" for key, value in summary.items()])
-    prompt = f"""
-Berikut adalah ringkasan statistik:
+# Siapkan koneksi MongoDB dan model Gemini di thread latar belakang,
+# agar permintaan pertama tidak menunggu proses inisialisasi.
+# Kegagalan dicatat ke metrik warm_up_failed dan disimpan untuk ditampilkan halaman.
+_warm_up_thread = None
+_warm_up_error = None
 
-{summary_text}
+def warm_up():
+    global _warm_up_thread
+    if _warm_up_thread is not None:
+        return _warm_up_thread
 
-Tolong buatkan informasi deskriptif seperti penjelasan manusia, dalam bahasa Indonesia. Hubungkan dengan kondisi lingkungan dan perilaku ketika pembelajaran, Jelaskan secara singkat maksimal 2 paragraf.
-"""
+    def _run():
+        global _warm_up_error
+        for service, init in (("MongoDB", lambda: get_mongo_client().admin.command("ping")),
+                              ("Gemini", get_gemini_model)):
+            try:
+                init()
+            except Exception as e:
+                count("warm_up_failed")
+                _warm_up_error = (service, e)
 
-    # Kirim ke Gemini
-    model = genai.GenerativeModel("gemini-2.0-flash")
-    response = model.generate_content(prompt)
-    return response.text
+    _warm_up_thread = threading.Thread(target=_run, name="langchain-warm-up", daemon=True)
+    _warm_up_thread.start()
+    return _warm_up_thread
 
-def analyze_data():
-    data = list(collection.find({}, {"_id": 0}))
-    if not data:
-        return "Data sensor tidak ditemukan."
+# (layanan, exception) dari kegagalan warm-up terakhir, atau None
+def warm_up_error():
+    return _warm_up_error
+
+# === Statistik sensor berjalan ===
+# Statistik disimpan sebagai jumlah/maks/min kumulatif dan hanya diperbarui dari
+# dokumen dengan _id setelah _id terakhir yang sudah dihitung (ObjectId naik
+# seiring waktu penyisipan), sehingga biaya per panggilan sebanding dengan
+# jumlah dokumen baru, bukan ukuran koleksi.
+
+# Hitung 1 jika field ada dan tidak null (sama seperti nilai yang dihitung oleh mean pandas)
+def _present_count(field):
+    return {"$sum": {"$cond": [{"$gt": [field, None]}, 1, 0]}}
+
+def _merge_extreme(current, new, pick):
+    if new is None:
+        return current
+    if current is None:
+        return new
+    return pick(current, new)
+
+class SensorStatsStore:
+    # sensor_collection: koleksi MongoDB; jika None, koleksi bawaan diambil saat pertama dipakai
+    def __init__(self, sensor_collection=None):
+        self._collection = sensor_collection
+        self._lock = threading.Lock()
+        self.reset()
+
+    @property
+    def collection(self):
+        if self._collection is None:
+            self._collection = get_collection()
+        return self._collection
+
+    # Reset statistik berjalan (misalnya setelah data di koleksi dihapus)
+    def reset(self):
+        self.stats = {
+            "count": 0,
+            "temp_count": 0,
+            "temp_sum": 0.0,
+            "temp_max": None,
+            "temp_min": None,
+            "hum_count": 0,
+            "hum_sum": 0.0,
+            "last_id": None,
+        }
+
+    # Perbarui statistik berjalan dengan agregasi $group atas dokumen baru saja
+    def update(self):
+        with self._lock:
+            stats = self.stats
+            match = {"_id": {"$gt": stats["last_id"]}} if stats["last_id"] is not None else {}
+            pipeline = [
+                {"$match": match},
+                {"$group": {
+                    "_id": None,
+                    "count": {"$sum": 1},
+                    "temp_count": _present_count("$temperature"),
+                    "temp_sum": {"$sum": "$temperature"},
+                    "temp_max": {"$max": "$temperature"},
+                    "temp_min": {"$min": "$temperature"},
+                    "hum_count": _present_count("$humidity"),
+                    "hum_sum": {"$sum": "$humidity"},
+                    "last_id": {"$max": "$_id"},
+                }},
+            ]
+            with timer("mongo_aggregate"):
+                groups = list(self.collection.aggregate(pipeline))
+            for group in groups:
+                stats["count"] += group["count"]
+                stats["temp_count"] += group["temp_count"]
+                stats["temp_sum"] += group["temp_sum"] or 0
+                stats["temp_max"] = _merge_extreme(stats["temp_max"], group["temp_max"], max)
+                stats["temp_min"] = _merge_extreme(stats["temp_min"], group["temp_min"], min)
+                stats["hum_count"] += group["hum_count"]
+                stats["hum_sum"] += group["hum_sum"] or 0
+                stats["last_id"] = _merge_extreme(stats["last_id"], group["last_id"], max)
+            return dict(stats)
+
+    # Statistik ringkas dalam format yang dipakai di prompt
+    def summary(self):
+        stats = self.update()
+        if stats["count"] == 0:
+            return None
+
+        return {
+            "Jumlah data": stats["count"],
+            "Rata-rata suhu": round(stats["temp_sum"] / stats["temp_count"], 2) if stats["temp_count"] else None,
+            "Suhu maksimum": stats["temp_max"],
+            "Suhu minimum": stats["temp_min"],
+            "Rata-rata kelembaban": round(stats["hum_sum"] / stats["hum_count"], 2) if stats["hum_count"] else None,
+        }
+
+sensor_stats = SensorStatsStore()
+
+# Statistik ringkas yang dipakai bersama oleh analyze_summary dan analyze_data
+def get_sensor_summary():
+    return sensor_stats.summary()
 
-    df = pd.DataFrame(data)
+# === Cache respons LLM ===
+# Respons Gemini disimpan di SQLite (dipakai bersama oleh semua sesi dan proses
+# Streamlit) dengan kunci hash dari ringkasan statistik yang dibulatkan,
+# template prompt, dan nama model. Entri kedaluwarsa setelah ttl detik dan
+# entri yang paling lama tidak diakses dibuang jika melebihi max_entries.
+LLM_CACHE_PATH = os.path.join(CACHE_DIR, "llm_cache.sqlite")
 
-    # Statistik ringkas
-    summary = {
-        "Jumlah data": len(df),
-        "Rata-rata suhu": round(df["temperature"].mean(), 2),
-        "Suhu maksimum": df["temperature"].max(),
-        "Suhu minimum": df["temperature"].min(),
-        "Rata-rata kelembaban": round(df["humidity"].mean(), 2),
-    }
+class LLMResponseCache:
+    def __init__(self, path=LLM_CACHE_PATH, ttl=1800, max_entries=256):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._memory_conn = sqlite3.connect(":memory:", check_same_thread=False) if path == ":memory:" else None
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, response TEXT NOT NULL, "
+                "created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
 
+    # Koneksi per operasi (aman dipakai dari thread sesi mana pun), di-commit lalu ditutup
+    @contextmanager
+    def _connect(self):
+        if self._memory_conn is not None:
+            with self._memory_conn:
+                yield self._memory_conn
+            return
+        conn = sqlite3.connect(self.path, timeout=5)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    # Kunci cache: angka desimal dibulatkan dan jumlah data dikelompokkan,
+    # sehingga perubahan kecil pada statistik tidak memicu panggilan LLM baru
+    @staticmethod
+    def make_key(summary, template, model_name=LLM_MODEL_NAME, digits=1, count_bucket=100):
+        rounded = {}
+        for name, value in summary.items():
+            if name == "Jumlah data":
+                rounded[name] = int(value) // count_bucket * count_bucket
+            elif isinstance(value, numbers.Number):
+                rounded[name] = round(float(value), digits)
+            else:
+                rounded[name] = value
+        payload = json.dumps({"summary": rounded, "template": template, "model": model_name}, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            row = conn.execute(
+                "SELECT response, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or now - row[1] > self.ttl:
+                if row is not None:
+                    conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self.misses += 1
+                return None
+            conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            self.hits += 1
+            return row[0]
+
+    def set(self, key, response):
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, response, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, response, now, now)
+            )
+            conn.execute("DELETE FROM responses WHERE created_at < ?", (now - self.ttl,))
+            conn.execute(
+                "DELETE FROM responses WHERE key NOT IN "
+                "(SELECT key FROM responses ORDER BY accessed_at DESC LIMIT ?)",
+                (self.max_entries,)
+            )
+
+    def clear(self):
+        with self._lock, self._connect() as conn:
+            conn.execute("DELETE FROM responses")
+
+    def stats(self):
+        with self._lock, self._connect() as conn:
+            entries = conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": entries,
+        }
+
+_llm_cache = None
+
+# Cache respons bersama, dibuka saat pertama kali dipakai
+def get_llm_cache():
+    global _llm_cache
+    if _llm_cache is None:
+        with _init_lock:
+            if _llm_cache is None:
+                _llm_cache = LLMResponseCache()
+    return _llm_cache
+
+# Klien LLM bawaan; bisa diganti objek lain yang punya generate_content(prompt) -> .text
+def default_llm():
+    return get_gemini_model()
+
+# Jalankan prompt lewat cache: LLM hanya dipanggil jika kunci belum ada atau sudah kedaluwarsa
+def _cached_generate(summary, instruction, llm=None, cache=None):
+    cache = cache if cache is not None else get_llm_cache()
+    key = cache.make_key(summary, instruction)
+    response_text = cache.get(key)
+    if response_text is not None:
+        count("llm_cache_hit")
+        return response_text
+    count("llm_cache_miss")
+
+    prompt = _build_prompt(summary, instruction)
+
+    # Kirim ke Gemini
+    model = llm if llm is not None else default_llm()
+    with timer("llm_gemini"):
+        response = model.generate_content(prompt)
+    cache.set(key, response.text)
+    return response.text
+
+def _build_prompt(summary, instruction):
     # Format ke dalam string untuk prompt
     summary_text = "\n".join([f"- {key}: {value}" for key, value in summary.items()])
-    prompt = f"""
+    return f"""
 Berikut adalah ringkasan statistik:
 
 {summary_text}
 
-Tolong buatkan analisis deskriptif seperti penjelasan manusia, dalam bahasa Indonesia. Hubungkan dengan kondisi lingkungan dan perilaku ketika pembelajaran, Buat analisis yang mendalam dan informasi yang berguna untuk tindak lanjut.
+{instruction}
 """
 
-    # Kirim ke Gemini
-    model = genai.GenerativeModel("gemini-2.0-flash")
-    response = model.generate_content(prompt)
-    return response.text
\ No newline at end of file
+# === Fungsi ambil dan analisis data sensor ===
+def analyze_summary(llm=None, cache=None):
+    summary = get_sensor_summary()
+    if summary is None:
+        return "Data sensor tidak ditemukan."
+
+    return _cached_generate(
+        summary,
+        "Tolong buatkan informasi deskriptif seperti penjelasan manusia, dalam bahasa Indonesia. Hubungkan dengan kondisi lingkungan dan perilaku ketika pembelajaran, Jelaskan secara singkat maksimal 2 paragraf.",
+        llm,
+        cache
+    )
+
+def analyze_data(llm=None, cache=None):
+    summary = get_sensor_summary()
+    if summary is None:
+        return "Data sensor tidak ditemukan."
+
+    return _cached_generate(
+        summary,
+        "Tolong buatkan analisis deskriptif seperti penjelasan manusia, dalam bahasa Indonesia. Hubungkan dengan kondisi lingkungan dan perilaku ketika pembelajaran, Buat analisis yang mendalam dan informasi yang berguna untuk tindak lanjut.",
+        llm,
+        cache
+    )
@@ -0,0 +1,301 @@
+# metrics.py
+# Instrumentasi performa ringan yang aman dibiarkan aktif di produksi.
+# - Histogram latensi per tahap (bucket tetap ala Prometheus + jendela sampel
+#   terbaru untuk p50/p95 "live") dan counter kejadian (frame, drop, error).
+# - timer(stage) / @timed(stage) mencatat durasi dan menghitung error jika
+#   terjadi exception.
+# - Setiap pencatatan masuk ke registry proses (PROCESS_METRICS) dan, jika
+#   dipanggil dari thread skrip Streamlit yang sudah memanggil track_session(),
+#   juga ke registry sesi di st.session_state.
+# - Ekspor format teks Prometheus: file (textfile collector node_exporter) dan
+#   opsional endpoint HTTP /metrics jika EDUDETECT_METRICS_PORT diisi.
+# Biaya per pencatatan hanya dua perf_counter, satu lock, dan bisect (beberapa µs,
+# lihat benchmarks/bench_metrics_overhead.py).
+import contextvars
+import functools
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from script.config import CACHE_DIR
+
+METRICS_PREFIX = "edudetect"
+METRICS_FILE = os.environ.get("EDUDETECT_METRICS_FILE", os.path.join(CACHE_DIR, "metrics.prom"))
+METRICS_PORT = os.environ.get("EDUDETECT_METRICS_PORT")
+
+# Batas bucket latensi (detik)
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Jendela laju (detik) untuk kolom "per detik" di snapshot
+RATE_WINDOW = 10.0
+
+
+class Histogram:
+    # window: jumlah sampel terbaru yang disimpan untuk persentil live
+    def __init__(self, buckets=DEFAULT_BUCKETS, window=1024):
+        self.buckets = buckets
+        self.bucket_counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        self.errors = 0
+        self.recent = deque(maxlen=window)
+
+    def observe(self, seconds, now, error=False):
+        self.bucket_counts[bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        if seconds > self.max:
+            self.max = seconds
+        if error:
+            self.errors += 1
+        self.recent.append((now, seconds))
+
+    def summary(self, now):
+        values = sorted(value for _, value in self.recent)
+        in_window = sum(1 for at, _ in self.recent if now - at <= RATE_WINDOW)
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "rate": in_window / RATE_WINDOW,
+            "mean_ms": self.sum / self.count * 1000 if self.count else 0.0,
+            "p50_ms": percentile(values, 0.50) * 1000,
+            "p95_ms": percentile(values, 0.95) * 1000,
+            "max_ms": self.max * 1000,
+        }
+
+
+# Persentil dari daftar yang sudah terurut (0 jika kosong)
+def percentile(values, q):
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+class MetricsRegistry:
+    def __init__(self, buckets=DEFAULT_BUCKETS, window=1024):
+        self.buckets = buckets
+        self.window = window
+        self.started_at = time.time()
+        self._histograms = {}
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def observe(self, stage, seconds, error=False, now=None):
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            histogram = self._histograms.get(stage)
+            if histogram is None:
+                histogram = self._histograms[stage] = Histogram(self.buckets, self.window)
+            histogram.observe(seconds, now, error)
+
+    def count(self, event, n=1):
+        with self._lock:
+            self._counters[event] = self._counters.get(event, 0) + n
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+            self.started_at = time.time()
+
+    # Ringkasan per tahap dan nilai counter untuk ditampilkan
+    def snapshot(self):
+        now = time.monotonic()
+        with self._lock:
+            return {
+                "uptime_s": time.time() - self.started_at,
+                "stages": {stage: h.summary(now) for stage, h in sorted(self._histograms.items())},
+                "counters": dict(sorted(self._counters.items())),
+            }
+
+    # Format eksposisi teks Prometheus
+    def prometheus_text(self, prefix=METRICS_PREFIX):
+        with self._lock:
+            histograms = [(stage, list(h.bucket_counts), h.sum, h.count, h.errors)
+                          for stage, h in sorted(self._histograms.items())]
+            counters = sorted(self._counters.items())
+
+        lines = [
+            f"# HELP {prefix}_stage_seconds Latensi per tahap pemrosesan.",
+            f"# TYPE {prefix}_stage_seconds histogram",
+        ]
+        for stage, bucket_counts, total, count, _ in histograms:
+            label = _escape(stage)
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, bucket_counts):
+                cumulative += bucket_count
+                lines.append(f'{prefix}_stage_seconds_bucket{{stage="{label}",le="{bound:g}"}} {cumulative}')
+            lines.append(f'{prefix}_stage_seconds_bucket{{stage="{label}",le="+Inf"}} {count}')
+            lines.append(f'{prefix}_stage_seconds_sum{{stage="{label}"}} {total:.6f}')
+            lines.append(f'{prefix}_stage_seconds_count{{stage="{label}"}} {count}')
+
+        lines += [
+            f"# HELP {prefix}_stage_errors_total Jumlah tahap yang berakhir dengan exception.",
+            f"# TYPE {prefix}_stage_errors_total counter",
+        ]
+        for stage, _, _, _, errors in histograms:
+            lines.append(f'{prefix}_stage_errors_total{{stage="{_escape(stage)}"}} {errors}')
+
+        lines += [
+            f"# HELP {prefix}_events_total Counter kejadian (frame, drop, cache hit, dsb.).",
+            f"# TYPE {prefix}_events_total counter",
+        ]
+        for event, value in counters:
+            lines.append(f'{prefix}_events_total{{event="{_escape(event)}"}} {value}')
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+# Registry satu proses (semua sesi dan thread latar belakang)
+PROCESS_METRICS = MetricsRegistry()
+
+# Registry sesi Streamlit yang sedang menjalankan skrip di thread/konteks ini
+_SESSION_METRICS = contextvars.ContextVar("edudetect_session_metrics", default=None)
+
+
+def observe(stage, seconds, error=False):
+    now = time.monotonic()
+    PROCESS_METRICS.observe(stage, seconds, error, now)
+    session = _SESSION_METRICS.get()
+    if session is not None:
+        session.observe(stage, seconds, error, now)
+
+
+def count(event, n=1):
+    PROCESS_METRICS.count(event, n)
+    session = _SESSION_METRICS.get()
+    if session is not None:
+        session.count(event, n)
+
+
+# Context manager pencatat durasi: `with timer("process_frame"): ...`
+class timer:
+    __slots__ = ("stage", "_start")
+
+    def __init__(self, stage):
+        self.stage = stage
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        observe(self.stage, time.perf_counter() - self._start, error=exc_type is not None)
+        return False
+
+
+# Dekorator pencatat durasi fungsi
+def timed(stage):
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with timer(stage):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# === Exporter ===
+class _MetricsHandler(BaseHTTPRequestHandler):
+    registry = PROCESS_METRICS
+
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = self.registry.prometheus_text().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class MetricsExporter:
+    # path: file teks Prometheus yang ditulis ulang setiap interval (None = nonaktif)
+    # port: port endpoint HTTP /metrics (None = nonaktif)
+    def __init__(self, registry=PROCESS_METRICS, path=METRICS_FILE, port=None, interval=15.0):
+        self.registry = registry
+        self.path = path
+        self.port = port
+        self.interval = interval
+        self.server = None
+        self.last_error = None
+        self._thread = None
+        self._stop_event = threading.Event()
+
+    def start(self):
+        if self.path and (self._thread is None or not self._thread.is_alive()):
+            self._stop_event.clear()
+            self._thread = threading.Thread(target=self._run, name="metrics-exporter", daemon=True)
+            self._thread.start()
+        if self.port and self.server is None:
+            handler = type("MetricsHandler", (_MetricsHandler,), {"registry": self.registry})
+            try:
+                self.server = ThreadingHTTPServer(("0.0.0.0", int(self.port)), handler)
+            except OSError as e:
+                # Port dipakai proses lain: endpoint HTTP dilewati, exporter file tetap jalan
+                count("metrics_exporter_failed")
+                self.last_error = str(e)
+            else:
+                self.last_error = None
+                threading.Thread(target=self.server.serve_forever, name="metrics-http", daemon=True).start()
+        return self
+
+    def stop(self):
+        self._stop_event.set()
+        if self.server is not None:
+            self.server.shutdown()
+            self.server = None
+
+    # Tulis file secara atomik agar collector tidak membaca file setengah jadi
+    def write(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path + ".tmp", "w", encoding="utf-8") as f:
+            f.write(self.registry.prometheus_text())
+        os.replace(self.path + ".tmp", self.path)
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            try:
+                self.write()
+            except OSError:
+                pass
+
+
+_exporter = None
+_exporter_lock = threading.Lock()
+
+
+# Satu exporter per proses; exporter yang gagal bind tetap di-cache agar
+# rerun halaman tidak mencoba port yang sama berulang kali
+def start_exporter():
+    global _exporter
+    if _exporter is None:
+        with _exporter_lock:
+            if _exporter is None:
+                _exporter = MetricsExporter(path=METRICS_FILE, port=METRICS_PORT).start()
+    return _exporter
+
+
+# Dipanggil di awal setiap halaman: pencatatan dari thread skrip sesi ini juga
+# masuk ke registry sesi (st.session_state), dan exporter proses dijalankan
+def track_session():
+    import streamlit as st
+
+    registry = st.session_state.get("_metrics")
+    if registry is None:
+        registry = st.session_state["_metrics"] = MetricsRegistry()
+    _SESSION_METRICS.set(registry)
+    start_exporter()
+    return registry
@@ -0,0 +1,154 @@
+# model_backend.py
+# Lapisan backend model deteksi untuk CPU.
+# Bobot YOLO11s (my_model.pt) bisa diekspor ke ONNX Runtime atau OpenVINO
+# (opsional INT8 dengan set kalibrasi) memakai exporter Ultralytics. Hasil ekspor
+# dimuat kembali lewat YOLO(...), sehingga API predict dan fungsi di
+# script/detection.py tetap sama untuk semua backend.
+# Backend dipilih saat aplikasi dimulai lewat EDUDETECT_MODEL_BACKEND atau sidebar.
+import csv
+import os
+import shutil
+import time
+
+import yaml
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Lokasi bobot sama seperti yang dipakai halaman Deteksi sebelumnya
+WEIGHTS_PATH = os.environ.get("EDUDETECT_MODEL_PATH", "../my_model/my_model.pt")
+TRAIN_ARGS_PATH = os.path.join(ROOT, "my_model", "train", "args.yaml")
+TRAIN_RESULTS_PATH = os.path.join(ROOT, "my_model", "train", "results.csv")
+
+# nama backend -> (format ekspor Ultralytics, INT8)
+BACKENDS = {
+    "pytorch": (None, False),
+    "onnx": ("onnx", False),
+    "openvino": ("openvino", False),
+    "openvino-int8": ("openvino", True),
+}
+
+DEFAULT_BACKEND = os.environ.get("EDUDETECT_MODEL_BACKEND", "pytorch")
+
+# YAML dataset untuk kalibrasi INT8 (format data.yaml Ultralytics)
+CALIBRATION_DATA = os.environ.get("EDUDETECT_CALIBRATION_DATA")
+
+
+# Konfigurasi training (imgsz, model dasar, dsb.) dari args.yaml
+def load_train_args(path=TRAIN_ARGS_PATH):
+    with open(path, "r", encoding="utf-8") as f:
+        return yaml.safe_load(f)
+
+
+# Metrik validasi epoch terakhir dari results.csv sebagai acuan akurasi
+def reference_metrics(path=TRAIN_RESULTS_PATH):
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        rows = [{key.strip(): value.strip() for key, value in row.items()} for row in csv.DictReader(f)]
+    last = rows[-1]
+    return {
+        "epoch": int(last["epoch"]),
+        "precision": float(last["metrics/precision(B)"]),
+        "recall": float(last["metrics/recall(B)"]),
+        "mAP50": float(last["metrics/mAP50(B)"]),
+        "mAP50-95": float(last["metrics/mAP50-95(B)"]),
+    }
+
+
+# Akhiran nama file untuk ekspor persegi panjang; imgsz berupa int (persegi) memakai nama bawaan
+def _shape_suffix(imgsz):
+    if imgsz is None or isinstance(imgsz, int):
+        return ""
+    height, width = imgsz
+    return f"_{height}x{width}"
+
+
+# Lokasi hasil ekspor sesuai penamaan Ultralytics (ditambah ukuran input untuk ekspor persegi panjang)
+def exported_path(weights, backend, imgsz=None):
+    export_format, int8 = BACKENDS[backend]
+    stem, _ = os.path.splitext(weights)
+    stem += _shape_suffix(imgsz)
+    if export_format == "onnx":
+        return stem + ".onnx"
+    if export_format == "openvino":
+        return stem + ("_int8" if int8 else "") + "_openvino_model"
+    return weights
+
+
+# Ekspor bobot ke backend tertentu (dilewati jika hasil ekspor sudah ada).
+# data: YAML dataset untuk kalibrasi INT8 (wajib untuk backend INT8).
+# imgsz: int (persegi) atau (tinggi, lebar) untuk input persegi panjang. Backend hasil
+# ekspor memakai ukuran input tetap, jadi setiap ukuran punya file ekspornya sendiri.
+def export_model(weights=WEIGHTS_PATH, backend="onnx", data=None, imgsz=None, force=False):
+    export_format, int8 = BACKENDS[backend]
+    if export_format is None:
+        return weights
+    target = exported_path(weights, backend, imgsz)
+    if os.path.exists(target) and not force:
+        return target
+    if int8 and data is None:
+        raise ValueError("Ekspor INT8 membutuhkan dataset kalibrasi (data)")
+
+    from ultralytics import YOLO
+
+    options = {
+        "format": export_format,
+        "imgsz": list(imgsz) if isinstance(imgsz, (list, tuple)) else imgsz or load_train_args().get("imgsz", 640),
+        "dynamic": False,
+        "half": False,
+    }
+    if export_format == "onnx":
+        options["simplify"] = True
+    if int8:
+        options.update(int8=True, data=data)
+    path = YOLO(weights).export(**options)
+    if os.path.normpath(path) != os.path.normpath(target):
+        # Ultralytics selalu memakai nama bawaan; pindahkan agar ekspor persegi tidak tertimpa
+        if os.path.isdir(target):
+            shutil.rmtree(target)
+        os.replace(path, target)
+    return target
+
+
+# Muat model untuk backend yang dipilih; hasil ekspor dibuat jika belum ada.
+# imgsz hanya berpengaruh untuk backend hasil ekspor (PyTorch menerima ukuran apa pun).
+def load_model(backend=None, weights=WEIGHTS_PATH, data=CALIBRATION_DATA, imgsz=None):
+    from ultralytics import YOLO
+
+    backend = backend or DEFAULT_BACKEND
+    if backend not in BACKENDS:
+        raise ValueError(f"Backend tidak dikenal: {backend}")
+    if BACKENDS[backend][0] is None:
+        return YOLO(weights)
+    return YOLO(export_model(weights, backend, data=data, imgsz=imgsz), task="detect")
+
+
+# Validasi model pada split val dataset lalu bandingkan dengan metrik di results.csv
+def validate(model, data, imgsz=None, reference=None):
+    imgsz = imgsz or load_train_args().get("imgsz", 640)
+    reference = reference or reference_metrics()
+    metrics = model.val(data=data, imgsz=imgsz, split="val", batch=1, plots=False, verbose=False)
+    result = {
+        "mAP50": float(metrics.box.map50),
+        "mAP50-95": float(metrics.box.map),
+    }
+    result["delta_mAP50"] = result["mAP50"] - reference["mAP50"]
+    result["delta_mAP50-95"] = result["mAP50-95"] - reference["mAP50-95"]
+    return result
+
+
+# Latensi per frame dan throughput predict untuk daftar frame BGR
+def measure_latency(model, frames, warmup=3, conf=0.3):
+    for frame in frames[:warmup]:
+        model.predict(frame, conf=conf, verbose=False)
+    timings = []
+    for frame in frames:
+        start = time.perf_counter()
+        model.predict(frame, conf=conf, verbose=False)
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    total = sum(timings)
+    return {
+        "mean_ms": total / len(timings) * 1000,
+        "p50_ms": timings[len(timings) // 2] * 1000,
+        "p95_ms": timings[min(len(timings) - 1, int(len(timings) * 0.95))] * 1000,
+        "fps": len(timings) / total,
+    }
@@ -0,0 +1,263 @@
+# pipeline.py
+# Mesin pipeline capture -> inferensi -> render untuk halaman Deteksi.
+# Tahap decode dan inferensi berjalan di thread worker masing-masing dan
+# dihubungkan dengan antrean terbatas. Tahap tampilan dikonsumsi oleh thread
+# script Streamlit (lewat results()), karena hanya thread tersebut yang
+# menerima sinyal stop/rerun dari Streamlit.
+import queue
+import threading
+import time
+
+# Penanda akhir aliran data antar tahap
+_SELESAI = object()
+
+
+# Antrean terbatas dengan kebijakan buang-terlama saat penuh
+class DropOldestQueue:
+    def __init__(self, maxsize=2):
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._lock = threading.Lock()
+        self.dropped = 0
+
+    def put(self, item):
+        with self._lock:
+            while True:
+                try:
+                    self._queue.put_nowait(item)
+                    return
+                except queue.Full:
+                    try:
+                        self._queue.get_nowait()
+                        self.dropped += 1
+                    except queue.Empty:
+                        pass
+
+    # Masukkan item tanpa membuang isi antrean (misalnya penanda akhir): tunggu
+    # sampai ada ruang. Setelah stop_event diset, item lama boleh dibuang.
+    def put_wait(self, item, stop_event):
+        while not stop_event.is_set():
+            with self._lock:
+                try:
+                    self._queue.put_nowait(item)
+                    return
+                except queue.Full:
+                    pass
+            time.sleep(0.01)
+        self.put(item)
+
+    def get(self, timeout=None):
+        return self._queue.get(timeout=timeout)
+
+    def get_nowait(self):
+        return self._queue.get_nowait()
+
+    def qsize(self):
+        return self._queue.qsize()
+
+
+# Antrean terbatas biasa: produsen menunggu jika konsumen tertinggal
+class BlockingQueue:
+    def __init__(self, maxsize=2, stop_event=None):
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._stop_event = stop_event or threading.Event()
+        self.dropped = 0
+
+    def put(self, item):
+        while not self._stop_event.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def put_wait(self, item, stop_event=None):
+        self.put(item)
+
+    def get(self, timeout=None):
+        return self._queue.get(timeout=timeout)
+
+    def get_nowait(self):
+        return self._queue.get_nowait()
+
+    def qsize(self):
+        return self._queue.qsize()
+
+
+# Penghitung throughput per tahap
+class StageStats:
+    def __init__(self, name):
+        self.name = name
+        self.items = 0
+        self.busy_seconds = 0.0
+        self._started = None
+        self._lock = threading.Lock()
+
+    def record(self, seconds, items=1):
+        with self._lock:
+            if self._started is None:
+                self._started = time.perf_counter() - seconds
+            self.items += items
+            self.busy_seconds += seconds
+
+    def snapshot(self):
+        with self._lock:
+            elapsed = time.perf_counter() - self._started if self._started else 0.0
+            return {
+                "items": self.items,
+                "fps": self.items / elapsed if elapsed > 0 else 0.0,
+                "avg_ms": 1000 * self.busy_seconds / self.items if self.items else 0.0,
+            }
+
+
+# Kumpulkan hingga batch_size item dari antrean. Setelah item pertama datang,
+# tunggu paling lama max_wait detik untuk melengkapi batch.
+# Mengembalikan (batch, selesai) dengan selesai=True jika penanda akhir diterima.
+def collect_batch(source_queue, batch_size, max_wait, timeout=0.1):
+    try:
+        item = source_queue.get(timeout=timeout)
+    except queue.Empty:
+        return [], False
+    if item is _SELESAI:
+        return [], True
+
+    batch = [item]
+    deadline = time.perf_counter() + max_wait
+    while len(batch) < batch_size:
+        remaining = deadline - time.perf_counter()
+        try:
+            item = source_queue.get(timeout=remaining) if remaining > 0 else source_queue.get_nowait()
+        except queue.Empty:
+            break
+        if item is _SELESAI:
+            return batch, True
+        batch.append(item)
+    return batch, False
+
+
+class FramePipeline:
+    # source     : iterable yang menghasilkan item frame (tahap decode)
+    # infer      : fungsi item -> hasil (tahap inferensi)
+    # infer_batch: opsional, fungsi [item] -> [hasil] untuk inferensi batch;
+    #              dipakai bersama batch_size dan max_wait (detik)
+    # drop_frames: True untuk sumber live (frame lama dibuang), False untuk
+    #              file video (decode menunggu inferensi, tidak ada frame hilang)
+    # Antrean hasil ke tahap tampilan selalu buang-terlama (muat satu batch), sehingga
+    # UI selalu menampilkan frame terbaru yang sudah diproses. Penanda akhir
+    # dimasukkan dengan put_wait, sehingga tidak pernah membuang hasil terakhir.
+    def __init__(self, source, infer=None, queue_size=2, drop_frames=False,
+                 infer_batch=None, batch_size=1, max_wait=0.05):
+        self._source = source
+        self._infer = infer
+        self._infer_batch = infer_batch
+        self._batch_size = max(1, batch_size)
+        self._max_wait = max_wait
+        self._stop_event = threading.Event()
+        # Antrean frame minimal sebesar satu batch
+        queue_size = max(queue_size, self._batch_size)
+        if drop_frames:
+            self._frames = DropOldestQueue(queue_size)
+        else:
+            self._frames = BlockingQueue(queue_size, self._stop_event)
+        self._results = DropOldestQueue(self._batch_size)
+        self._threads = []
+        self.error = None
+        self.stage_stats = {
+            "decode": StageStats("decode"),
+            "inference": StageStats("inference"),
+            "present": StageStats("present"),
+        }
+
+    def start(self):
+        self._threads = [
+            threading.Thread(target=self._run_decode, name="pipeline-decode", daemon=True),
+            threading.Thread(target=self._run_inference, name="pipeline-inference", daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def stop(self):
+        self._stop_event.set()
+
+    def join(self, timeout=None):
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def is_alive(self):
+        return any(thread.is_alive() for thread in self._threads)
+
+    # Tahap decode: baca frame dari sumber
+    def _run_decode(self):
+        iterator = iter(self._source)
+        try:
+            while not self._stop_event.is_set():
+                start = time.perf_counter()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    break
+                self.stage_stats["decode"].record(time.perf_counter() - start)
+                self._frames.put(item)
+        except Exception as e:
+            self.error = e
+            self._stop_event.set()
+        finally:
+            self._frames.put_wait(_SELESAI, self._stop_event)
+
+    # Tahap inferensi: jalankan model untuk setiap frame (atau batch frame) dari antrean
+    def _run_inference(self):
+        try:
+            while not self._stop_event.is_set():
+                if self._infer_batch is not None:
+                    batch, done = collect_batch(self._frames, self._batch_size, self._max_wait)
+                    if batch:
+                        start = time.perf_counter()
+                        results = self._infer_batch(batch)
+                        self.stage_stats["inference"].record(time.perf_counter() - start, len(batch))
+                        for result in results:
+                            self._results.put(result)
+                    if done:
+                        break
+                    continue
+
+                try:
+                    item = self._frames.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                if item is _SELESAI:
+                    break
+                start = time.perf_counter()
+                result = self._infer(item)
+                self.stage_stats["inference"].record(time.perf_counter() - start)
+                self._results.put(result)
+        except Exception as e:
+            self.error = e
+            self._stop_event.set()
+        finally:
+            self._results.put_wait(_SELESAI, self._stop_event)
+
+    # Tahap tampilan: generator yang dikonsumsi oleh thread pemanggil
+    def results(self):
+        try:
+            while True:
+                try:
+                    result = self._results.get(timeout=0.1)
+                except queue.Empty:
+                    if self._stop_event.is_set() and not self.is_alive():
+                        break
+                    continue
+                if result is _SELESAI:
+                    break
+                start = time.perf_counter()
+                yield result
+                self.stage_stats["present"].record(time.perf_counter() - start)
+        finally:
+            self.stop()
+
+    # Statistik throughput per tahap dan jumlah frame yang dibuang
+    def stats(self):
+        stats = {name: stage.snapshot() for name, stage in self.stage_stats.items()}
+        stats["decode"]["dropped"] = self._frames.dropped
+        stats["inference"]["dropped"] = self._results.dropped
+        stats["queue_depth"] = self._frames.qsize()
+        return stats
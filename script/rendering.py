@@ -0,0 +1,105 @@
+# rendering.py
+# Jalur tampilan ringan untuk halaman deteksi:
+# - frame di-encode sekali ke JPEG (kualitas dan lebar maksimum bisa diatur) dan
+#   dikirim ke st.image sebagai bytes, tanpa konversi BGR->RGB dan tanpa PNG
+# - indikator perhatian berupa donut HTML (conic-gradient) yang diperbarui di
+#   placeholder yang sama, bukan figure Plotly baru dengan key unik per frame
+# - pembaruan UI dibatasi ke target fps tampilan, terpisah dari fps inferensi
+import time
+
+import cv2
+
+from script.metrics import count, observe
+
+
+# Encode frame BGR ke JPEG. Frame diperkecil (INTER_AREA) jika lebih lebar dari max_width.
+def encode_jpeg(img, quality=80, max_width=None):
+    if max_width and img.shape[1] > max_width:
+        scale = max_width / img.shape[1]
+        img = cv2.resize(img, (max_width, max(1, round(img.shape[0] * scale))), interpolation=cv2.INTER_AREA)
+    ok, buffer = cv2.imencode(".jpg", img, [cv2.IMWRITE_JPEG_QUALITY, int(quality)])
+    if not ok:
+        raise ValueError("Gagal meng-encode frame ke JPEG")
+    return buffer.tobytes()
+
+
+# HTML donut persentase siswa memperhatikan (hijau) vs tidak (merah)
+def gauge_html(attentive_count, inattentive_count, size=220):
+    total = attentive_count + inattentive_count
+    percent = int((attentive_count / total) * 100) if total > 0 else 0
+    angle = percent * 3.6 if total > 0 else 0
+    background = f"conic-gradient(lightgreen 0deg {angle}deg, red {angle}deg 360deg)" if total > 0 else "#ddd"
+    hole = int(size * 0.6)
+    return (
+        f"<div style='display:flex;flex-direction:column;align-items:center;'>"
+        f"<div style='width:{size}px;height:{size}px;border-radius:50%;background:{background};"
+        f"display:flex;align-items:center;justify-content:center;'>"
+        f"<div style='width:{hole}px;height:{hole}px;border-radius:50%;background:white;"
+        f"display:flex;align-items:center;justify-content:center;font-size:24px;color:#333;'>{percent}%</div>"
+        f"</div>"
+        f"<h5 style='text-align: center;'>Siswa Memperhatikan</h5>"
+        f"</div>"
+    )
+
+
+# Batasi pembaruan tampilan ke target_fps; frame di antaranya dilewati
+class DisplayThrottle:
+    def __init__(self, target_fps=10):
+        self.interval = 1.0 / target_fps if target_fps else 0.0
+        self._last = None
+
+    def ready(self, now=None):
+        now = time.monotonic() if now is None else now
+        if self._last is not None and now - self._last < self.interval:
+            return False
+        self._last = now
+        return True
+
+
+class FrameRenderer:
+    def __init__(self, video_placeholder, gauge_placeholder, quality=80, max_width=960, display_fps=10):
+        self.video_placeholder = video_placeholder
+        self.gauge_placeholder = gauge_placeholder
+        self.quality = quality
+        self.max_width = max_width
+        self.throttle = DisplayThrottle(display_fps)
+        self._last_counts = None
+
+        self.rendered = 0
+        self.skipped = 0
+        self.encode_seconds = 0.0
+        self.bytes_sent = 0
+
+    # Tampilkan frame dan indikator jika sudah waktunya. Mengembalikan True jika UI diperbarui.
+    def render(self, img, attentive_count, inattentive_count, force=False):
+        if not force and not self.throttle.ready():
+            self.skipped += 1
+            count("frames_display_skipped")
+            return False
+
+        if img is not None:
+            start = time.perf_counter()
+            jpeg = encode_jpeg(img, self.quality, self.max_width)
+            elapsed = time.perf_counter() - start
+            self.encode_seconds += elapsed
+            observe("encode_jpeg", elapsed)
+            self.bytes_sent += len(jpeg)
+            self.video_placeholder.image(jpeg, use_container_width=True)
+
+        # Indikator hanya dikirim ulang jika jumlahnya berubah
+        counts = (attentive_count, inattentive_count)
+        if counts != self._last_counts:
+            self._last_counts = counts
+            self.gauge_placeholder.markdown(gauge_html(*counts), unsafe_allow_html=True)
+
+        self.rendered += 1
+        count("frames_rendered")
+        return True
+
+    def stats(self):
+        return {
+            "rendered": self.rendered,
+            "skipped": self.skipped,
+            "encode_ms": self.encode_seconds / self.rendered * 1000 if self.rendered else 0.0,
+            "kb_per_frame": self.bytes_sent / self.rendered / 1024 if self.rendered else 0.0,
+        }
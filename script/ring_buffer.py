@@ -0,0 +1,90 @@
+# ring_buffer.py
+# Ring buffer berbasis NumPy untuk deret waktu multi-kolom (misalnya jumlah
+# siswa memperhatikan/tidak, atau suhu/kelembaban/gerakan).
+# Setiap baris ditulis dua kali, di posisi i dan i + capacity, sehingga N baris
+# terakhir selalu berada di satu potongan memori yang berurutan: append O(1)
+# dan tampilan terurut bisa diambil sebagai view tanpa menyalin data.
+import threading
+
+import numpy as np
+import pandas as pd
+
+
+class TimeSeriesRing:
+    def __init__(self, capacity, columns, dtype=np.float64):
+        if capacity < 1:
+            raise ValueError("capacity harus minimal 1")
+        self.capacity = int(capacity)
+        self.columns = list(columns)
+        self._timestamps = np.zeros(2 * self.capacity, dtype=np.int64)
+        self._values = np.zeros((2 * self.capacity, len(self.columns)), dtype=dtype)
+        self._next = 0
+        self._size = 0
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return self._size
+
+    # Tambahkan satu baris. timestamp: datetime/Timestamp/datetime64; values sesuai urutan columns
+    def append(self, timestamp, *values):
+        if len(values) != len(self.columns):
+            raise ValueError(f"Butuh {len(self.columns)} nilai, diterima {len(values)}")
+        timestamp = np.datetime64(timestamp, "ns").astype(np.int64)
+        with self.lock:
+            self._write(timestamp, values)
+
+    # Tambahkan banyak baris sekaligus (array timestamp dan array 2D nilai)
+    def extend(self, timestamps, values):
+        timestamps = np.asarray(timestamps, dtype="datetime64[ns]").astype(np.int64)
+        values = np.asarray(values, dtype=self._values.dtype).reshape(len(timestamps), len(self.columns))
+        with self.lock:
+            for timestamp, row in zip(timestamps[-self.capacity:], values[-self.capacity:]):
+                self._write(timestamp, row)
+
+    # Tulis di dua posisi agar jendela terakhir selalu berurutan di memori
+    def _write(self, timestamp, row):
+        i = self._next
+        self._timestamps[i] = self._timestamps[i + self.capacity] = timestamp
+        self._values[i] = self._values[i + self.capacity] = row
+        self._next = (i + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+
+    # Rentang posisi untuk n baris terakhir (terurut dari yang terlama)
+    def _span(self, last=None):
+        n = self._size if last is None else min(int(last), self._size)
+        end = self._next + self.capacity
+        return end - n, end
+
+    # View terurut (tanpa salinan) dari timestamp dan nilai n baris terakhir.
+    # View ini ikut berubah jika buffer ditulis lagi; gunakan frame(copy=True)
+    # jika data dibaca dari thread lain.
+    def view(self, last=None):
+        start, end = self._span(last)
+        return self._timestamps[start:end].view("datetime64[ns]"), self._values[start:end]
+
+    def frame(self, last=None, timestamp_column="timestamp", copy=False):
+        with self.lock:
+            timestamps, values = self.view(last)
+            data = {timestamp_column: timestamps}
+            for j, column in enumerate(self.columns):
+                data[column] = values[:, j]
+            return pd.DataFrame(data, copy=copy)
+
+    def latest(self):
+        if self._size == 0:
+            return None
+        i = (self._next - 1) % self.capacity
+        return self._timestamps[i].astype("datetime64[ns]"), self._values[i].copy()
+
+    def clear(self):
+        with self.lock:
+            self._next = 0
+            self._size = 0
+
+    # Buffer baru dengan kapasitas lain yang berisi baris-baris terakhir buffer ini
+    def resized(self, capacity):
+        ring = TimeSeriesRing(capacity, self.columns, dtype=self._values.dtype)
+        with self.lock:
+            timestamps, values = self.view()
+            ring.extend(timestamps, values)
+        return ring
@@ -0,0 +1,302 @@
+# rollup.py
+# Mesin rollup multi-resolusi untuk grafik rentang panjang.
+# Untuk setiap partisi hari di penyimpanan deret waktu, bucket 1 menit
+# (jumlah, cacah, min, maks per kolom) dihitung sekali dari data mentah; bucket
+# 15 menit, 1 jam, dan 1 hari diturunkan dari bucket 1 menit tersebut.
+# Hasil disimpan di memori dan hanya dihitung ulang jika jumlah baris partisi
+# berubah, sehingga hari yang sudah lewat tidak pernah dihitung ulang.
+# Grafik memilih resolusi yang sesuai dengan rentang yang ditampilkan, sehingga
+# jumlah titik yang dikirim ke browser tetap di bawah max_points.
+import threading
+
+import altair as alt
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from script.timeseries_store import get_timeseries_store
+
+# (key, lebar bucket dalam detik, label)
+RESOLUTIONS = [
+    ("1min", 60, "1 menit"),
+    ("15min", 15 * 60, "15 menit"),
+    ("1h", 60 * 60, "1 jam"),
+    ("1day", 24 * 60 * 60, "1 hari"),
+]
+
+RESOLUTION_LABELS = {key: label for key, _, label in RESOLUTIONS}
+
+_NS = 1_000_000_000
+
+
+# Resolusi terhalus yang menghasilkan paling banyak max_points bucket untuk rentang ini
+def choose_resolution(span_seconds, max_points, resolutions=RESOLUTIONS):
+    for key, seconds, _ in resolutions:
+        if span_seconds / seconds <= max_points:
+            return key
+    return resolutions[-1][0]
+
+
+# Ubah array mentah menjadi komponen bucket (jumlah, cacah, min, maks) per baris; NaN diabaikan
+def _raw_parts(arrays, columns):
+    parts = {}
+    for column in columns:
+        values = np.asarray(arrays[column], dtype=np.float64)
+        valid = ~np.isnan(values)
+        parts[column] = (np.where(valid, values, 0.0), valid.astype(np.int64), values, values)
+    return parts
+
+
+# Gabungkan komponen per bucket selebar `seconds`. timestamps (int64 ns) harus terurut.
+def _reduce(timestamps, parts, seconds):
+    if len(timestamps) == 0:
+        return timestamps, parts
+    width = seconds * _NS
+    ids = timestamps // width
+    starts = np.flatnonzero(np.concatenate(([True], ids[1:] != ids[:-1])))
+    reduced = {}
+    for column, (sums, counts, mins, maxs) in parts.items():
+        reduced[column] = (
+            np.add.reduceat(sums, starts),
+            np.add.reduceat(counts, starts),
+            np.fmin.reduceat(mins, starts),
+            np.fmax.reduceat(maxs, starts),
+        )
+    return ids[starts] * width, reduced
+
+
+def _to_frame(timestamps, parts):
+    data = {"timestamp": np.asarray(timestamps, dtype=np.int64).view("datetime64[ns]")}
+    for column, (sums, counts, mins, maxs) in parts.items():
+        with np.errstate(invalid="ignore", divide="ignore"):
+            data[column] = np.where(counts > 0, sums / counts, np.nan)
+        data[f"{column}_min"] = mins
+        data[f"{column}_max"] = maxs
+    return pd.DataFrame(data)
+
+
+# Rollup untuk DataFrame di memori (kolom timestamp + kolom numerik)
+def rollup_frame(df, resolution, columns):
+    seconds = dict((key, seconds) for key, seconds, _ in RESOLUTIONS)[resolution]
+    df = df.sort_values("timestamp")
+    timestamps = pd.to_datetime(df["timestamp"]).to_numpy(dtype="datetime64[ns]").view(np.int64)
+    return _to_frame(*_reduce(timestamps, _raw_parts(df, columns), seconds))
+
+
+# Indeks titik yang dipilih Largest-Triangle-Three-Buckets untuk satu deret
+def lttb_indices(x, y, threshold):
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.nan_to_num(np.asarray(y, dtype=np.float64))
+    every = (n - 2) / (threshold - 2)
+    selected = np.empty(threshold, dtype=np.intp)
+    selected[0] = 0
+    selected[-1] = n - 1
+    a = 0
+    for i in range(threshold - 2):
+        start = int(i * every) + 1
+        end = int((i + 1) * every) + 1
+        next_start = end
+        next_end = min(int((i + 2) * every) + 1, n)
+        if next_start >= next_end:
+            next_start, next_end = n - 1, n
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+# Kurangi DataFrame menjadi sekitar max_points baris dengan LTTB. Titik yang dipilih
+# untuk setiap kolom digabung, sehingga puncak pada setiap deret tetap terlihat.
+def lttb_frame(df, columns, max_points):
+    if len(df) <= max_points:
+        return df
+    x = df["timestamp"].to_numpy(dtype="datetime64[ns]").view(np.int64)
+    per_column = max(3, max_points // max(1, len(columns)))
+    selected = np.unique(np.concatenate([
+        lttb_indices(x, df[column].to_numpy(), per_column) for column in columns
+    ]))
+    return df.iloc[selected].reset_index(drop=True)
+
+
+class RollupEngine:
+    def __init__(self, store, resolutions=RESOLUTIONS):
+        self.store = store
+        self.resolutions = list(resolutions)
+        self._seconds = {key: seconds for key, seconds, _ in self.resolutions}
+        self._cache = {}
+        self._lock = threading.Lock()
+        self.computed = 0
+        self.cache_hits = 0
+
+    def columns(self, feed):
+        return list(self.store.schemas[feed])
+
+    # Bucket satu partisi hari: (timestamps int64, komponen per kolom)
+    def day_rollup(self, feed, day, resolution):
+        arrays = self.store.day_arrays(feed, day)
+        rows = 0 if arrays is None else len(arrays["timestamp"])
+        with self._lock:
+            entry = self._cache.get((feed, day))
+            if entry is None or entry["rows"] != rows:
+                entry = self._cache[(feed, day)] = {"rows": rows}
+            if resolution in entry:
+                self.cache_hits += 1
+                return entry[resolution]
+
+            base = self.resolutions[0][0]
+            if base not in entry:
+                entry[base] = self._from_raw(feed, arrays)
+            if resolution != base:
+                entry[resolution] = _reduce(*entry[base], self._seconds[resolution])
+            self.computed += 1
+            return entry[resolution]
+
+    def _from_raw(self, feed, arrays):
+        columns = self.columns(feed)
+        if arrays is None:
+            return np.empty(0, dtype=np.int64), {
+                column: tuple(np.empty(0) for _ in range(4)) for column in columns
+            }
+        timestamps = arrays["timestamp"].view(np.int64)
+        if np.any(timestamps[1:] < timestamps[:-1]):
+            order = np.argsort(timestamps, kind="stable")
+            timestamps = timestamps[order]
+            arrays = {column: np.asarray(arrays[column])[order] for column in columns}
+        return _reduce(timestamps, _raw_parts(arrays, columns), self.resolutions[0][1])
+
+    # DataFrame bucket pada resolusi tertentu untuk rentang [start, end]
+    def rollup(self, feed, start, end, resolution):
+        start = pd.Timestamp(start)
+        end = pd.Timestamp(end)
+        seconds = self._seconds[resolution]
+        # Bucket yang memuat start tetap disertakan
+        lo_value = (start.value // (seconds * _NS)) * seconds * _NS
+        timestamps = []
+        parts = {column: ([], [], [], []) for column in self.columns(feed)}
+        for day in self.store.days(feed):
+            if day < start.date() or day > end.date():
+                continue
+            day_timestamps, day_parts = self.day_rollup(feed, day, resolution)
+            lo = np.searchsorted(day_timestamps, lo_value, side="left")
+            hi = np.searchsorted(day_timestamps, end.value, side="right")
+            if hi <= lo:
+                continue
+            timestamps.append(day_timestamps[lo:hi])
+            for column, components in day_parts.items():
+                for target, values in zip(parts[column], components):
+                    target.append(values[lo:hi])
+
+        if not timestamps:
+            return _to_frame(np.empty(0, dtype=np.int64), {
+                column: tuple(np.empty(0) for _ in range(4)) for column in parts
+            })
+        return _to_frame(np.concatenate(timestamps), {
+            column: tuple(np.concatenate(values) for values in components)
+            for column, components in parts.items()
+        })
+
+    # Data grafik untuk rentang yang terlihat. Mengembalikan (resolusi, DataFrame):
+    # resolusi None berarti data mentah (sudah cukup sedikit), "lttb" berarti data
+    # mentah yang dikurangi dengan LTTB, selain itu key dari RESOLUTIONS.
+    def query(self, feed, start, end, max_points=500, method="rollup"):
+        columns = self.columns(feed)
+        # Baris mentah dihitung dari memmap timestamp; DataFrame mentah hanya dibangun
+        # jika cukup sedikit untuk ditampilkan langsung atau jika LTTB diminta
+        if self.store.count_range(feed, start, end) <= max_points:
+            return None, self.store.read_range(feed, start, end)
+        if method == "lttb":
+            return "lttb", lttb_frame(self.store.read_range(feed, start, end), columns, max_points)
+
+        span = (pd.Timestamp(end) - pd.Timestamp(start)).total_seconds()
+        resolution = choose_resolution(span, max_points, self.resolutions)
+        frame = self.rollup(feed, start, end, resolution)
+        if len(frame) > max_points:
+            frame = lttb_frame(frame, columns, max_points)
+        return resolution, frame
+
+    def stats(self):
+        with self._lock:
+            return {
+                "cached_days": len(self._cache),
+                "computed": self.computed,
+                "cache_hits": self.cache_hits,
+            }
+
+
+# Satu mesin rollup per proses, berbagi cache bucket antar sesi
+@st.cache_resource
+def get_rollup_engine():
+    return RollupEngine(get_timeseries_store())
+
+
+def resolution_caption(resolution, rows):
+    if resolution is None:
+        return f"{rows} titik data mentah"
+    if resolution == "lttb":
+        return f"{rows} titik data mentah (LTTB)"
+    return f"{rows} titik, rata-rata per {RESOLUTION_LABELS[resolution]} (area: min-maks)"
+
+
+# Grafik garis Altair untuk hasil query: garis rata-rata dan area min-maks jika data di-rollup.
+# series: {kolom: label}; colors: daftar warna sesuai urutan series.
+def rollup_chart(df, resolution, series, colors, y_title, height=300):
+    rolled = resolution not in (None, "lttb")
+    frames = []
+    for column, label in series.items():
+        frame = pd.DataFrame({
+            "timestamp": df["timestamp"],
+            "Kategori": label,
+            "Nilai": df[column],
+        })
+        if rolled:
+            frame["Min"] = df[f"{column}_min"]
+            frame["Maks"] = df[f"{column}_max"]
+        frames.append(frame)
+    long_df = pd.concat(frames, ignore_index=True)
+
+    color = alt.Color('Kategori:N', title='Kategori',
+                      scale=alt.Scale(domain=list(series.values()), range=list(colors)))
+    base = alt.Chart(long_df).encode(
+        x=alt.X('timestamp:T', title='Waktu'),
+        color=color,
+    )
+    tooltip = [
+        alt.Tooltip('timestamp:T', title='Waktu', format='%Y-%m-%d %H:%M:%S'),
+        alt.Tooltip('Kategori:N', title='Kategori'),
+        alt.Tooltip('Nilai:Q', title='Rata-rata' if rolled else 'Nilai', format='.2f'),
+    ]
+    if rolled:
+        tooltip += [alt.Tooltip('Min:Q', title='Min'), alt.Tooltip('Maks:Q', title='Maks')]
+
+    line = base.mark_line(point=not rolled).encode(
+        y=alt.Y('Nilai:Q', title=y_title),
+        tooltip=tooltip,
+    )
+    chart = line
+    if rolled:
+        band = base.mark_area(opacity=0.2).encode(y='Min:Q', y2='Maks:Q')
+        chart = band + line
+    return chart.properties(width='container', height=height).interactive()
+
+
+# Pilihan rentang tampilan grafik
+VIEW_RANGES = {
+    "1 Jam Terakhir": pd.Timedelta(hours=1),
+    "24 Jam Terakhir": pd.Timedelta(days=1),
+    "7 Hari Terakhir": pd.Timedelta(days=7),
+    "30 Hari Terakhir": pd.Timedelta(days=30),
+}
+
+
+# Rentang waktu yang terlihat, berakhir pada data terakhir yang tersimpan untuk feed
+def visible_range(store, feed, view):
+    end = store.last_timestamp(feed)
+    if end is None:
+        return None
+    end = pd.Timestamp(end)
+    return end - VIEW_RANGES[view], end
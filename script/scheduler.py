@@ -0,0 +1,165 @@
+# scheduler.py
+# Penjadwal deteksi untuk banyak kamera kelas sekaligus.
+# Setiap kamera dibaca oleh thread pembacanya sendiri (stream MJPEG atau
+# polling /capture). Satu thread inferensi mengambil frame terbaru dari
+# kamera-kamera secara bergiliran (round-robin, maksimal satu frame per kamera
+# per batch) lalu menjalankan satu panggilan predict untuk seluruh batch
+# dengan model YOLO yang sama. Hasil ditulis ke slot per kamera.
+import threading
+import time
+from collections import deque
+
+from script import detection
+from script.camera import open_camera
+
+
+# Hasil terbaru dan statistik untuk satu kamera
+class CameraSlot:
+    def __init__(self, camera_id, url):
+        self.camera_id = camera_id
+        self.url = url
+        self.img = None
+        self.attentive_count = 0
+        self.inattentive_count = 0
+        self.updated_at = None
+        self.frames = 0
+        self._latencies = deque(maxlen=30)
+        self._timestamps = deque(maxlen=30)
+        self._lock = threading.Lock()
+
+    def update(self, img, attentive_count, inattentive_count, latency):
+        now = time.perf_counter()
+        with self._lock:
+            self.img = img
+            self.attentive_count = attentive_count
+            self.inattentive_count = inattentive_count
+            self.updated_at = now
+            self.frames += 1
+            self._latencies.append(latency)
+            self._timestamps.append(now)
+
+    def snapshot(self):
+        with self._lock:
+            if len(self._timestamps) > 1:
+                span = self._timestamps[-1] - self._timestamps[0]
+                fps = (len(self._timestamps) - 1) / span if span > 0 else 0.0
+            else:
+                fps = 0.0
+            latency_ms = 1000 * sum(self._latencies) / len(self._latencies) if self._latencies else 0.0
+            return {
+                "camera_id": self.camera_id,
+                "url": self.url,
+                "img": self.img,
+                "attentive_count": self.attentive_count,
+                "inattentive_count": self.inattentive_count,
+                "frames": self.frames,
+                "fps": fps,
+                "latency_ms": latency_ms,
+                "updated_at": self.updated_at,
+            }
+
+
+class MultiCameraScheduler:
+    # model     : model YOLO yang sudah dimuat (dibagikan untuk semua kamera)
+    # cameras   : dict {camera_id: url}
+    # batch_size: jumlah maksimum frame (kamera) per panggilan predict
+    # annotate  : gambar kotak deteksi pada frame hasil
+    # geometries: dict {camera_id: InferenceGeometry} (ukuran input dan ROI per kamera), opsional
+    def __init__(self, model, cameras, batch_size=4, annotate=True, idle_wait=0.01, geometries=None):
+        self.model = model
+        self.batch_size = max(1, batch_size)
+        self.annotate = annotate
+        self.idle_wait = idle_wait
+        self.geometries = geometries or {}
+
+        self.readers = {camera_id: open_camera(url) for camera_id, url in cameras.items()}
+        self.slots = {camera_id: CameraSlot(camera_id, url) for camera_id, url in cameras.items()}
+        self._order = list(cameras)
+        self._next = 0
+        self._last_seq = {camera_id: 0 for camera_id in cameras}
+
+        self._stop_event = threading.Event()
+        self._thread = None
+        self.batches = 0
+        self.error = None
+
+    def start(self):
+        for reader in self.readers.values():
+            reader.start()
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="multi-camera-scheduler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=2):
+        self._stop_event.set()
+        for reader in self.readers.values():
+            reader.stop(timeout)
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    # Ambil frame baru dari kamera secara bergiliran mulai dari kamera setelah
+    # kamera terakhir yang dilayani, sehingga tidak ada kamera yang tertinggal
+    def _next_batch(self):
+        batch = []
+        count = len(self._order)
+        for offset in range(count):
+            camera_id = self._order[(self._next + offset) % count]
+            seq, frame, captured_at = self.readers[camera_id].snapshot()
+            if frame is None or seq == self._last_seq[camera_id]:
+                continue
+            self._last_seq[camera_id] = seq
+            batch.append((camera_id, frame, captured_at))
+            if len(batch) >= self.batch_size:
+                self._next = (self._next + offset + 1) % count
+                return batch
+        if count:
+            self._next = (self._next + 1) % count
+        return batch
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            batch = self._next_batch()
+            if not batch:
+                self._stop_event.wait(self.idle_wait)
+                continue
+            try:
+                outputs = detection.process_frames(
+                    self.model, [frame for _, frame, _ in batch], annotate=self.annotate,
+                    geometry=[self.geometries.get(camera_id) for camera_id, _, _ in batch] if self.geometries else None
+                )
+            except Exception as e:
+                self.error = e
+                self._stop_event.wait(1)
+                continue
+            self.batches += 1
+            done = time.perf_counter()
+            for (camera_id, _, captured_at), (img, attentive_count, inattentive_count) in zip(batch, outputs):
+                self.slots[camera_id].update(img, attentive_count, inattentive_count, done - captured_at)
+
+    # Snapshot semua slot kamera, urut sesuai urutan masukan
+    def snapshot(self):
+        return [self.slots[camera_id].snapshot() for camera_id in self._order]
+
+    def stats(self):
+        return {
+            "batches": self.batches,
+            "cameras": {camera_id: reader.stats() for camera_id, reader in self.readers.items()},
+            "error": str(self.error) if self.error else None,
+        }
+
+
+# Ubah teks masukan (satu kamera per baris, format "nama=url" atau hanya "url")
+# menjadi dict {camera_id: url}
+def parse_camera_list(text):
+    cameras = {}
+    for index, line in enumerate(text.splitlines()):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        if "=" in line.split("://", 1)[0]:
+            name, url = line.split("=", 1)
+            cameras[name.strip()] = url.strip()
+        else:
+            cameras[f"Kelas {index + 1}"] = line
+    return cameras
@@ -0,0 +1,253 @@
+# sensor_api.py
+# Lapisan akses data riwayat sensor yang hanya meminta data baru.
+# Permintaan dikirim dengan parameter since/limit/start/end; jika server
+# mengabaikan parameter tersebut, hasil tetap disaring di sisi klien sehingga
+# data yang digabungkan ke buffer lokal selalu benar.
+import datetime
+import threading
+import time
+from collections import deque
+
+import numpy as np
+import pandas as pd
+import requests
+
+from script.config import API_BASE_URL
+from script.json_stream import CHUNK_SIZE, ColumnBuilder, iter_json_batches
+from script.metrics import timer
+from script.ring_buffer import TimeSeriesRing
+
+
+# Ubah nilai timestamp dari API menjadi datetime naive (UTC jika ada zona waktu)
+def parse_timestamp(value):
+    if value is None:
+        return None
+    if isinstance(value, datetime.datetime):
+        parsed = value
+    else:
+        text = str(value).strip()
+        if text.endswith("Z"):
+            text = text[:-1] + "+00:00"
+        try:
+            parsed = datetime.datetime.fromisoformat(text)
+        except ValueError:
+            parsed = pd.Timestamp(value).to_pydatetime()
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def format_timestamp(value):
+    return value.isoformat() if isinstance(value, datetime.datetime) else value
+
+
+class SensorHistoryClient:
+    # endpoint: path API, misalnya /data/sensor atau /data/streamlit
+    # capacity: jumlah record terbaru yang disimpan di ring buffer lokal
+    def __init__(self, endpoint="/data/sensor", base_url=API_BASE_URL, capacity=500,
+                 session=None, timeout=5):
+        self.url = f"{base_url}{endpoint}"
+        self.timeout = timeout
+        self.session = session or requests.Session()
+        self.buffer = deque(maxlen=capacity)
+        self.last_timestamp = None
+        self._lock = threading.Lock()
+
+        self.requests_made = 0
+        self.records_received = 0
+
+    # Ambil record dengan filter opsional:
+    # since: hanya record setelah waktu ini; start/end: rentang waktu (inklusif);
+    # limit: jumlah maksimum record terbaru
+    def fetch(self, since=None, limit=None, start=None, end=None):
+        with timer("fetch_history"):
+            response = self.session.get(self.url, params=self._params(since, limit, start, end), timeout=self.timeout)
+            response.raise_for_status()
+            records = response.json()
+        self.requests_made += 1
+        self.records_received += len(records)
+        return self._filter(records, since, limit, start, end)
+
+    # Seperti fetch(), tetapi respons dibaca secara streaming dan langsung di-parse
+    # ke array kolom bertipe (schema: nama kolom -> dtype) tanpa membentuk list of dict.
+    # Mengembalikan dict kolom; timestamp berupa int64 nanodetik.
+    def fetch_columns(self, schema, since=None, limit=None, start=None, end=None):
+        builder = ColumnBuilder(schema)
+        with timer("fetch_history"):
+            params = self._params(since, limit, start, end)
+            with self.session.get(self.url, params=params, timeout=self.timeout, stream=True) as response:
+                response.raise_for_status()
+                for records in iter_json_batches(response.iter_content(CHUNK_SIZE)):
+                    builder.add_batch(records)
+            columns = builder.finish()
+        self.requests_made += 1
+        self.records_received += builder.records
+        return self._filter_columns(columns, since, limit, start, end)
+
+    @staticmethod
+    def _params(since, limit, start, end):
+        params = {}
+        if since is not None:
+            params["since"] = format_timestamp(since)
+        if start is not None:
+            params["start"] = format_timestamp(start)
+        if end is not None:
+            params["end"] = format_timestamp(end)
+        if limit is not None:
+            params["limit"] = int(limit)
+        return params
+
+    # Ambil hanya record yang lebih baru dari record terakhir di buffer,
+    # lalu gabungkan ke ring buffer. Mengembalikan record baru saja.
+    def poll(self):
+        with self._lock:
+            since = self.last_timestamp
+            limit = self.buffer.maxlen if since is None else None
+            records = self.fetch(since=since, limit=limit)
+            for record in records:
+                self.buffer.append(record)
+            if records:
+                self.last_timestamp = parse_timestamp(records[-1].get("timestamp"))
+            return records
+
+    # n record terbaru dari buffer lokal (tanpa permintaan jaringan)
+    def recent(self, n=None):
+        with self._lock:
+            records = list(self.buffer)
+        return records[-n:] if n else records
+
+    def stats(self):
+        return {
+            "requests": self.requests_made,
+            "records_received": self.records_received,
+            "buffered": len(self.buffer),
+            "last_timestamp": format_timestamp(self.last_timestamp),
+        }
+
+    @staticmethod
+    def _filter(records, since, limit, start, end):
+        since = parse_timestamp(since)
+        start = parse_timestamp(start)
+        end = parse_timestamp(end)
+        if since is not None or start is not None or end is not None:
+            filtered = []
+            for record in records:
+                timestamp = parse_timestamp(record.get("timestamp"))
+                if timestamp is None:
+                    continue
+                if since is not None and timestamp <= since:
+                    continue
+                if start is not None and timestamp < start:
+                    continue
+                if end is not None and timestamp > end:
+                    continue
+                filtered.append(record)
+            records = filtered
+        elif limit is None:
+            return records
+        records = sorted(records, key=lambda record: parse_timestamp(record.get("timestamp")) or datetime.datetime.min)
+        if limit is not None:
+            records = records[-int(limit):]
+        return records
+
+    # Versi vektor dari _filter untuk dict kolom dari fetch_columns
+    @staticmethod
+    def _filter_columns(columns, since, limit, start, end):
+        timestamps = columns["timestamp"]
+        mask = None
+        for bound, keep in ((since, np.greater), (start, np.greater_equal), (end, np.less_equal)):
+            bound = parse_timestamp(bound)
+            if bound is None:
+                continue
+            condition = keep(timestamps, np.datetime64(bound, "ns").astype(np.int64))
+            mask = condition if mask is None else mask & condition
+        if mask is not None:
+            columns = {name: values[mask] for name, values in columns.items()}
+        elif limit is None:
+            return columns
+        order = np.argsort(columns["timestamp"], kind="stable")
+        if limit is not None:
+            order = order[-int(limit):]
+        return {name: values[order] for name, values in columns.items()}
+
+
+# Rentang waktu satu hari penuh untuk tanggal tertentu
+def day_range(date):
+    start = datetime.datetime.combine(date, datetime.time.min)
+    return start, start + datetime.timedelta(days=1) - datetime.timedelta(microseconds=1)
+
+
+# Buffer bersama grafik real-time untuk satu proses Streamlit. Delta data sensor
+# (client.poll) didaftarkan sebagai feed di data hub, sehingga thread poller hub
+# menjadi satu-satunya sumber permintaan /data/sensor untuk semua sesi dasbor.
+# Record baru ditambahkan ke ring buffer NumPy; DataFrame hanya dibangun ulang
+# saat ada record baru, lalu dibagikan ke semua sesi. Langganan ke hub dilepas
+# (polling berhenti) jika tidak ada sesi yang mengirim heartbeat dalam
+# idle_timeout detik, dan dipasang lagi oleh heartbeat berikutnya.
+class SharedSensorPoller:
+    def __init__(self, hub, client, key="sensor", idle_timeout=10.0,
+                 columns=("temperature", "humidity", "motion")):
+        self.hub = hub
+        self.client = client
+        self.key = key
+        self.idle_timeout = idle_timeout
+        self.ring = TimeSeriesRing(client.buffer.maxlen, columns)
+
+        self._sessions = {}
+        self._lock = threading.Lock()
+        self._unsubscribe = None
+        self._frame = None
+        self.version = 0
+        self.polls = 0
+        hub.add_feed(key, client.poll)
+
+    # Heartbeat dari sesi yang sedang menampilkan grafik
+    def touch(self, session_id):
+        with self._lock:
+            self._sessions[session_id] = time.monotonic()
+            if self._unsubscribe is None:
+                self._unsubscribe = self.hub.subscribe(self.key, self._on_records)
+
+    def active_sessions(self):
+        with self._lock:
+            return self._active_sessions_locked()
+
+    def _active_sessions_locked(self):
+        cutoff = time.monotonic() - self.idle_timeout
+        for session_id in [sid for sid, seen in self._sessions.items() if seen < cutoff]:
+            del self._sessions[session_id]
+        return len(self._sessions)
+
+    # (versi, DataFrame) terbaru; versi naik setiap ada record baru
+    def snapshot(self):
+        with self._lock:
+            return self.version, self._frame
+
+    @property
+    def last_error(self):
+        error = self.hub.last_error(self.key)
+        return str(error) if error is not None else None
+
+    # Dipanggil data hub dengan record baru setiap poll yang berhasil
+    def _on_records(self, records):
+        self.polls += 1
+        if records or self._frame is None:
+            self._append(records)
+        with self._lock:
+            if self._unsubscribe is not None and not self._active_sessions_locked():
+                # Tidak ada sesi aktif: berhenti berlangganan sampai ada heartbeat baru
+                self._unsubscribe()
+                self._unsubscribe = None
+
+    def _append(self, records):
+        for record in records:
+            timestamp = parse_timestamp(record.get("timestamp"))
+            if timestamp is None:
+                continue
+            values = [record.get(column) for column in self.ring.columns]
+            self.ring.append(timestamp, *[np.nan if value is None else value for value in values])
+        # Salinan kecil (paling banyak capacity baris) agar aman dibaca sesi lain
+        frame = self.ring.frame(copy=True)
+        with self._lock:
+            self._frame = frame
+            self.version += 1
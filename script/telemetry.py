@@ -0,0 +1,250 @@
+# telemetry.py
+# Pengirim log deteksi ke server di satu thread latar belakang.
+# Memakai satu requests.Session (koneksi keep-alive), menggabungkan beberapa
+# sampel menjadi satu POST, dan menyimpan sampel ke antrean file lokal
+# (terbatas) ketika server tidak dapat dihubungi.
+import json
+import os
+import queue
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from script.config import API_BASE_URL, CACHE_DIR
+from script.metrics import count, timer
+
+LOG_URL = f"{API_BASE_URL}/data/post/streamlit"
+SPOOL_PATH = os.path.join(CACHE_DIR, "telemetry_spool.jsonl")
+
+# Status HTTP saat server menolak POST berisi array (atau salah satu sampel di dalamnya)
+BATCH_REJECTED = (400, 415, 422)
+
+
+class TelemetryShipper:
+    # url            : endpoint POST log
+    # batch_size     : jumlah maksimum sampel per POST
+    # flush_interval : waktu tunggu maksimum (detik) sebelum batch dikirim
+    # max_queue      : kapasitas antrean di memori; sampel baru dibuang jika penuh
+    # spool_path     : file antrean lokal saat server tidak dapat dihubungi (None = nonaktif)
+    # max_spool      : jumlah maksimum sampel di file antrean; sampel terlama dibuang
+    # batch_retry_interval : jeda (detik) sebelum POST array dicoba lagi setelah server menolaknya
+    def __init__(self, url=LOG_URL, batch_size=10, flush_interval=2.0, max_queue=1000,
+                 spool_path=SPOOL_PATH, max_spool=10000, timeout=2, session=None,
+                 batch_retry_interval=300):
+        self.url = url
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.spool_path = spool_path
+        self.max_spool = max_spool
+        self.timeout = timeout
+        self.batch_retry_interval = batch_retry_interval
+
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._spool_lock = threading.Lock()
+        self._spool_count = self._count_spool()
+        # Server mungkin hanya menerima satu objek per POST. Jika array ditolak tetapi
+        # setiap sampelnya diterima satu per satu, batch dinonaktifkan sampai waktu ini
+        self._batch_retry_at = None
+
+        self.session = session or requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=2)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self.sent = 0
+        self.dropped = 0
+        self.failed_posts = 0
+        self.last_error = None
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop_event.clear()
+            self._thread = threading.Thread(target=self._run, name="telemetry-shipper", daemon=True)
+            self._thread.start()
+        return self
+
+    # Hentikan thread; sampel yang tersisa di memori dikirim atau disimpan ke antrean file
+    def stop(self, timeout=5):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    # Tambahkan satu sampel tanpa memblokir pemanggil. Bentuk sampel sama dengan
+    # payload lama (tanpa field tambahan) agar tidak ditolak oleh skema server.
+    def submit(self, attentive_count, inattentive_count):
+        record = {
+            "attentive_count": int(attentive_count),
+            "inattentive_count": int(inattentive_count),
+        }
+        try:
+            self._queue.put_nowait(record)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            count("telemetry_dropped")
+            return False
+
+    def stats(self):
+        return {
+            "queue_depth": self._queue.qsize(),
+            "spool_depth": self._spool_count,
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "failed_posts": self.failed_posts,
+            "batch_supported": self._batch_allowed(),
+            "last_error": self.last_error,
+        }
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            batch = self._collect_batch()
+            if batch:
+                unsent = self._send(batch)
+                if unsent:
+                    self._spill(unsent)
+                else:
+                    self._replay_spool()
+
+        # Kirim sisa sampel sebelum berhenti
+        remaining = []
+        while True:
+            try:
+                remaining.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        if remaining:
+            unsent = self._send(remaining)
+            if unsent:
+                self._spill(unsent)
+
+    # Kumpulkan sampel hingga batch_size atau hingga flush_interval berlalu
+    def _collect_batch(self):
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size and not self._stop_event.is_set():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=min(remaining, 0.2)))
+            except queue.Empty:
+                continue
+        return batch
+
+    # Kirim satu batch; mengembalikan sampel yang belum terkirim (kosong jika semua terkirim)
+    def _send(self, batch):
+        with timer("telemetry_post"):
+            return self._post(batch)
+
+    def _batch_allowed(self):
+        return self._batch_retry_at is None or time.monotonic() >= self._batch_retry_at
+
+    def _post(self, batch):
+        if len(batch) > 1 and self._batch_allowed():
+            try:
+                response = self.session.post(self.url, json=batch, timeout=self.timeout)
+                if response.status_code not in BATCH_REJECTED:
+                    response.raise_for_status()
+                    self.sent += len(batch)
+                    self._batch_retry_at = None
+                    return []
+            except Exception as e:
+                self._failed(e)
+                return batch
+            # Server menolak array: kirim per sampel dengan koneksi yang sama
+            return self._post_each(batch, batch_rejected=True)
+        return self._post_each(batch)
+
+    # Kirim sampel satu per satu. Sampel yang ditolak server (4xx) dibuang karena
+    # mengirim ulang tidak akan berhasil; jika koneksi/server gagal, sisa batch
+    # mulai dari sampel tersebut dikembalikan agar yang sudah terkirim tidak dikirim ulang.
+    def _post_each(self, batch, batch_rejected=False):
+        rejected = 0
+        for i, record in enumerate(batch):
+            try:
+                response = self.session.post(self.url, json=record, timeout=self.timeout)
+                if 400 <= response.status_code < 500 and response.status_code not in (408, 429):
+                    rejected += 1
+                    self.dropped += 1
+                    count("telemetry_rejected")
+                    self.last_error = f"Sampel ditolak server: HTTP {response.status_code}"
+                    continue
+                response.raise_for_status()
+            except Exception as e:
+                self._failed(e)
+                return batch[i:]
+            self.sent += 1
+
+        if batch_rejected and rejected == 0:
+            # Array ditolak padahal setiap sampel diterima: server tidak mendukung batch
+            self._batch_retry_at = time.monotonic() + self.batch_retry_interval
+        return []
+
+    def _failed(self, error):
+        self.failed_posts += 1
+        count("telemetry_post_failed")
+        self.last_error = str(error)
+
+    def _count_spool(self):
+        if not self.spool_path or not os.path.exists(self.spool_path):
+            return 0
+        with open(self.spool_path, "r", encoding="utf-8") as f:
+            return sum(1 for _ in f)
+
+    # Simpan batch yang gagal ke file antrean, buang sampel terlama jika melebihi max_spool
+    def _spill(self, batch):
+        if not self.spool_path:
+            self.dropped += len(batch)
+            return
+        with self._spool_lock:
+            os.makedirs(os.path.dirname(self.spool_path), exist_ok=True)
+            if self._spool_count + len(batch) <= self.max_spool:
+                with open(self.spool_path, "a", encoding="utf-8") as f:
+                    for record in batch:
+                        f.write(json.dumps(record) + "\n")
+                self._spool_count += len(batch)
+                return
+
+            records = self._read_spool() + batch
+            overflow = len(records) - self.max_spool
+            self.dropped += overflow
+            self._write_spool(records[overflow:])
+
+    # Kirim ulang isi file antrean setelah server kembali dapat dihubungi
+    def _replay_spool(self):
+        if not self.spool_path or self._spool_count == 0:
+            return
+        with self._spool_lock:
+            records = self._read_spool()
+            while records and not self._stop_event.is_set():
+                unsent = self._send(records[:self.batch_size])
+                records = unsent + records[self.batch_size:]
+                if unsent:
+                    break
+            self._write_spool(records)
+
+    def _read_spool(self):
+        if not os.path.exists(self.spool_path):
+            return []
+        records = []
+        with open(self.spool_path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    try:
+                        records.append(json.loads(line))
+                    except ValueError:
+                        self.dropped += 1
+        return records
+
+    def _write_spool(self, records):
+        tmp_path = self.spool_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for record in records:
+                f.write(json.dumps(record) + "\n")
+        os.replace(tmp_path, self.spool_path)
+        self._spool_count = len(records)
@@ -0,0 +1,262 @@
+# timeseries_store.py
+# Penyimpanan deret waktu lokal berbasis kolom untuk feed /data/sensor dan
+# /data/streamlit. Data dipartisi per hari; setiap kolom disimpan sebagai file
+# biner NumPy mentah yang hanya ditambah (append-only) dan dibaca kembali lewat
+# np.memmap, sehingga membaca satu hari hanya menyentuh partisi hari itu dan
+# array masuk ke pandas tanpa disalin.
+#
+# Struktur folder:
+#   <root>/<feed>/<YYYY-MM-DD>/timestamp.bin   (int64, nanodetik)
+#   <root>/<feed>/<YYYY-MM-DD>/<kolom>.bin
+#   <root>/<feed>/<YYYY-MM-DD>/rows            (jumlah baris yang sudah lengkap)
+#   <root>/<feed>/meta.json                    (timestamp terakhir yang disimpan)
+import contextvars
+import datetime
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from script.config import CACHE_DIR
+from script.json_stream import ColumnBuilder
+from script.sensor_api import SensorHistoryClient, format_timestamp, parse_timestamp
+
+STORE_DIR = os.path.join(CACHE_DIR, "timeseries")
+
+# Skema kolom per feed: nama kolom -> dtype NumPy
+FEED_SCHEMAS = {
+    "sensor": {"temperature": "<f8", "humidity": "<f8", "motion": "<i8"},
+    "streamlit": {"attentive_count": "<i8", "inattentive_count": "<i8"},
+}
+
+FEED_ENDPOINTS = {
+    "sensor": "/data/sensor",
+    "streamlit": "/data/streamlit",
+}
+
+_TIMESTAMP_DTYPE = np.dtype("<i8")
+_NS_PER_DAY = 86400 * 10**9
+_EPOCH = datetime.date(1970, 1, 1)
+
+
+class TimeSeriesStore:
+    def __init__(self, root=STORE_DIR, schemas=None):
+        self.root = root
+        self.schemas = dict(FEED_SCHEMAS if schemas is None else schemas)
+        self._lock = threading.Lock()
+
+    # === Path ===
+    def _feed_dir(self, feed):
+        return os.path.join(self.root, feed)
+
+    def _day_dir(self, feed, day):
+        return os.path.join(self._feed_dir(feed), day.isoformat())
+
+    def _meta_path(self, feed):
+        return os.path.join(self._feed_dir(feed), "meta.json")
+
+    # === Metadata ===
+    def _read_meta(self, feed):
+        try:
+            with open(self._meta_path(feed), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_meta(self, feed, meta):
+        path = self._meta_path(feed)
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(path + ".tmp", path)
+
+    def last_timestamp(self, feed):
+        return parse_timestamp(self._read_meta(feed).get("last_timestamp"))
+
+    @staticmethod
+    def _read_rows(day_dir):
+        try:
+            with open(os.path.join(day_dir, "rows"), "r") as f:
+                return int(f.read().strip() or 0)
+        except (OSError, ValueError):
+            return 0
+
+    @staticmethod
+    def _write_rows(day_dir, rows):
+        path = os.path.join(day_dir, "rows")
+        with open(path + ".tmp", "w") as f:
+            f.write(str(rows))
+        os.replace(path + ".tmp", path)
+
+    # === Penulisan ===
+    # Tambahkan record (list of dict dari API) ke partisi harian.
+    # Mengembalikan jumlah baris yang ditulis.
+    def append(self, feed, records):
+        return self.append_columns(feed, ColumnBuilder(self.schemas[feed]).extend(records).finish())
+
+    # Tambahkan dict kolom (timestamp int64 nanodetik + kolom skema, lihat
+    # ColumnBuilder) ke partisi harian. Mengembalikan jumlah baris yang ditulis.
+    def append_columns(self, feed, columns):
+        schema = self.schemas[feed]
+        timestamps = np.asarray(columns["timestamp"], dtype=_TIMESTAMP_DTYPE)
+        if len(timestamps) == 0:
+            return 0
+
+        # Urutkan sekali, lalu potong per hari dengan searchsorted
+        order = np.argsort(timestamps, kind="stable")
+        timestamps = timestamps[order]
+        values = {}
+        for name, dtype in schema.items():
+            dtype = np.dtype(dtype)
+            column = columns.get(name)
+            if column is None:
+                column = np.full(len(timestamps), np.nan if dtype.kind == "f" else 0, dtype=dtype)
+            values[name] = np.asarray(column, dtype=dtype)[order]
+        days = timestamps // _NS_PER_DAY
+        bounds = np.flatnonzero(np.diff(days)) + 1
+
+        with self._lock:
+            os.makedirs(self._feed_dir(feed), exist_ok=True)
+            for lo, hi in zip(np.r_[0, bounds], np.r_[bounds, len(timestamps)]):
+                day = _EPOCH + datetime.timedelta(days=int(days[lo]))
+                day_dir = self._day_dir(feed, day)
+                os.makedirs(day_dir, exist_ok=True)
+                existing = self._read_rows(day_dir)
+
+                chunks = {"timestamp": timestamps[lo:hi]}
+                chunks.update((name, column[lo:hi]) for name, column in values.items())
+                for name, chunk in chunks.items():
+                    path = os.path.join(day_dir, f"{name}.bin")
+                    # Buang sisa tulis yang tidak lengkap dari proses sebelumnya
+                    expected = existing * chunk.dtype.itemsize
+                    if os.path.exists(path) and os.path.getsize(path) != expected:
+                        os.truncate(path, expected)
+                    with open(path, "ab") as f:
+                        chunk.tofile(f)
+
+                # Jumlah baris diperbarui terakhir, sehingga pembaca tidak melihat baris setengah jadi
+                self._write_rows(day_dir, existing + int(hi - lo))
+
+            last = pd.Timestamp(int(timestamps[-1])).to_pydatetime(warn=False)
+            meta = self._read_meta(feed)
+            previous = parse_timestamp(meta.get("last_timestamp"))
+            if previous is None or last > previous:
+                meta["last_timestamp"] = format_timestamp(last)
+                self._write_meta(feed, meta)
+        return len(timestamps)
+
+    # Ambil record baru dari server (hanya setelah timestamp terakhir yang tersimpan).
+    # Respons di-parse secara streaming langsung ke array kolom.
+    def ingest(self, feed, client=None):
+        client = client or SensorHistoryClient(FEED_ENDPOINTS[feed])
+        columns = client.fetch_columns(self.schemas[feed], since=self.last_timestamp(feed))
+        return self.append_columns(feed, columns)
+
+    # === Pembacaan ===
+    def days(self, feed):
+        try:
+            names = os.listdir(self._feed_dir(feed))
+        except OSError:
+            return []
+        days = []
+        for name in names:
+            try:
+                days.append(datetime.date.fromisoformat(name))
+            except ValueError:
+                continue
+        return sorted(days)
+
+    # Array kolom untuk satu hari sebagai memmap (tanpa salinan). None jika kosong.
+    def day_arrays(self, feed, day):
+        day_dir = self._day_dir(feed, day)
+        rows = self._read_rows(day_dir)
+        if rows == 0:
+            return None
+
+        arrays = {}
+        columns = {"timestamp": _TIMESTAMP_DTYPE, **self.schemas[feed]}
+        for name, dtype in columns.items():
+            path = os.path.join(day_dir, f"{name}.bin")
+            if not os.path.exists(path):
+                continue
+            arrays[name] = np.memmap(path, dtype=np.dtype(dtype), mode="r", shape=(rows,))
+        arrays["timestamp"] = arrays["timestamp"].view("datetime64[ns]")
+        return arrays
+
+    # DataFrame untuk satu hari; kolom langsung memakai memmap tanpa disalin
+    def read_day(self, feed, day):
+        arrays = self.day_arrays(feed, day)
+        if arrays is None:
+            return pd.DataFrame(columns=["timestamp", *self.schemas[feed]])
+        return pd.DataFrame(arrays, copy=False)
+
+    # Seluruh data feed (semua partisi)
+    def read_all(self, feed):
+        days = self.days(feed)
+        if not days:
+            return self.read_day(feed, datetime.date.today())
+        return self.read_range(feed, days[0], datetime.datetime.combine(days[-1], datetime.time.max))
+
+    # Potongan (array kolom, lo, hi) per partisi hari untuk rentang [start, end];
+    # batas dicari dengan searchsorted pada memmap timestamp tanpa membaca kolom lain
+    def _range_slices(self, feed, start, end):
+        start = pd.Timestamp(start)
+        end = pd.Timestamp(end)
+        for day in self.days(feed):
+            if day < start.date() or day > end.date():
+                continue
+            arrays = self.day_arrays(feed, day)
+            if arrays is None:
+                continue
+            timestamps = arrays["timestamp"]
+            lo = np.searchsorted(timestamps, start.to_datetime64(), side="left")
+            hi = np.searchsorted(timestamps, end.to_datetime64(), side="right")
+            if hi > lo:
+                yield arrays, lo, hi
+
+    # Jumlah baris dalam rentang [start, end] tanpa membangun DataFrame
+    def count_range(self, feed, start, end):
+        return sum(int(hi - lo) for _, lo, hi in self._range_slices(feed, start, end))
+
+    # DataFrame untuk rentang waktu [start, end]; hanya partisi hari dalam rentang yang dibaca
+    def read_range(self, feed, start, end):
+        frames = [
+            pd.DataFrame({name: array[lo:hi] for name, array in arrays.items()}, copy=False)
+            for arrays, lo, hi in self._range_slices(feed, start, end)
+        ]
+        if not frames:
+            return pd.DataFrame(columns=["timestamp", *self.schemas[feed]])
+        if len(frames) == 1:
+            return frames[0]
+        return pd.concat(frames, ignore_index=True)
+
+
+# Satu penyimpanan per proses Streamlit
+@st.cache_resource
+def get_timeseries_store():
+    return TimeSeriesStore()
+
+
+# Sinkronkan feed dari server ke penyimpanan lokal lewat data hub, sehingga
+# banyak sesi yang membuka halaman bersamaan hanya memicu satu ingest per max_age
+def sync_feed(store, feed, hub, max_age=60):
+    client = SensorHistoryClient(FEED_ENDPOINTS[feed], base_url=hub.base_url, session=hub.session)
+    return hub.get(("ingest", feed), loader=lambda: store.ingest(feed, client), max_age=max_age)
+
+
+# Sinkronkan beberapa feed secara bersamaan (satu thread per feed), sehingga
+# waktu tunggu mengikuti permintaan terlama, bukan jumlah semuanya.
+# Mengembalikan {feed: exception atau None}; pesan error ditampilkan pemanggil
+# di thread skrip karena elemen Streamlit tidak bisa dibuat dari thread pekerja.
+def sync_feeds(store, feeds, hub, max_age=60):
+    feeds = list(feeds)
+    with ThreadPoolExecutor(max_workers=max(1, len(feeds)), thread_name_prefix="sync-feed") as pool:
+        # Konteks disalin agar metrik tetap tercatat ke sesi pemanggil
+        futures = {
+            feed: pool.submit(contextvars.copy_context().run, sync_feed, store, feed, hub, max_age)
+            for feed in feeds
+        }
+        return {feed: future.exception() for feed, future in futures.items()}
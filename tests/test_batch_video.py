@@ -0,0 +1,125 @@
+import csv
+import os
+import time
+
+import cv2
+import numpy as np
+import pytest
+
+from script import batch_video, detection
+from script.batch_video import (
+    _WORKER, BatchVideoAnalyzer, _analyze_segment, cleanup_jobs, create_job, get_progress, plan_segments
+)
+from script.geometry import InferenceGeometry
+
+
+def make_job(root, created_at, status="done"):
+    job_id = create_job(b"video", root=root)
+    batch_video._set_status(batch_video.job_dir(job_id, root), status=status, created_at=created_at)
+    return job_id
+
+
+def test_cleanup_removes_expired_and_excess_finished_jobs(tmp_path):
+    root = str(tmp_path)
+    now = time.time()
+    expired = make_job(root, now - 7200)
+    oldest_done = make_job(root, now - 300)
+    running = make_job(root, now - 200, status="running")
+    recent = [make_job(root, now - 100 + i) for i in range(2)]
+
+    removed = cleanup_jobs(root, max_age=3600, max_jobs=3, now=now)
+
+    assert sorted(removed) == sorted([expired, oldest_done])
+    assert sorted(os.listdir(root)) == sorted([running, *recent])
+    assert get_progress(running, root)["status"] == "running"
+
+
+def test_create_job_cleans_up_old_jobs(tmp_path):
+    root = str(tmp_path)
+    make_job(root, time.time() - 2 * batch_video.JOB_MAX_AGE)
+    new = create_job(b"video", root=root)
+    assert os.listdir(root) == [new]
+
+
+def test_segment_worker_uses_geometry(tmp_path, monkeypatch):
+    path = tmp_path / "input.mp4"
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"mp4v"), 10, (64, 48))
+    for _ in range(10):
+        writer.write(np.zeros((48, 64, 3), dtype=np.uint8))
+    writer.release()
+
+    geometries = []
+
+    def fake_process_frame(model, frame, annotate=True, geometry=None):
+        geometries.append(geometry)
+        return None, 1, 0
+
+    monkeypatch.setattr(detection, "process_frame", fake_process_frame)
+    monkeypatch.setitem(_WORKER, "model", object())
+    geometry = InferenceGeometry((640, 384), np.array([[0, 0.5], [1, 0.5], [1, 1], [0, 1]]))
+
+    index, per_second, video = _analyze_segment(str(tmp_path), 0, 0, 10, 10.0, 2, False, geometry)
+
+    assert len(geometries) == 5
+    assert all(item is geometry for item in geometries)
+    assert per_second == {0: [5, 0, 5]}
+    assert video is None
+
+
+def write_video(path, frames=10, fps=10):
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"mp4v"), fps, (64, 48))
+    for _ in range(frames):
+        writer.write(np.zeros((48, 64, 3), dtype=np.uint8))
+    writer.release()
+
+
+def test_cancelled_segment_reports_real_progress(tmp_path, monkeypatch):
+    write_video(tmp_path / "input.mp4", frames=40)
+    (tmp_path / "cancel").touch()
+    monkeypatch.setattr(detection, "process_frame", lambda model, frame, annotate=True, geometry=None: (None, 0, 0))
+    monkeypatch.setitem(_WORKER, "model", object())
+
+    _analyze_segment(str(tmp_path), 0, 0, 40, 10.0, 1, False)
+
+    progress = batch_video._read_json(str(tmp_path / "progress_000.json"))
+    assert progress == {"done": batch_video._PROGRESS_EVERY, "total": 40}
+
+
+@pytest.mark.parametrize("frame_count, fps, segments", [(300, 30.0, 4), (95, 10.0, 3), (10, 25.0, 8), (1000, 0, 2)])
+def test_plan_segments_cover_video_on_second_boundaries(frame_count, fps, segments):
+    plan = plan_segments(frame_count, fps, segments)
+    fps = fps or 30.0
+
+    assert [index for index, _, _ in plan] == list(range(len(plan)))
+    assert 1 <= len(plan) <= segments
+    assert plan[0][1] == 0 and plan[-1][2] == frame_count
+    for (_, _, end), (_, start, _) in zip(plan, plan[1:]):
+        assert end == start
+        assert (start / fps).is_integer()
+
+
+def test_merge_combines_segments_per_second(tmp_path):
+    analyzer = BatchVideoAnalyzer(root=str(tmp_path))
+    directory = tmp_path / "job"
+    directory.mkdir()
+    (directory / "input.mp4").write_bytes(b"video")
+    outputs = [
+        (1, {2: [8, 2, 2], 3: [3, 1, 1]}, None),
+        # Detik 2 juga muncul di segmen lain: jumlah dan sampel dijumlahkan
+        (0, {0: [4, 4, 2], 1: [6, 0, 2], 2: [4, 0, 1]}, None),
+    ]
+
+    analyzer._merge(str(directory), outputs, fps=10.0, frame_count=40, stride=5, started=time.time() - 2)
+
+    with open(directory / "result.csv", newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert [(int(r["second"]), int(r["attentive_count"]), int(r["inattentive_count"]), int(r["samples"]))
+            for r in rows] == [(0, 2, 2, 2), (1, 3, 0, 2), (2, 4, 1, 3), (3, 3, 1, 1)]
+
+    summary = batch_video._read_json(str(directory / "summary.json"))
+    assert summary["duration_s"] == 4.0
+    assert summary["seconds"] == 4
+    assert summary["frames_analyzed"] == 8
+    assert summary["attention_percent"] == pytest.approx(25 / 32 * 100)
+    assert batch_video._read_json(str(directory / "status.json"))["status"] == "done"
+    assert not (directory / "input.mp4").exists()
@@ -0,0 +1,59 @@
+import urllib.request
+
+import pytest
+
+from benchmarks.fake_esp32 import start_server, stop_server
+from script.camera import MJPEGStreamReader, MultipartParser, capture_url_from_stream, decode_jpeg
+
+WIDTH, HEIGHT = 320, 240
+
+
+@pytest.fixture(params=[True, False], ids=["content-length", "tanpa-content-length"])
+def esp32(request):
+    server, base_url = start_server(fps=60, frame_count=5, width=WIDTH, height=HEIGHT,
+                                    include_length=request.param)
+    yield base_url
+    stop_server(server)
+
+
+def test_parser_decodes_every_part(esp32):
+    parser = MultipartParser()
+    decoded = []
+    with urllib.request.urlopen(f"{esp32}/stream", timeout=5) as resp:
+        # Potongan kecil: setiap feed menghasilkan paling banyak satu bagian baru
+        while len(decoded) < 8:
+            before = parser.parts
+            latest = parser.feed(resp.read1(512))
+            if latest is None:
+                continue
+            assert parser.parts == before + 1
+            decoded.append(decode_jpeg(parser.buffer, *latest))
+            parser.compact()
+
+    assert parser.parts == len(decoded)
+    assert all(frame is not None and frame.shape == (HEIGHT, WIDTH, 3) for frame in decoded)
+
+
+def test_stream_reader_delivers_frames(esp32):
+    reader = MJPEGStreamReader(f"{esp32}/stream", timeout=5).start()
+    try:
+        frames = [reader.read(timeout=5) for _ in range(5)]
+    finally:
+        reader.stop()
+
+    assert all(frame is not None and frame.shape == (HEIGHT, WIDTH, 3) for frame in frames)
+    assert reader.frames_decoded >= 5
+    assert reader.parts_received >= reader.frames_decoded
+
+
+def test_capture_url_for_default_stream_url():
+    # Stream firmware di port 81, /capture di port HTTP 80
+    assert capture_url_from_stream("http://192.168.100.168:81/stream") == "http://192.168.100.168/capture"
+    assert capture_url_from_stream("http://192.168.100.168:81/stream", capture_port=8080) == \
+        "http://192.168.100.168:8080/capture"
+
+
+def test_capture_url_keeps_other_ports():
+    assert capture_url_from_stream("http://127.0.0.1:8081/stream") == "http://127.0.0.1:8081/capture"
+    assert capture_url_from_stream("http://kamera.local/stream") == "http://kamera.local/capture"
+    assert capture_url_from_stream("http://[fe80::1]:81/stream") == "http://[fe80::1]/capture"
@@ -0,0 +1,151 @@
+import math
+
+from benchmarks.fake_groq import FakeGroqClient
+from script.chat import ChatHistoryManager, StreamRenderer, message_tokens
+
+
+class FakePlaceholder:
+    def __init__(self):
+        self.calls = []
+
+    def markdown(self, text):
+        self.calls.append(text)
+
+
+class FakeSummarizer:
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.calls = []
+
+    def __call__(self, previous, messages):
+        self.calls.append((previous, list(messages)))
+        if self.fail:
+            raise RuntimeError("peringkas gagal")
+        return f"ringkasan {len(self.calls)}: " + " ".join(m["content"][:10] for m in messages)
+
+
+def conversation(turns, chars=200):
+    messages = []
+    for i in range(turns):
+        messages.append({"role": "user", "content": f"pertanyaan {i} " + "x" * chars})
+        messages.append({"role": "assistant", "content": f"jawaban {i} " + "y" * chars})
+    return messages
+
+
+def prompt_tokens(prompt):
+    return sum(message_tokens(m) for m in prompt)
+
+
+# Simulasikan percakapan giliran demi giliran seperti halaman Chatbot
+def run_turns(manager, turns, chars=200):
+    messages = conversation(turns, chars)
+    prompts = []
+    for end in range(1, len(messages) + 1, 2):
+        prompt = manager.build(messages[:end])
+        prompts.append(prompt)
+        assert prompt[-1]["content"] == messages[end - 1]["content"]
+    return prompts
+
+
+def test_history_stays_under_budget_with_summaries():
+    summarizer = FakeSummarizer()
+    manager = ChatHistoryManager(budget=800, keep_recent=4, summarizer=summarizer)
+    prompts = run_turns(manager, 40)
+
+    assert all(prompt_tokens(prompt) <= 800 for prompt in prompts)
+    assert manager.stats()["prompt_tokens"] == prompt_tokens(prompts[-1])
+    assert prompts[-1][0]["role"] == "system"
+    assert prompts[-1][0]["content"].endswith(manager.summary)
+
+    # Riwayat dipangkas sampai low_water, jadi peringkasan tidak terjadi di setiap giliran
+    assert 1 < manager.summaries < 40 / 3
+    # Ringkasan sebelumnya selalu diteruskan ke peringkasan berikutnya
+    assert summarizer.calls[0][0] == ""
+    assert all(previous.startswith("ringkasan ") for previous, _ in summarizer.calls[1:])
+
+
+def test_history_dropped_without_summarizer():
+    manager = ChatHistoryManager(budget=500, keep_recent=4)
+    prompts = run_turns(manager, 30)
+
+    assert all(prompt_tokens(prompt) <= 500 for prompt in prompts)
+    assert all(message["role"] != "system" for message in prompts[-1])
+    assert manager.compacted > 0 and manager.summaries == 0
+
+
+def test_failed_summary_still_trims_history():
+    manager = ChatHistoryManager(budget=500, keep_recent=4, summarizer=FakeSummarizer(fail=True))
+    prompts = run_turns(manager, 30)
+
+    assert all(prompt_tokens(prompt) <= 500 for prompt in prompts)
+    assert manager.stats()["last_error"] == "peringkas gagal"
+
+
+def test_oversized_question_sent_alone():
+    manager = ChatHistoryManager(budget=100, keep_recent=4)
+    messages = conversation(1, chars=40) + [{"role": "user", "content": "z" * 2000}]
+    assert manager.build(messages) == [{"role": "user", "content": "z" * 2000}]
+
+
+def test_cleared_history_resets_summary():
+    manager = ChatHistoryManager(budget=500, keep_recent=4, summarizer=FakeSummarizer())
+    run_turns(manager, 30)
+    assert manager.summary
+
+    prompt = manager.build([{"role": "user", "content": "halo"}])
+    assert prompt == [{"role": "user", "content": "halo"}]
+
+
+def test_stream_flushes_are_throttled():
+    placeholder = FakePlaceholder()
+    renderer = StreamRenderer(placeholder, interval=0.05, max_pending_chars=400).start(now=0.0)
+
+    # 2000 potongan 4 karakter, satu setiap milidetik (2 detik stream)
+    for i in range(2000):
+        renderer.feed("abcd", now=0.1 + i * 0.001)
+    text = renderer.finish(now=2.2)
+
+    stats = renderer.stats()
+    assert stats["chunks"] == 2000
+    assert stats["flushes"] == len(placeholder.calls)
+    assert stats["flushes"] <= math.ceil(2.0 / 0.05) + 2
+    assert placeholder.calls[-1] == text == "abcd" * 2000
+    assert all(call.endswith("▌") for call in placeholder.calls[:-1])
+
+
+def test_large_pending_text_flushes_early():
+    placeholder = FakePlaceholder()
+    renderer = StreamRenderer(placeholder, interval=10, max_pending_chars=100).start(now=0.0)
+    for i in range(10):
+        renderer.feed("x" * 50, now=0.001 * i)
+    # Render pertama langsung, lalu setiap 100 karakter tertunda
+    assert renderer.flushes == 1 + 9 // 2
+
+
+def test_time_to_first_token():
+    renderer = StreamRenderer(FakePlaceholder()).start(now=1.0)
+    renderer.feed("", now=1.1)
+    renderer.feed("halo", now=1.25)
+    renderer.feed(" dunia", now=1.3)
+    renderer.finish(now=1.5)
+
+    stats = renderer.stats()
+    assert round(stats["ttft_ms"]) == 250
+    assert round(stats["total_ms"]) == 500
+    assert stats["chunks"] == 2
+
+
+def test_consume_fake_groq_stream():
+    client = FakeGroqClient("Halo! " * 300, chunk_chars=4, first_token_delay=0.05)
+    placeholder = FakePlaceholder()
+    renderer = StreamRenderer(placeholder, interval=0.05, max_pending_chars=400)
+
+    text = renderer.consume(client.chat.completions.create(model="x", messages=[], stream=True))
+
+    stats = renderer.stats()
+    assert text == "Halo! " * 300
+    assert placeholder.calls[-1] == text
+    assert stats["ttft_ms"] >= 50
+    assert stats["chunks"] == math.ceil(len(text) / 4)
+    # Stream tanpa jeda: render pertama, render karena teks tertunda, dan render akhir
+    assert stats["flushes"] <= 2 + len(text) // 400
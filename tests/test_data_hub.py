@@ -0,0 +1,37 @@
+import pytest
+
+from script.data_hub import DataHub
+
+
+def test_history_feeds_are_not_fetched_in_full():
+    hub = DataHub(base_url="http://127.0.0.1:9")
+    assert set(hub.feeds) == {"latest"}
+    with pytest.raises(KeyError):
+        hub.get("sensor")
+
+
+def test_failing_subscriber_is_recorded_and_others_still_called():
+    hub = DataHub(base_url="http://127.0.0.1:9", interval=60)
+    hub.add_feed("delta", lambda: [1, 2])
+    received = []
+
+    def broken(data):
+        raise RuntimeError("pelanggan rusak")
+
+    hub.subscribe("delta", broken)
+    hub.subscribe("delta", received.append)
+    try:
+        assert hub.get("delta") == [1, 2]
+        assert received == [[1, 2]]
+        assert str(hub.last_subscriber_error("delta")) == "pelanggan rusak"
+        assert hub.stats()["delta"]["subscriber_errors"] == 1
+        assert hub.last_error("delta") is None
+    finally:
+        hub.stop()
+
+
+def test_unknown_feed_error_does_not_block_next_read():
+    hub = DataHub(base_url="http://127.0.0.1:9", timeout=0.5)
+    for _ in range(2):
+        with pytest.raises(KeyError):
+            hub.get("streamlit", max_age=0)
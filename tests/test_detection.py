@@ -0,0 +1,63 @@
+import numpy as np
+
+from script.detection import CATEGORY_COLORS, DetectionOverlay, annotate_result
+
+NAMES = {0: "memperhatikan", 1: "tidak_memperhatikan"}
+
+
+class FakeTensor:
+    def __init__(self, values):
+        self.values = np.asarray(values)
+
+    def cpu(self):
+        return self
+
+    def numpy(self):
+        return self.values
+
+
+class FakeBoxes:
+    def __init__(self, cls, xyxy):
+        self.cls = FakeTensor(cls)
+        self.xyxy = FakeTensor(xyxy)
+
+    def __len__(self):
+        return len(self.cls.values)
+
+
+class FakeResult:
+    def __init__(self, frame, cls, xyxy):
+        self.orig_img = frame
+        self.boxes = FakeBoxes(cls, xyxy)
+
+
+def blank():
+    return np.zeros((120, 160, 3), dtype=np.uint8)
+
+
+def test_overlay_redraws_last_boxes_on_new_frame():
+    overlay = DetectionOverlay()
+    result = FakeResult(blank(), [0, 1], [[10, 20, 50, 80], [80, 30, 150, 110]])
+    img, attentive, inattentive = annotate_result(result, NAMES, overlay=overlay)
+    assert (attentive, inattentive) == (1, 1)
+
+    frame = blank()
+    carried = overlay.draw(frame)
+    assert not frame.any()
+    assert np.array_equal(carried, img)
+    assert tuple(carried[50, 10]) == CATEGORY_COLORS[0]
+    assert tuple(carried[70, 150]) == CATEGORY_COLORS[1]
+
+
+def test_overlay_without_detections_returns_plain_copy():
+    frame = blank()
+    frame[0, 0] = 255
+    carried = DetectionOverlay().draw(frame)
+    assert carried is not frame
+    assert np.array_equal(carried, frame)
+
+
+def test_unannotated_result_does_not_update_overlay():
+    overlay = DetectionOverlay()
+    annotate_result(FakeResult(blank(), [0], [[10, 20, 50, 80]]), NAMES, annotate=False, overlay=overlay)
+    assert not overlay.draw(blank()).any()
@@ -0,0 +1,51 @@
+import json
+
+import pytest
+
+from script.json_stream import iter_json_array, iter_json_batches
+
+DOCUMENTS = [
+    '[\n -25000000000.0\n]',
+    '[1, -2.5e10, 3E-5, true, null, false, -0, 12345678901234567890]',
+    '[{"timestamp": "2024-03-01T00:00:00", "temperature": 25.5}, {"timestamp": "2024-03-01T00:00:01", "temperature": -1e3}]',
+    '[{"a": "},{", "b": [1, {"c": "]"}]}, "x,]y", 7]',
+    '[{"nama": "ruang kelas ä€"}, 2.0]',
+    ' [ ] ',
+    '[]',
+]
+
+
+def split_at(data, i):
+    return [data[:i], data[i:]]
+
+
+@pytest.mark.parametrize("document", DOCUMENTS)
+def test_split_at_every_byte(document):
+    data = document.encode("utf-8")
+    expected = json.loads(document)
+    for i in range(len(data) + 1):
+        assert list(iter_json_array(split_at(data, i))) == expected, f"dipotong di byte {i}"
+
+
+@pytest.mark.parametrize("document", DOCUMENTS)
+def test_one_byte_chunks(document):
+    data = document.encode("utf-8")
+    chunks = [data[i:i + 1] for i in range(len(data))]
+    assert list(iter_json_array(chunks)) == json.loads(document)
+
+
+def test_batches_follow_chunks():
+    records = [{"i": i} for i in range(10)]
+    data = json.dumps(records)
+    cut = data.index("{", len(data) // 2)
+    batches = list(iter_json_batches([data[:cut], data[cut:]]))
+    assert len(batches) == 2
+    assert [record for batch in batches for record in batch] == records
+
+
+@pytest.mark.parametrize("document", ['[1 2]', '[1, 2', '{"a": 1}', '[1,]x', '[1] 2', '[tru'])
+def test_invalid_documents_raise(document):
+    data = document.encode("utf-8")
+    for i in range(len(data) + 1):
+        with pytest.raises(ValueError):
+            list(iter_json_array(split_at(data, i)))
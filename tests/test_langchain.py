@@ -0,0 +1,79 @@
+import pandas as pd
+import pytest
+
+pytest.importorskip("mongomock")
+
+from benchmarks.fake_mongo import add_documents, sensor_collection  # noqa: E402
+from script import langchain  # noqa: E402
+from script.langchain import SensorStatsStore  # noqa: E402
+from script.metrics import PROCESS_METRICS  # noqa: E402
+
+
+# Ringkasan lama: seluruh koleksi dibaca lalu dihitung dengan pandas
+def full_scan_summary(collection):
+    df = pd.DataFrame(list(collection.find({}, {"_id": 0})))
+    return {
+        "Jumlah data": len(df),
+        "Rata-rata suhu": round(df["temperature"].mean(), 2),
+        "Suhu maksimum": df["temperature"].max(),
+        "Suhu minimum": df["temperature"].min(),
+        "Rata-rata kelembaban": round(df["humidity"].mean(), 2),
+    }
+
+
+def assert_same_summary(summary, expected):
+    assert summary.keys() == expected.keys()
+    for name, value in expected.items():
+        assert summary[name] == pytest.approx(value, abs=0.01), name
+
+
+def test_incremental_stats_match_full_scan():
+    collection = sensor_collection(500, seed=1)
+    # Dokumen dengan field kosong tidak ikut dihitung di rata-rata (sama seperti pandas)
+    collection.insert_many([
+        {"timestamp": "2024-01-01T00:00:00", "temperature": 35.0, "humidity": None, "motion": 0},
+        {"timestamp": "2024-01-01T00:00:01", "humidity": 40.0, "motion": 1},
+    ])
+    store = SensorStatsStore(collection)
+    assert_same_summary(store.summary(), full_scan_summary(collection))
+
+    add_documents(collection, 300, seed=2)
+    collection.insert_one({"timestamp": "2024-01-02T00:00:00", "temperature": 10.0, "humidity": 90.0, "motion": 0})
+    assert_same_summary(store.summary(), full_scan_summary(collection))
+    assert store.stats["count"] == 803
+
+
+def test_incremental_update_only_reads_new_documents():
+    collection = sensor_collection(100)
+    store = SensorStatsStore(collection)
+    store.summary()
+    last_id = store.stats["last_id"]
+
+    assert store.summary()["Jumlah data"] == 100
+    assert store.stats["last_id"] == last_id
+
+    add_documents(collection, 10, seed=5)
+    assert store.summary()["Jumlah data"] == 110
+    assert store.stats["last_id"] > last_id
+
+
+def test_empty_collection_has_no_summary():
+    assert SensorStatsStore(sensor_collection(0)).summary() is None
+
+
+def test_warm_up_failures_are_counted_not_printed(monkeypatch, capsys):
+    def fail():
+        raise ConnectionError("server tidak tersedia")
+
+    monkeypatch.setattr(langchain, "_warm_up_thread", None)
+    monkeypatch.setattr(langchain, "_warm_up_error", None)
+    monkeypatch.setattr(langchain, "get_mongo_client", fail)
+    monkeypatch.setattr(langchain, "get_gemini_model", fail)
+    before = PROCESS_METRICS.snapshot()["counters"].get("warm_up_failed", 0)
+
+    langchain.warm_up().join(5)
+
+    assert PROCESS_METRICS.snapshot()["counters"]["warm_up_failed"] == before + 2
+    service, error = langchain.warm_up_error()
+    assert service == "Gemini" and isinstance(error, ConnectionError)
+    assert capsys.readouterr().out == ""
@@ -0,0 +1,65 @@
+import time
+
+from benchmarks.fake_mongo import FakeGemini
+from script.langchain import LLMResponseCache, _cached_generate
+
+SUMMARY = {
+    "Jumlah data": 1234,
+    "Rata-rata suhu": 27.43,
+    "Suhu maksimum": 31.2,
+    "Suhu minimum": 24.1,
+    "Rata-rata kelembaban": 61.87,
+}
+INSTRUCTION = "Jelaskan secara singkat."
+
+
+def test_repeated_prompt_calls_llm_once(tmp_path):
+    cache = LLMResponseCache(str(tmp_path / "cache.sqlite"))
+    llm = FakeGemini("Kelas nyaman.")
+
+    results = [_cached_generate(SUMMARY, INSTRUCTION, llm, cache) for _ in range(5)]
+    # Perubahan kecil di bawah pembulatan kunci tetap memakai respons yang sama
+    nearby = dict(SUMMARY, **{"Jumlah data": 1250, "Rata-rata suhu": 27.44})
+    results.append(_cached_generate(nearby, INSTRUCTION, llm, cache))
+
+    assert results == ["Kelas nyaman."] * 6
+    assert llm.calls == 1
+    assert cache.stats()["hits"] == 5
+
+
+def test_different_instruction_is_separate_entry():
+    cache = LLMResponseCache(":memory:")
+    llm = FakeGemini()
+    _cached_generate(SUMMARY, INSTRUCTION, llm, cache)
+    _cached_generate(SUMMARY, "Buat analisis mendalam.", llm, cache)
+    assert llm.calls == 2
+
+
+def test_expired_entry_calls_llm_again():
+    cache = LLMResponseCache(":memory:", ttl=0.1)
+    llm = FakeGemini()
+
+    _cached_generate(SUMMARY, INSTRUCTION, llm, cache)
+    _cached_generate(SUMMARY, INSTRUCTION, llm, cache)
+    assert llm.calls == 1
+
+    time.sleep(0.15)
+    _cached_generate(SUMMARY, INSTRUCTION, llm, cache)
+    assert llm.calls == 2
+
+
+def test_least_recently_used_entry_evicted_at_capacity():
+    cache = LLMResponseCache(":memory:", max_entries=2)
+    cache.set("a", "A")
+    time.sleep(0.01)
+    cache.set("b", "B")
+    time.sleep(0.01)
+    # "a" dibaca lagi sehingga "b" menjadi entri yang paling lama tidak diakses
+    assert cache.get("a") == "A"
+    time.sleep(0.01)
+    cache.set("c", "C")
+
+    assert cache.stats()["entries"] == 2
+    assert cache.get("b") is None
+    assert cache.get("a") == "A"
+    assert cache.get("c") == "C"
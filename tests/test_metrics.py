@@ -0,0 +1,32 @@
+import socket
+
+from script import metrics
+from script.metrics import PROCESS_METRICS
+
+
+def failed_count():
+    return PROCESS_METRICS.snapshot()["counters"].get("metrics_exporter_failed", 0)
+
+
+def test_exporter_survives_port_in_use(tmp_path, monkeypatch):
+    busy = socket.socket()
+    busy.bind(("0.0.0.0", 0))
+    busy.listen()
+    port = busy.getsockname()[1]
+    monkeypatch.setattr(metrics, "_exporter", None)
+    monkeypatch.setattr(metrics, "METRICS_PORT", str(port))
+    monkeypatch.setattr(metrics, "METRICS_FILE", str(tmp_path / "metrics.prom"))
+    before = failed_count()
+    try:
+        exporter = metrics.start_exporter()
+        assert exporter.server is None
+        assert exporter.last_error
+        assert exporter._thread.is_alive()
+        assert failed_count() == before + 1
+
+        # Rerun halaman memakai exporter yang sama tanpa mencoba bind ulang
+        assert metrics.start_exporter() is exporter
+        assert failed_count() == before + 1
+    finally:
+        metrics.start_exporter().stop()
+        busy.close()
@@ -0,0 +1,53 @@
+import time
+
+from script.pipeline import DropOldestQueue, FramePipeline
+
+
+def consume(pipeline, delay=0.0):
+    received = []
+    for result in pipeline.results():
+        received.append(result)
+        time.sleep(delay)
+    return received
+
+
+def slow(fn, delay=0.005):
+    def wrapper(item):
+        time.sleep(delay)
+        return fn(item)
+    return wrapper
+
+
+def test_all_results_delivered_when_consumer_keeps_up():
+    pipeline = FramePipeline(range(50), infer=slow(lambda item: item * 2)).start()
+    assert consume(pipeline) == [item * 2 for item in range(50)]
+
+
+def test_last_result_survives_slow_consumer():
+    pipeline = FramePipeline(range(20), infer=lambda item: item).start()
+    received = consume(pipeline, delay=0.02)
+    assert received[-1] == 19
+    assert received == sorted(received)
+
+
+def test_last_batch_kept_whole():
+    pipeline = FramePipeline(
+        range(20), infer_batch=lambda batch: list(batch), batch_size=4, max_wait=0.01
+    ).start()
+    received = consume(pipeline, delay=0.02)
+    assert received[-4:] == [16, 17, 18, 19]
+
+
+def test_batch_results_not_reduced_to_last():
+    pipeline = FramePipeline(
+        range(12), infer_batch=slow(list), batch_size=4, max_wait=0.5
+    ).start()
+    assert consume(pipeline) == list(range(12))
+
+
+def test_drop_oldest_queue_evicts_oldest():
+    q = DropOldestQueue(2)
+    for item in range(5):
+        q.put(item)
+    assert q.dropped == 3
+    assert [q.get_nowait(), q.get_nowait()] == [3, 4]
@@ -0,0 +1,58 @@
+import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from script.rollup import RollupEngine
+from script.timeseries_store import TimeSeriesStore
+
+START = pd.Timestamp("2024-03-01")
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = TimeSeriesStore(str(tmp_path))
+    # Tiga hari data sensor, satu sampel per 30 detik
+    timestamps = pd.date_range(START, periods=3 * 2880, freq="30s")
+    store.append_columns("sensor", {
+        "timestamp": timestamps.to_numpy(dtype="datetime64[ns]").view(np.int64),
+        "temperature": np.linspace(20, 30, len(timestamps)),
+        "humidity": np.full(len(timestamps), 70.0),
+        "motion": np.zeros(len(timestamps), dtype=np.int64),
+    })
+    return store
+
+
+@pytest.mark.parametrize("start, end", [
+    (START, START + pd.Timedelta(days=3)),
+    (START + pd.Timedelta(hours=23), START + pd.Timedelta(hours=25)),
+    (START - pd.Timedelta(days=1), START),
+    (START + pd.Timedelta(days=5), START + pd.Timedelta(days=6)),
+])
+def test_count_range_matches_read_range(store, start, end):
+    assert store.count_range("sensor", start, end) == len(store.read_range("sensor", start, end))
+
+
+def test_rollup_query_does_not_build_raw_frame(store, monkeypatch):
+    engine = RollupEngine(store)
+
+    def read_range(*args):
+        raise AssertionError("data mentah tidak boleh dibaca untuk rollup")
+
+    monkeypatch.setattr(store, "read_range", read_range)
+    resolution, frame = engine.query("sensor", START, START + pd.Timedelta(days=3), max_points=500)
+    assert resolution == "15min"
+    assert 0 < len(frame) <= 500
+    assert frame["temperature_min"].min() == pytest.approx(20)
+
+
+def test_small_range_and_lttb_read_raw_rows(store):
+    engine = RollupEngine(store)
+    end = START + datetime.timedelta(minutes=30)
+    resolution, frame = engine.query("sensor", START, end, max_points=500)
+    assert resolution is None and len(frame) == 61
+
+    resolution, frame = engine.query("sensor", START, START + pd.Timedelta(days=1), max_points=300, method="lttb")
+    assert resolution == "lttb"
+    assert len(frame) <= 300
@@ -0,0 +1,105 @@
+import datetime
+import time
+
+import pytest
+
+from benchmarks.fake_api import start_server, stop_server
+from script.data_hub import DataHub
+from script.sensor_api import SensorHistoryClient, SharedSensorPoller, day_range, parse_timestamp
+
+DAY = datetime.date(2024, 3, 1)
+
+
+@pytest.fixture
+def api():
+    server, base_url = start_server(sensor_rows=100, detection_rows=10, day=DAY)
+    yield server, base_url
+    stop_server(server)
+
+
+def timestamps(records):
+    return [parse_timestamp(record["timestamp"]) for record in records]
+
+
+def test_fetch_since_returns_only_newer_records(api):
+    server, base_url = api
+    client = SensorHistoryClient("/data/sensor", base_url=base_url)
+    records = client.fetch()
+    since = parse_timestamp(records[49]["timestamp"])
+
+    newer = client.fetch(since=since)
+    assert len(newer) == 50
+    assert all(timestamp > since for timestamp in timestamps(newer))
+
+
+def test_fetch_limit_and_day_range(api):
+    server, base_url = api
+    client = SensorHistoryClient("/data/sensor", base_url=base_url)
+
+    latest = client.fetch(limit=5)
+    assert len(latest) == 5
+    assert timestamps(latest) == sorted(timestamps(latest))
+    assert latest[-1] == client.fetch()[-1]
+
+    start, end = day_range(DAY)
+    assert len(client.fetch(start=start, end=end)) == 100
+    assert client.fetch(start=start + datetime.timedelta(days=1), end=end + datetime.timedelta(days=1)) == []
+
+
+def test_poll_fetches_only_new_records(api):
+    server, base_url = api
+    client = SensorHistoryClient("/data/sensor", base_url=base_url, capacity=20)
+
+    first = client.poll()
+    assert len(first) == 20
+    assert client.poll() == []
+    assert server.dataset.requests == 2
+
+    # Record baru di server: poll berikutnya hanya mengambil delta
+    server.dataset.set_rows(120, 10, DAY)
+    new = client.poll()
+    assert len(new) > 0
+    assert all(timestamp > timestamps(first)[-1] for timestamp in timestamps(new))
+    assert client.recent(1)[0] == new[-1]
+    assert len(client.recent()) == 20
+
+
+def test_client_side_filter_when_server_ignores_params():
+    records = [
+        {"timestamp": "2024-03-01T00:00:02", "temperature": 2},
+        {"timestamp": "2024-03-01T00:00:01", "temperature": 1},
+        {"timestamp": "2024-03-01T00:00:03", "temperature": 3},
+    ]
+    filtered = SensorHistoryClient._filter(records, "2024-03-01T00:00:01", None, None, None)
+    assert [record["temperature"] for record in filtered] == [2, 3]
+    assert [r["temperature"] for r in SensorHistoryClient._filter(records, None, 2, None, None)] == [2, 3]
+
+
+def test_shared_poller_reads_deltas_through_data_hub(api):
+    server, base_url = api
+    hub = DataHub(base_url=base_url, interval=0.05)
+    client = SensorHistoryClient("/data/sensor", base_url=base_url, capacity=30, session=hub.session)
+    poller = SharedSensorPoller(hub, client, idle_timeout=0.3)
+    try:
+        assert poller.snapshot() == (0, None)
+        poller.touch("sesi-1")
+        poller.touch("sesi-2")
+
+        deadline = time.monotonic() + 5
+        while poller.snapshot()[1] is None:
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+        assert len(poller.snapshot()[1]) == 30
+
+        # Semua permintaan /data/sensor berasal dari poller hub, satu per interval
+        assert hub.stats()["sensor"]["upstream_requests"] == server.dataset.requests
+        assert hub.stats()["sensor"]["subscribers"] == 1
+
+        # Tanpa heartbeat, langganan dilepas dan polling berhenti
+        time.sleep(0.5)
+        requests_made = server.dataset.requests
+        time.sleep(0.2)
+        assert server.dataset.requests == requests_made
+        assert hub.stats()["sensor"]["subscribers"] == 0
+    finally:
+        hub.stop()
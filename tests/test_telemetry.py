@@ -0,0 +1,201 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from script.telemetry import TelemetryShipper
+
+
+# Server log tiruan. Perilaku diatur lewat atribut:
+#   accept_arrays : False -> POST array dijawab 415
+#   down          : True  -> semua POST dijawab 503
+#   fail_after    : jumlah POST objek yang diterima sebelum server mulai gagal (503)
+#   strict        : True -> record dengan field selain jumlah siswa ditolak (422)
+# Record dengan attentive_count < 0 dianggap tidak valid (422).
+class StubLogServer:
+    def __init__(self):
+        self.accept_arrays = True
+        self.down = False
+        self.fail_after = None
+        self.strict = False
+        self.posts = []
+        self.records = []
+        self.lock = threading.Lock()
+
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                status = stub.handle(body)
+                self.send_response(status)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/data/post/streamlit"
+        threading.Thread(target=self.server.serve_forever, args=(0.05,), daemon=True).start()
+
+    def handle(self, body):
+        with self.lock:
+            self.posts.append(body)
+            if self.down:
+                return 503
+            records = body if isinstance(body, list) else [body]
+            if isinstance(body, list) and not self.accept_arrays:
+                return 415
+            if any(record["attentive_count"] < 0 for record in records):
+                return 422
+            if self.strict and any(set(record) != {"attentive_count", "inattentive_count"} for record in records):
+                return 422
+            if not isinstance(body, list) and self.fail_after is not None:
+                if self.fail_after <= 0:
+                    return 503
+                self.fail_after -= 1
+            self.records.extend(records)
+            return 201
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stub():
+    server = StubLogServer()
+    yield server
+    server.close()
+
+
+def make_shipper(stub, tmp_path, **kwargs):
+    options = {"batch_size": 5, "flush_interval": 10, "spool_path": str(tmp_path / "spool.jsonl")}
+    options.update(kwargs)
+    return TelemetryShipper(url=stub.url, **options)
+
+
+def record(n):
+    return {"attentive_count": n, "inattentive_count": 0}
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("kondisi tidak terpenuhi")
+        time.sleep(0.01)
+
+
+def test_batch_accepted_in_single_post(stub, tmp_path):
+    shipper = make_shipper(stub, tmp_path).start()
+    for n in range(5):
+        shipper.submit(n, 0)
+    wait_for(lambda: shipper.sent == 5)
+    shipper.stop()
+
+    assert len(stub.posts) == 1
+    assert isinstance(stub.posts[0], list)
+    assert [r["attentive_count"] for r in stub.records] == [0, 1, 2, 3, 4]
+
+
+def test_rejected_array_falls_back_to_single_records(stub, tmp_path):
+    stub.accept_arrays = False
+    shipper = make_shipper(stub, tmp_path)
+
+    assert shipper._send([record(n) for n in range(3)]) == []
+    assert [r["attentive_count"] for r in stub.records] == [0, 1, 2]
+    assert shipper.stats()["batch_supported"] is False
+
+    # Selama batch dinonaktifkan, batch berikutnya langsung dikirim per sampel
+    stub.posts.clear()
+    shipper._send([record(3), record(4)])
+    assert all(not isinstance(post, list) for post in stub.posts)
+
+
+def test_batch_retried_after_interval(stub, tmp_path):
+    stub.accept_arrays = False
+    shipper = make_shipper(stub, tmp_path, batch_retry_interval=0.05)
+    shipper._send([record(0), record(1)])
+    assert shipper.stats()["batch_supported"] is False
+
+    time.sleep(0.06)
+    stub.accept_arrays = True
+    stub.posts.clear()
+    shipper._send([record(2), record(3)])
+    assert len(stub.posts) == 1 and isinstance(stub.posts[0], list)
+
+
+def test_malformed_record_does_not_disable_batching(stub, tmp_path):
+    shipper = make_shipper(stub, tmp_path)
+
+    assert shipper._send([record(0), record(-1), record(2)]) == []
+    assert [r["attentive_count"] for r in stub.records] == [0, 2]
+    assert shipper.dropped == 1
+    assert shipper.stats()["batch_supported"] is True
+
+
+def test_partial_fallback_returns_only_unsent_tail(stub, tmp_path):
+    stub.accept_arrays = False
+    stub.fail_after = 2
+    shipper = make_shipper(stub, tmp_path)
+    batch = [record(n) for n in range(5)]
+
+    assert shipper._send(batch) == batch[2:]
+    assert [r["attentive_count"] for r in stub.records] == [0, 1]
+
+
+def test_spilled_records_replayed_once(stub, tmp_path):
+    stub.down = True
+    shipper = make_shipper(stub, tmp_path, batch_size=2, flush_interval=0.05).start()
+    shipper.submit(0, 0)
+    shipper.submit(1, 0)
+    wait_for(lambda: shipper.stats()["spool_depth"] == 2)
+    assert stub.records == []
+
+    stub.down = False
+    shipper.submit(2, 0)
+    wait_for(lambda: shipper.sent == 3 and shipper.stats()["spool_depth"] == 0)
+    shipper.stop()
+
+    assert sorted(r["attentive_count"] for r in stub.records) == [0, 1, 2]
+    assert (tmp_path / "spool.jsonl").read_text() == ""
+
+
+def test_partial_failure_spills_tail_without_duplicates(stub, tmp_path):
+    stub.accept_arrays = False
+    stub.fail_after = 2
+    shipper = make_shipper(stub, tmp_path)
+    shipper._spill(shipper._send([record(n) for n in range(5)]))
+    assert shipper.stats()["spool_depth"] == 3
+
+    stub.fail_after = None
+    shipper._replay_spool()
+    assert [r["attentive_count"] for r in stub.records] == [0, 1, 2, 3, 4]
+    assert shipper.stats()["spool_depth"] == 0
+
+
+def test_spool_overflow_drops_oldest(stub, tmp_path):
+    shipper = make_shipper(stub, tmp_path, max_spool=5)
+    shipper._spill([record(n) for n in range(4)])
+    shipper._spill([record(n) for n in range(4, 8)])
+
+    spooled = shipper._read_spool()
+    assert [r["attentive_count"] for r in spooled] == [3, 4, 5, 6, 7]
+    assert shipper.dropped == 3
+    assert shipper.stats()["spool_depth"] == 5
+
+
+def test_strict_server_accepts_submitted_records(stub, tmp_path):
+    stub.strict = True
+    shipper = make_shipper(stub, tmp_path, batch_size=3).start()
+    for n in range(6):
+        shipper.submit(n, 1)
+    wait_for(lambda: shipper.sent == 6)
+    shipper.stop()
+
+    assert shipper.dropped == 0
+    assert stub.records == [{"attentive_count": n, "inattentive_count": 1} for n in range(6)]